@@ -186,6 +186,14 @@ export default function SettingsPage() {
                     });
 
                     setConnectedServices(prev => ({ ...prev, ...newConnected }));
+
+                    // Stats count days in the user's timezone: follow the browser's
+                    const browserTimezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
+                    if (browserTimezone && data.timezone !== browserTimezone) {
+                        visionAPI.updateProfile({ timezone: browserTimezone }).catch((e) =>
+                            console.error("Failed to update timezone", e)
+                        );
+                    }
                 }
             } catch (e) {
                 console.error("Failed to fetch connected services", e);
@@ -0,0 +1,76 @@
+"""hnsw_index_on_rag_embeddings
+
+Revision ID: a41c9e3d7b20
+Revises: 7cf46c820c7b
+Create Date: 2026-10-19 09:12:04.318220
+
+HNSW index on the RAG vector table (PostgreSQL only; lite mode has no
+vector store). langchain_postgres creates `embedding` as a dimensionless
+vector, which HNSW cannot index, so the column is pinned to the model's
+768 dimensions first. The tables are created here if RAGService has not
+run yet, with the same schema langchain_postgres uses.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c9e3d7b20'
+down_revision: Union[str, None] = '7cf46c820c7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSIONS = 768
+
+# pgvector defaults, spelled out so a rebuild is reproducible
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS langchain_pg_collection (
+            uuid UUID PRIMARY KEY,
+            name VARCHAR NOT NULL UNIQUE,
+            cmetadata JSON
+        )
+    """)
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS langchain_pg_embedding (
+            id VARCHAR PRIMARY KEY,
+            collection_id UUID REFERENCES langchain_pg_collection (uuid) ON DELETE CASCADE,
+            embedding vector({EMBEDDING_DIMENSIONS}),
+            document VARCHAR,
+            cmetadata JSONB
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_cmetadata_gin ON langchain_pg_embedding USING gin (cmetadata jsonb_path_ops)")
+    op.execute(f"""
+        ALTER TABLE langchain_pg_embedding
+        ALTER COLUMN embedding TYPE vector({EMBEDDING_DIMENSIONS})
+        USING embedding::vector({EMBEDDING_DIMENSIONS})
+    """)
+
+    # Cosine, matching PGVector's default distance strategy (<=>).
+    # CONCURRENTLY keeps ingestion writing while the graph is built.
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_hnsw
+            ON langchain_pg_embedding USING hnsw (embedding vector_cosine_ops)
+            WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})
+        """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_hnsw")
+    op.execute("ALTER TABLE langchain_pg_embedding ALTER COLUMN embedding TYPE vector")
@@ -0,0 +1,46 @@
+"""fulltext_index_on_rag_chunks
+
+Revision ID: c7e2f4a9d1b3
+Revises: a41c9e3d7b20
+Create Date: 2026-10-19 11:40:27.906114
+
+Lexical side of hybrid RAG retrieval (PostgreSQL only): a generated
+tsvector over the chunk text with a GIN index. The 'simple' configuration
+keeps identifiers (ABC-123, channel names, subjects) as written instead
+of stemming them, and does not assume one language.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2f4a9d1b3'
+down_revision: Union[str, None] = 'a41c9e3d7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("""
+        ALTER TABLE langchain_pg_embedding ADD COLUMN IF NOT EXISTS document_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(document, ''))) STORED
+    """)
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_tsv
+            ON langchain_pg_embedding USING gin (document_tsv)
+        """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_tsv")
+    op.execute("ALTER TABLE langchain_pg_embedding DROP COLUMN IF EXISTS document_tsv")
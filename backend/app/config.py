@@ -44,6 +44,16 @@ class Settings(BaseSettings):
     redis_url: str = "redis://redis:6379"
     sentry_dsn: str = ""
     
+    # RAG embedding: "gemini" (API) or "hashing" (local, offline; see embedding_providers)
+    embedding_provider: str = "gemini"
+    # Micro-batching towards the embedding provider
+    embedding_batch_size: int = 100
+    embedding_batch_wait_ms: int = 50
+    embedding_concurrency: int = 4
+    embedding_max_retries: int = 3
+    # HNSW candidate list per query: higher = better recall, slower (pgvector default 40)
+    rag_ef_search: int = 40
+    
     # Server
     port: int = 8000
     debug: bool = True
@@ -0,0 +1,130 @@
+"""
+Keyset Pagination
+Shared ?limit=&after=&fields= handling for list endpoints
+
+Pages follow a fixed sort key with the row id as the last tie-breaker, and
+`after` is the opaque cursor (base64 JSON of that key) of the previous
+page's last row. The next cursor is sent in the X-Next-Cursor header so
+list bodies stay plain arrays. Without limit or after a request gets the
+full list, as before pagination, so callers that do not follow the cursor
+see every row; after alone pages at DEFAULT_PAGE_SIZE. `fields=` is a comma-separated sparse
+fieldset; each endpoint's FieldMap ties a response field to its column.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (column, descending)
+SortKey = Sequence[Tuple[Any, bool]]
+# response field -> (backing column, getter producing a JSON-ready value)
+FieldMap = Mapping[str, Tuple[Any, Callable[[Any], Any]]]
+
+
+@dataclass
+class PageParams:
+    limit: Optional[int]  # None: unpaginated
+    after: Optional[str]
+    fields: Optional[str]
+
+
+def page_params(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> PageParams:
+    """FastAPI dependency for the shared query parameters"""
+    if limit is None and after:
+        limit = DEFAULT_PAGE_SIZE
+    return PageParams(limit=limit, after=after, fields=fields)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: SortKey) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(order):
+            raise ValueError("cursor does not match sort key")
+        return [
+            datetime.fromisoformat(v) if v is not None and column.type.python_type is datetime else v
+            for v, (column, _) in zip(values, order)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], field_map: FieldMap) -> Optional[List[str]]:
+    """Requested response fields (id always included), or None for all"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(field_map))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
+def field_columns(field_map: FieldMap, fields: Optional[List[str]]) -> Optional[List[Any]]:
+    """Columns backing the requested fields, or None to load everything"""
+    if fields is None:
+        return None
+    return [field_map[f][0] for f in fields]
+
+
+def render(rows, field_map: FieldMap, fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """JSON-ready dicts holding only the requested fields"""
+    names = fields or list(field_map)
+    return [{name: field_map[name][1](row) for name in names} for row in rows]
+
+
+def paginate(
+    query,
+    order: SortKey,
+    params: PageParams,
+    columns: Optional[Sequence[Any]] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Apply the cursor, sort key and limit to an ORM query.
+    columns restricts which columns are loaded (sort key columns are added).
+    Returns: (rows, next_cursor or None on the last page)
+    """
+    if params.after:
+        values = decode_cursor(params.after, order)
+        # (a, b, c) after (x, y, z) per column direction:
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        clauses = []
+        for i, (column, descending) in enumerate(order):
+            equal = [order[j][0] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*equal, beyond))
+        query = query.filter(or_(*clauses))
+
+    if columns is not None:
+        unique = {column.key: column for column in [*columns, *(column for column, _ in order)]}
+        query = query.options(load_only(*unique.values()))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+    if params.limit is None:
+        return query.all(), None
+    # One extra row tells us whether another page exists
+    rows = query.limit(params.limit + 1).all()
+    if len(rows) <= params.limit:
+        return rows, None
+    rows = rows[:params.limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column, _ in order])
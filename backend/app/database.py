@@ -28,6 +28,14 @@ engine = create_engine(
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Publish task writes for live replication (API and Celery worker alike)
+from app.services.task_events import register_task_events
+register_task_events(SessionLocal)
+
+# Keep the user_daily_stats rollup in step with task/focus writes
+from app.services.daily_stats import register_daily_stats_events
+register_daily_stats_events()
+
 
 def init_db():
     """Create all tables"""
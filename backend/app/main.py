@@ -29,6 +29,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor of the next page on paginated list endpoints
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Initialize database on startup
@@ -1,42 +1,79 @@
-
 import logging
-from sqlalchemy import text
-from app.database import engine
+from sqlalchemy import text, inspect
+from app.database import engine, SessionLocal
+from app.models import CodebaseFile, EmbeddingCache, UserDailyStats
+from app.services.task_search import ensure_search_index
 
 logger = logging.getLogger(__name__)
 
+
+def _ensure_column(conn, table: str, column: str, ddl: str):
+    """Add a column if a SELECT on it fails (works on both SQLite and PostgreSQL)"""
+    try:
+        conn.execute(text(f"SELECT {column} FROM {table} LIMIT 1"))
+        logger.info(f"Column '{column}' already exists in '{table}'.")
+    except Exception:
+        conn.rollback()
+        logger.info(f"Column '{column}' missing in '{table}'. Adding it...")
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        conn.commit()
+        logger.info(f"Migration successful: Added '{column}' to '{table}'.")
+
+
+def _ensure_index(conn, name: str, table: str, columns: str, unique: bool = False):
+    """CREATE INDEX IF NOT EXISTS is supported by both SQLite and PostgreSQL"""
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({columns})"))
+    conn.commit()
+
+
+def _ensure_table(conn, table) -> bool:
+    """Create a table from its model if missing; True if it was created"""
+    exists = inspect(conn).has_table(table.name)
+    if not exists:
+        logger.info(f"Table '{table.name}' missing. Creating it...")
+        table.create(bind=conn)
+        conn.commit()
+    return not exists
+
+
 def run_migrations():
     """Run database migrations manually when Alembic is not available"""
     logger.info("Checking database schema...")
     
     with engine.connect() as conn:
         try:
-            # Check 'tasks' table for 'position' column
-            # Compatible with both SQLite and PostgreSQL
-            # Note: For SQLite, text query works. For Postgres, information_schema is better but text query on error also works.
-            # Using simple SELECT to check column existence is safest cross-db way without inspecting metadata which might be cached.
-            
-            try:
-                conn.execute(text("SELECT position FROM tasks LIMIT 1"))
-                logger.info("Column 'position' already exists in 'tasks'.")
-            except Exception:
-                logger.info("Column 'position' missing in 'tasks'. Adding it...")
-                # Add column
-                # SQLite doesn't support IF NOT EXISTS for columns in older versions, so catching exception above handles it.
-                # PostgreSQL supports it but we are in the exception block anyway.
-                conn.execute(text("ALTER TABLE tasks ADD COLUMN position INTEGER DEFAULT 0"))
-                conn.commit()
-                logger.info("Migration successful: Added 'position' to 'tasks'.")
-                
-            # Check 'tasks' table for 'deleted' column
-            try:
-                conn.execute(text("SELECT deleted FROM tasks LIMIT 1"))
-                logger.info("Column 'deleted' already exists in 'tasks'.")
-            except Exception:
-                logger.info("Column 'deleted' missing in 'tasks'. Adding it...")
-                conn.execute(text("ALTER TABLE tasks ADD COLUMN deleted BOOLEAN DEFAULT 0")) # 0 for False in SQLite/Postgres compatibility
-                conn.commit()
-                logger.info("Migration successful: Added 'deleted' to 'tasks'.")
+            # Check columns by selecting them; adding on failure is the
+            # simplest cross-db check and avoids cached metadata inspection.
+            _ensure_column(conn, "tasks", "position", "INTEGER DEFAULT 0")
+            # 0 for False in SQLite/Postgres compatibility
+            _ensure_column(conn, "tasks", "deleted", "BOOLEAN DEFAULT 0")
+            _ensure_column(conn, "tasks", "content_hash", "VARCHAR(64)")
+            _ensure_column(conn, "tasks", "client_id", "VARCHAR(36)")
+            _ensure_column(conn, "tasks", "field_versions", "TEXT")
+            _ensure_column(conn, "tasks", "rank_key", "VARCHAR(64) NOT NULL DEFAULT ''")
+            _ensure_column(conn, "tasks", "completed_at", "TIMESTAMP")
+            _ensure_column(conn, "users", "timezone", "VARCHAR(64) NOT NULL DEFAULT 'UTC'")
+            created_daily_stats = _ensure_table(conn, UserDailyStats.__table__)
+            _ensure_table(conn, EmbeddingCache.__table__)
+            _ensure_table(conn, CodebaseFile.__table__)
+            _ensure_column(conn, "codebase_files", "embedding_model", "VARCHAR(100)")
+            _ensure_index(conn, "ix_tasks_user_updated_id", "tasks", "user_id, updated_at, id")
+            _ensure_index(conn, "ux_tasks_user_client_id", "tasks", "user_id, client_id", unique=True)
+            _ensure_index(conn, "ix_tasks_user_rank", "tasks", "user_id, rank_key, id")
+            ensure_search_index(conn)
                 
         except Exception as e:
             logger.error(f"Migration failed or checked failed: {e}")
+            created_daily_stats = False
+
+    if created_daily_stats:
+        # First deploy of the rollup: build it from history once
+        from app.services.daily_stats import backfill_daily_stats
+        db = SessionLocal()
+        try:
+            backfill_daily_stats(db)
+        except Exception as e:
+            logger.error(f"Daily stats backfill failed: {e}")
+        finally:
+            db.close()
@@ -2,7 +2,7 @@
 Database Models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Float, ForeignKey, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -18,6 +18,7 @@ class User(Base):
     password_hash = Column(String(255), nullable=True)  # Null for OAuth-only users
     avatar_url = Column(String(500), default="")
     bio = Column(Text, default="")
+    timezone = Column(String(64), nullable=False, default="UTC", server_default="UTC")  # IANA name; stats day boundaries
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -55,13 +56,25 @@ class Task(Base):
     estimated_time = Column(String(50), default="")
     prepared_items = Column(Text, default="[]")  # JSON array
     position = Column(Integer, default=0)
+    rank_key = Column(String(64), nullable=False, default="", server_default="")  # fractional index; '' = never ranked
     deleted = Column(Boolean, default=False) # For soft delete sync
+    completed_at = Column(DateTime, nullable=True)  # Set on the transition to completed (daily stats)
+    content_hash = Column(String(64), nullable=True)  # sha256 of upstream fields (synced tasks)
+    client_id = Column(String(36), nullable=True)  # UUID of tasks created offline in RxDB
+    field_versions = Column(Text, nullable=True)  # JSON {field: updated_at of its last change}, for delta pulls
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship
     user = relationship("User", back_populates="tasks")
 
+    __table_args__ = (
+        # Keyset pagination for RxDB replication pull: (updated_at, id) per user
+        Index("ix_tasks_user_updated_id", "user_id", "updated_at", "id"),
+        Index("ux_tasks_user_client_id", "user_id", "client_id", unique=True),
+        Index("ix_tasks_user_rank", "user_id", "rank_key", "id"),
+    )
+
 
 class Proposal(Base):
     __tablename__ = "proposals"
@@ -125,6 +138,39 @@ class FocusSession(Base):
     user = relationship("User", back_populates="focus_sessions")
 
 
+class UserDailyStats(Base):
+    """Per-day rollup kept in step with task completions and focus sessions (services/daily_stats)"""
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    focus_minutes = Column(Integer, nullable=False, default=0)
+
+
+class EmbeddingCache(Base):
+    """Embedding vectors by (model, sha256 of the chunk text) (services/embedding_cache)"""
+    __tablename__ = "embedding_cache"
+
+    model = Column(String(100), primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    embedding = Column(LargeBinary, nullable=False)  # float32 array bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CodebaseFile(Base):
+    """Manifest of ingested source files, so re-ingestion only reads what changed (services/codebase_ingest)"""
+    __tablename__ = "codebase_files"
+
+    root = Column(String(500), primary_key=True)
+    path = Column(String(1000), primary_key=True)  # relative to root
+    mtime = Column(Float, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    chunks = Column(Integer, nullable=False, default=0)
+    embedding_model = Column(String(100), nullable=True)  # provider the chunks were embedded with
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class AIActivity(Base):
     __tablename__ = "ai_activities"
     
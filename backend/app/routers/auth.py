@@ -168,9 +168,9 @@ async def github_callback(
         await save_oauth_token(user.id, "github", access_token, db=db)
         
         # Trigger background sync
-        from app.routers.github import sync_github_issues_task
         from app.routers.skills import initial_skill_scan_task
-        background_tasks.add_task(sync_github_issues_task, user.id)
+        from app.services.sync_jobs import try_enqueue_sync_job
+        await try_enqueue_sync_job(user.id, "github")
         background_tasks.add_task(initial_skill_scan_task, user.id)
         
         # Create JWT for frontend
@@ -352,7 +352,6 @@ async def slack_login(authorization: str = Header(None), token: str = None, db:
 @router.get("/slack/callback")
 async def slack_callback(
     code: str, 
-    background_tasks: BackgroundTasks,
     state: str = "", 
     db: Session = Depends(get_db)
 ):
@@ -408,8 +407,8 @@ async def slack_callback(
             await save_oauth_token(user.id, "slack", access_token, db=db)
             
             # Trigger background sync
-            from app.routers.slack import sync_slack_tasks_task
-            background_tasks.add_task(sync_slack_tasks_task, user.id)
+            from app.services.sync_jobs import try_enqueue_sync_job
+            await try_enqueue_sync_job(user.id, "slack")
             
             jwt_token = create_access_token({"sub": user.email, "user_id": user.id})
             return RedirectResponse(url=f"{settings.frontend_url}/settings?slack=connected&token={jwt_token}&user={user.email}")
@@ -656,7 +655,6 @@ async def linear_login(authorization: str = Header(None), token: str = None, db:
 @router.get("/linear/callback")
 async def linear_callback(
     code: str, 
-    background_tasks: BackgroundTasks,
     state: str = "", 
     db: Session = Depends(get_db)
 ):
@@ -687,8 +685,8 @@ async def linear_callback(
         await save_oauth_token(user.id, "linear", access_token, db=db)
         
         # Trigger Sync
-        from app.routers.linear import sync_linear_tasks_task
-        background_tasks.add_task(sync_linear_tasks_task, user.id)
+        from app.services.sync_jobs import try_enqueue_sync_job
+        await try_enqueue_sync_job(user.id, "linear")
         
         # JWT
         jwt_token = create_access_token({"sub": user.email, "user_id": user.id})
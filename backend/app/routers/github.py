@@ -3,7 +3,7 @@ GitHub Integration Router
 Sync GitHub Issues to Tasks
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
@@ -13,6 +13,7 @@ import logging
 from app.database import get_db, SessionLocal
 from app.models import User, OAuthToken, Task
 from app.routers.users import get_current_user
+from app.services.sync_jobs import enqueue_sync_job, noop_progress, ProgressCallback
 
 router = APIRouter()
 
@@ -33,6 +34,7 @@ class GitHubIssue(BaseModel):
 class SyncResponse(BaseModel):
     imported: int
     events: List[dict]
+    job_id: Optional[str] = None
 
 
 from app.services.encryption import decrypt_token
@@ -73,7 +75,7 @@ async def fetch_github_issues(access_token: str) -> List[dict]:
         return response.json()
 
 
-async def sync_github_issues_task(user_id: int):
+async def sync_github_issues_task(user_id: int, progress: ProgressCallback = noop_progress):
     print(f"DEBUG: Starting GitHub sync for user {user_id}")
     db = SessionLocal()
     try:
@@ -90,6 +92,7 @@ async def sync_github_issues_task(user_id: int):
         print("DEBUG: Fetching issues from GitHub...")
         issues = await fetch_github_issues(access_token)
         print(f"DEBUG: Fetched {len(issues)} issues")
+        progress(pages_fetched=1, items_fetched=len(issues))
         
         imported = 0
         for issue in issues:
@@ -123,29 +126,33 @@ async def sync_github_issues_task(user_id: int):
                 imported += 1
         
         db.commit()
+        progress(rows_applied=imported)
         logger.info(f"Synced {imported} GitHub issues for user {user_id}")
         return imported
         
     except Exception as e:
         logger.error(f"Error syncing GitHub issues: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
-@router.post("/github/sync", response_model=SyncResponse)
 @router.post("/github/sync", response_model=SyncResponse)
 async def trigger_github_sync(
-    background_tasks: BackgroundTasks,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Trigger manual GitHub sync
+    Trigger manual GitHub sync (coalesces into a running job)
     """
     user = get_current_user(authorization, db)
     
-    # Run sync in background
-    background_tasks.add_task(sync_github_issues_task, user.id)
+    # Run sync on the Celery worker
+    job = await enqueue_sync_job(user.id, "github")
     
-    return SyncResponse(imported=0, events=[{"message": "Sync started in background"}])
+    return SyncResponse(
+        imported=0,
+        events=[{"message": "Sync started in background", **job}],
+        job_id=job["job_id"]
+    )
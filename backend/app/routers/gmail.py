@@ -5,7 +5,7 @@ Gmail Integration Router
 from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import httpx
 import base64
 import json
@@ -27,6 +27,7 @@ class EmailMessage(BaseModel):
     sender: str  # From header
     subject: str # Subject header
     date: str    # Date header
+    receivedAt: Optional[float] = None  # internalDate (epoch seconds): Gmail's own order
 
 class EmailDraft(BaseModel):
     to: str
@@ -35,6 +36,11 @@ class EmailDraft(BaseModel):
 
 async def fetch_gmail_emails(access_token: str, limit: int = 10) -> List[EmailMessage]:
     """Fetch recent emails from Gmail"""
+    emails, _ = await fetch_gmail_messages(access_token, limit)
+    return emails
+
+async def fetch_gmail_messages(access_token: str, limit: int = 10) -> Tuple[List[EmailMessage], int]:
+    """Recent emails, and how many ids were listed (a failed detail request drops its mail)"""
     async with httpx.AsyncClient() as client:
         # 1. List messages
         list_res = await client.get(
@@ -45,7 +51,7 @@ async def fetch_gmail_emails(access_token: str, limit: int = 10) -> List[EmailMe
         
         if list_res.status_code != 200:
             logger.error(f"Gmail List Error: {list_res.text}")
-            return []
+            return [], 0
             
         messages_data = list_res.json().get("messages", [])
         emails = []
@@ -58,7 +64,11 @@ async def fetch_gmail_emails(access_token: str, limit: int = 10) -> List[EmailMe
             detail_res = await client.get(
                 f"{GMAIL_API_URL}/messages/{msg_meta['id']}",
                 headers={"Authorization": f"Bearer {access_token}"},
-                params={"format": "metadata", "metadataHeaders": ["From", "Subject", "Date"]}
+                params={
+                    "format": "metadata",
+                    "metadataHeaders": ["From", "Subject", "Date"],
+                    "fields": "id,threadId,snippet,internalDate,payload/headers",
+                }
             )
             if detail_res.status_code == 200:
                 d = detail_res.json()
@@ -69,9 +79,12 @@ async def fetch_gmail_emails(access_token: str, limit: int = 10) -> List[EmailMe
                     snippet=d.get("snippet", ""),
                     sender=headers.get("From", "Unknown"),
                     subject=headers.get("Subject", "(No Subject)"),
-                    date=headers.get("Date", "")
+                    date=headers.get("Date", ""),
+                    receivedAt=int(d["internalDate"]) / 1000 if d.get("internalDate") else None
                 ))
-        return emails
+            else:
+                logger.warning(f"Gmail Detail Error for {msg_meta['id']}: {detail_res.status_code}")
+        return emails, len(messages_data)
 
 async def create_gmail_draft(access_token: str, draft: EmailDraft) -> dict:
     """Create a draft email"""
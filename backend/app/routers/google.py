@@ -13,6 +13,8 @@ import httpx
 from app.database import get_db, SessionLocal
 from app.models import User, OAuthToken, Task
 from app.routers.users import get_current_user
+from app.services.change_detection import apply_if_changed, new_synced_task
+from app.services.sync_jobs import record_sync_metrics
 import logging
 
 router = APIRouter()
@@ -101,6 +103,8 @@ async def fetch_calendar_events(access_token: str, days: int = 7) -> List[Calend
 async def import_calendar_events(user_id: int, events: List[CalendarEvent], db: Session) -> int:
     """Core logic to save events as tasks"""
     imported = 0
+    applied = 0
+    skipped = 0
     # Calendar Import Logic
     for event in events:
         # Match by Title AND Start Time to distinguish recurring events
@@ -111,23 +115,26 @@ async def import_calendar_events(user_id: int, events: List[CalendarEvent], db:
             Task.estimated_time == str(event.start)
         ).first()
         
+        fields = {"description": event.description or f"予定: {event.start}"}
+        
         if not existing:
-            new_task = Task(
-                user_id=user_id,
+            db.add(new_synced_task(
+                user_id, "calendar", fields,
                 title=event.title,
-                description=event.description or f"予定: {event.start}",
                 status="ready",
-                source="calendar",
                 estimated_time=str(event.start),
-            )
-            db.add(new_task)
+            ))
             imported += 1
         else:
-            # Update existing task
-            if existing.status != "archived":
-                existing.description = event.description or f"予定: {event.start}"
-                # existing.estimated_time is already matched
-            
+            # Update existing task (title/estimated_time are already matched)
+            if existing.status == "archived" or not apply_if_changed(existing, fields):
+                skipped += 1
+            else:
+                applied += 1
+    
+    await record_sync_metrics("google_calendar", rows_applied=imported + applied, rows_skipped=skipped)
+    if skipped:
+        logger.info(f"Calendar import for user {user_id}: {skipped} unchanged events skipped")
     return imported
 
 
@@ -220,6 +227,8 @@ async def fetch_google_tasks_core(access_token: str) -> List[GoogleTask]:
 
 async def import_google_tasks(user_id: int, tasks: List[GoogleTask], db: Session) -> int:
     imported = 0
+    applied = 0
+    skipped = 0
     for gtask in tasks:
         if not gtask.title:
             continue
@@ -230,25 +239,26 @@ async def import_google_tasks(user_id: int, tasks: List[GoogleTask], db: Session
             Task.source == "google_tasks"
         ).first()
         
+        fields = {
+            "description": gtask.notes or "",
+            "status": "ready" if gtask.status == "needsAction" else "completed",
+            "estimated_time": str(gtask.due) if gtask.due else "",
+        }
+        
         if not existing:
-            new_task = Task(
-                user_id=user_id,
-                title=gtask.title,
-                description=gtask.notes or "",
-                status="ready" if gtask.status == "needsAction" else "completed",
-                source="google_tasks",
-                estimated_time=str(gtask.due) if gtask.due else "",
-            )
-            db.add(new_task)
+            db.add(new_synced_task(user_id, "google_tasks", fields, title=gtask.title))
             imported += 1
         else:
-            # Update existing task
-            if existing.status != "archived":  # Don't resurrect archived tasks
-                existing.description = gtask.notes or ""
-                # Only update status if mapped status changed (and not archived)
-                existing.status = "ready" if gtask.status == "needsAction" else "completed"
-                existing.estimated_time = str(gtask.due) if gtask.due else ""
-            
+            # Update existing task only if it changed upstream
+            # Don't resurrect archived tasks
+            if existing.status == "archived" or not apply_if_changed(existing, fields):
+                skipped += 1
+            else:
+                applied += 1
+    
+    await record_sync_metrics("google_tasks", rows_applied=imported + applied, rows_skipped=skipped)
+    if skipped:
+        logger.info(f"Google Tasks import for user {user_id}: {skipped} unchanged tasks skipped")
     return imported
 
 
@@ -3,7 +3,7 @@ Linear Integration Router
 Linear task synchronization
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 import logging
 from datetime import datetime
@@ -11,6 +11,8 @@ from datetime import datetime
 from app.database import get_db, SessionLocal
 from app.models import User, OAuthToken, Task
 from app.routers.users import get_current_user
+from app.services.sync_jobs import enqueue_sync_job, noop_progress, ProgressCallback
+from app.services.change_detection import apply_if_changed, new_synced_task
 from app.services.linear_service import LinearService
 
 router = APIRouter()
@@ -32,7 +34,7 @@ async def get_linear_token(user_id: int, db: Session) -> str:
     return decrypt_token(token.access_token)
 
 
-async def sync_linear_tasks_task(user_id: int):
+async def sync_linear_tasks_task(user_id: int, progress: ProgressCallback = noop_progress):
     """Background task for Linear sync"""
     db = SessionLocal()
     try:
@@ -45,6 +47,7 @@ async def sync_linear_tasks_task(user_id: int):
 
         # 2. Fetch Tasks
         issues = await LinearService.fetch_assigned_issues(access_token)
+        progress(pages_fetched=1, items_fetched=len(issues))
         
         if not issues:
             logger.info(f"No assigned Linear issues found for user {user_id}")
@@ -52,6 +55,8 @@ async def sync_linear_tasks_task(user_id: int):
 
         # 3. Save to DB
         imported_count = 0
+        applied = 0
+        skipped = 0
         for issue in issues:
             # Check for duplicates
             existing = db.query(Task).filter(
@@ -79,42 +84,46 @@ async def sync_linear_tasks_task(user_id: int):
             
             description = f"{issue.get('description', '')}\n\nURL: {issue.get('url')}"
             
+            fields = {
+                "title": f"[{issue.get('identifier')}] {issue.get('title')}",
+                "description": description,
+                "status": "done" if issue.get("state", {}).get("type") in ["completed", "canceled"] else "ready",
+                "estimated_time": estimated_time,
+            }
+            
             if existing:
-                # Update existing
-                existing.title = f"[{issue.get('identifier')}] {issue.get('title')}"
-                existing.description = description
-                existing.status = "done" if issue.get("state", {}).get("type") in ["completed", "canceled"] else "ready"
-                existing.estimated_time = estimated_time
+                # Update existing only if the issue changed upstream
+                if apply_if_changed(existing, fields):
+                    applied += 1
+                else:
+                    skipped += 1
             else:
                 # Create new
-                new_task = Task(
-                    user_id=user_id,
-                    title=f"[{issue.get('identifier')}] {issue.get('title')}",
-                    description=description,
-                    status="ready",
-                    source="linear",
-                    estimated_time=estimated_time,
-                )
-                db.add(new_task)
+                # New tasks start as "ready" whatever their upstream state; the
+                # next sync applies it (the hash records what was written)
+                db.add(new_synced_task(user_id, "linear", fields, status="ready"))
                 imported_count += 1
+                applied += 1
         
         db.commit()
-        logger.info(f"Synced {imported_count} Linear tasks for user {user_id}")
+        progress(rows_applied=applied, rows_skipped=skipped)
+        logger.info(f"Synced {imported_count} Linear tasks for user {user_id} ({skipped} unchanged skipped)")
+        return imported_count
 
     except Exception as e:
         logger.error(f"Error syncing Linear: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
 @router.post("/linear/sync")
 async def sync_linear_tasks(
-    background_tasks: BackgroundTasks,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """Trigger Linear sync manually"""
     user = get_current_user(authorization, db)
-    background_tasks.add_task(sync_linear_tasks_task, user.id)
-    return {"message": "Linear sync started in background"}
+    job = await enqueue_sync_job(user.id, "linear")
+    return {"message": "Linear sync started in background", **job}
@@ -3,7 +3,7 @@ Notion Integration Router
 Sync Notion pages to Tasks
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 import logging
 import httpx
@@ -11,6 +11,8 @@ import httpx
 from app.database import get_db, SessionLocal
 from app.models import User, OAuthToken, Task
 from app.routers.users import get_current_user
+from app.services.sync_jobs import enqueue_sync_job, noop_progress, ProgressCallback
+from app.services.change_detection import apply_if_changed, new_synced_task
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -31,7 +33,7 @@ async def get_notion_token(user_id: int, db: Session) -> str:
     return decrypt_token(token.access_token)
 
 
-async def sync_notion_pages_task(user_id: int):
+async def sync_notion_pages_task(user_id: int, progress: ProgressCallback = noop_progress):
     """Background task for Notion sync"""
     db = SessionLocal()
     try:
@@ -62,6 +64,7 @@ async def sync_notion_pages_task(user_id: int):
                 return
                 
             results = response.json().get("results", [])
+        progress(pages_fetched=1, items_fetched=len(results))
         
         if not results:
             logger.info(f"No Notion pages found for user {user_id}")
@@ -69,6 +72,8 @@ async def sync_notion_pages_task(user_id: int):
 
         # 3. Save to DB
         imported_count = 0
+        applied = 0
+        skipped = 0
         for page in results:
             # Extract Title
             # Notion Title property key varies, usually "Name" or "Title" or "Page".
@@ -101,41 +106,42 @@ async def sync_notion_pages_task(user_id: int):
             
             # Determine status? (Hard to genericize)
             # Just set to ready.
+            fields = {"title": title_text, "description": description}
             
             if existing:
-                existing.title = title_text
-                # existing.description = description # Don't overwrite desc if user edited it? 
-                # Actually sync should probably update.
-                existing.description = description
+                # Only rewrite when the page changed upstream
+                if apply_if_changed(existing, fields):
+                    applied += 1
+                else:
+                    skipped += 1
             else:
-                new_task = Task(
-                    user_id=user_id,
-                    title=title_text,
-                    description=description,
+                db.add(new_synced_task(
+                    user_id, "notion", fields,
                     status="ready",
-                    source="notion",
                     estimated_time="Check Notion",
-                )
-                db.add(new_task)
+                ))
                 imported_count += 1
+                applied += 1
         
         db.commit()
-        logger.info(f"Synced {imported_count} Notion pages for user {user_id}")
+        progress(rows_applied=applied, rows_skipped=skipped)
+        logger.info(f"Synced {imported_count} Notion pages for user {user_id} ({skipped} unchanged skipped)")
+        return imported_count
 
     except Exception as e:
         logger.error(f"Error syncing Notion: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
 @router.post("/notion/sync")
 async def sync_notion_pages(
-    background_tasks: BackgroundTasks,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """Trigger Notion sync manually"""
     user = get_current_user(authorization, db)
-    background_tasks.add_task(sync_notion_pages_task, user.id)
-    return {"message": "Notion sync started in background"}
+    job = await enqueue_sync_job(user.id, "notion")
+    return {"message": "Notion sync started in background", **job}
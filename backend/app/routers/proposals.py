@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel
 from datetime import datetime
 
+from app.core.pagination import FieldMap, PageParams, page_params, paginate, parse_fields, field_columns, render, NEXT_CURSOR_HEADER
 from app.database import get_db
 from app.models import Proposal, User, Task
 from app.routers.users import get_current_user
@@ -22,16 +24,32 @@ class ProposalResponse(BaseModel):
     class Config:
         orm_mode = True
 
+PROPOSAL_FIELDS: FieldMap = {
+    "id": (Proposal.id, lambda p: p.id),
+    "title": (Proposal.title, lambda p: p.title),
+    "description": (Proposal.description, lambda p: p.description),
+    "type": (Proposal.type, lambda p: p.type),
+    "payload": (Proposal.payload, lambda p: p.payload),
+    "status": (Proposal.status, lambda p: p.status),
+    "created_at": (Proposal.created_at, lambda p: p.created_at.isoformat() if p.created_at else None),
+}
+PROPOSAL_ORDER = ((Proposal.created_at, True), (Proposal.id, True))
+
 @router.get("/proposals", response_model=List[ProposalResponse])
 def get_pending_proposals(
+    page: PageParams = Depends(page_params),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     user = get_current_user(authorization, db)
-    return db.query(Proposal).filter(
+    fields = parse_fields(page.fields, PROPOSAL_FIELDS)
+    query = db.query(Proposal).filter(
         Proposal.user_id == user.id,
         Proposal.status == "pending"
-    ).order_by(Proposal.created_at.desc()).all()
+    )
+    proposals, next_cursor = paginate(query, PROPOSAL_ORDER, page, field_columns(PROPOSAL_FIELDS, fields))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(render(proposals, PROPOSAL_FIELDS, fields), headers=headers)
 
 @router.post("/proposals/{proposal_id}/approve")
 async def approve_proposal(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.routers.users import get_current_user
@@ -44,3 +44,19 @@ async def ingest_slack(
     service = IngestionService(db)
     count = await service.ingest_user_slack(user.id)
     return {"message": f"Ingested {count} slack messages", "count": count}
+
+@router.get("/rag/metrics/embeddings")
+async def embedding_cache_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Embedding cache hit/miss counters (all ingestion, per model)
+    """
+    from app.services.embedding_cache import get_embedding_metrics
+
+    get_current_user(authorization, db)
+    try:
+        return {"models": get_embedding_metrics()}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Metrics unavailable: {e}")
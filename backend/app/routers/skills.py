@@ -3,8 +3,9 @@ Skills Router - AI skill analysis from GitHub commits
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 import httpx
 import logging
@@ -13,6 +14,7 @@ import json
 import asyncio
 import re
 
+from app.core.pagination import FieldMap, PageParams, page_params, paginate, parse_fields, field_columns, render, NEXT_CURSOR_HEADER
 from app.database import get_db, SessionLocal
 from app.models import OAuthToken, Skill as SkillModel
 from app.routers.users import get_current_user
@@ -514,14 +516,24 @@ async def fetch_github_commits(access_token: str, since_days: int = 7) -> List[d
     return commits
 
 
+SKILL_FIELDS: FieldMap = {
+    "id": (SkillModel.skill_id, lambda s: s.skill_id),
+    "name": (SkillModel.name, lambda s: s.name),
+    "level": (SkillModel.level, lambda s: s.level),
+    "maxLevel": (SkillModel.max_level, lambda s: s.max_level),
+    "exp": (SkillModel.exp, lambda s: s.exp),
+    "unlocked": (SkillModel.unlocked, lambda s: s.unlocked),
+}
+SKILL_ORDER = ((SkillModel.id, False),)
+
+
 @router.get("/skills", response_model=List[Skill])
 async def get_skills(
+    page: PageParams = Depends(page_params),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get user skills from database"""
-    from app.models import Skill as SkillModel
-    
+    """Get user skills from database (?limit=&after=&fields=)"""
     # Check auth
     if not authorization or not authorization.startswith("Bearer "):
         # Return empty list if not authenticated
@@ -533,19 +545,12 @@ async def get_skills(
         return []
     
     # Fetch skills from database
-    db_skills = db.query(SkillModel).filter(SkillModel.user_id == user.id).all()
+    fields = parse_fields(page.fields, SKILL_FIELDS)
+    query = db.query(SkillModel).filter(SkillModel.user_id == user.id)
+    db_skills, next_cursor = paginate(query, SKILL_ORDER, page, field_columns(SKILL_FIELDS, fields))
     
-    return [
-        Skill(
-            id=s.skill_id,
-            name=s.name,
-            level=s.level,
-            maxLevel=s.max_level,
-            exp=s.exp,
-            unlocked=s.unlocked
-        )
-        for s in db_skills
-    ]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(render(db_skills, SKILL_FIELDS, fields), headers=headers)
 
 
 @router.post("/skills/analyze", response_model=SkillAnalysisResponse)
@@ -719,6 +724,7 @@ async def analyze_dream(
 class RAGQueryRequest(BaseModel):
     query: str
     n_results: int = 4
+    mode: Literal["vector", "hybrid"] = "vector"  # hybrid: + full-text, for exact identifiers
 
 @router.post("/rag/ingest")
 async def ingest_codebase(
@@ -745,7 +751,7 @@ async def ingest_codebase(
         root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
         
         count = await service.ingest_codebase(root_path)
-        return {"message": f"Successfully ingested {count} chunks from codebase at {root_path}"}
+        return {"message": f"Re-ingested {count} chunks of changed files from codebase at {root_path}"}
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -766,7 +772,7 @@ async def query_codebase(
          
     try:
         service = get_rag_service()
-        results = await service.query_codebase(request.query, request.n_results)
+        results = await service.query_codebase(request.query, request.n_results, mode=request.mode)
         return {"results": results}
     except Exception as e:
         logger.error(f"Query failed: {e}")
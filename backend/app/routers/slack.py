@@ -3,7 +3,7 @@ Slack Integration Router
 Slack messages sync and AI task extraction
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 import logging
@@ -11,6 +11,7 @@ import logging
 from app.database import get_db, SessionLocal
 from app.models import User, OAuthToken, Task
 from app.routers.users import get_current_user
+from app.services.sync_jobs import enqueue_sync_job, noop_progress, ProgressCallback
 from app.services.slack_service import SlackService
 from app.services.gemini_service import get_gemini_service
 
@@ -33,7 +34,7 @@ async def get_slack_token(user_id: int, db: Session) -> str:
     return decrypt_token(token.access_token)
 
 
-async def sync_slack_tasks_task(user_id: int):
+async def sync_slack_tasks_task(user_id: int, progress: ProgressCallback = noop_progress):
     """Background task for Slack sync"""
     db = SessionLocal()
     try:
@@ -47,6 +48,7 @@ async def sync_slack_tasks_task(user_id: int):
         # 2. Fetch Messages
         # Fetch last 24 hours of messages filtered by keywords
         messages = await SlackService.fetch_recent_messages(access_token, hours=24)
+        progress(pages_fetched=1, items_fetched=len(messages))
         
         if not messages:
             logger.info(f"No relevant Slack messages found for user {user_id}")
@@ -80,28 +82,29 @@ async def sync_slack_tasks_task(user_id: int):
                 imported_count += 1
         
         db.commit()
+        progress(rows_applied=imported_count)
         logger.info(f"Synced {imported_count} Slack tasks for user {user_id} from {len(messages)} messages")
+        return imported_count
 
     except Exception as e:
         logger.error(f"Error syncing Slack: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
 @router.post("/slack/sync")
 async def sync_slack_tasks(
-    background_tasks: BackgroundTasks,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """Trigger Slack sync manually"""
     user = get_current_user(authorization, db)
     
-    # Run in background
-    background_tasks.add_task(sync_slack_tasks_task, user.id)
-    
-    return {"message": "Slack sync started in background"}
+    # Run on the Celery worker
+    job = await enqueue_sync_job(user.id, "slack")
+    return {"message": "Slack sync started in background", **job}
 
 
 @router.get("/slack/messages")
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
@@ -7,6 +8,7 @@ import json
 import subprocess
 import os
 
+from app.core.pagination import FieldMap, PageParams, page_params, paginate, parse_fields, field_columns, render, NEXT_CURSOR_HEADER
 from app.database import get_db
 from app.models import Snapshot, User
 from app.routers.users import get_current_user
@@ -115,24 +117,46 @@ async def create_snapshot(
     snapshot.windows = json.loads(snapshot.windows)
     return snapshot
 
+# windows is the heavy field: list views can leave it out with fields=
+SNAPSHOT_FIELDS: FieldMap = {
+    "id": (Snapshot.id, lambda s: s.id),
+    "name": (Snapshot.name, lambda s: s.name),
+    "windows": (Snapshot.windows, lambda s: json.loads(s.windows) if s.windows else []),
+    "notes": (Snapshot.notes, lambda s: s.notes or ""),
+    "created_at": (Snapshot.created_at, lambda s: s.created_at.isoformat() if s.created_at else None),
+}
+SNAPSHOT_ORDER = ((Snapshot.created_at, True), (Snapshot.id, True))
+
+
 @router.get("/snapshots", response_model=List[SnapshotResponse])
 async def get_snapshots(
+    page: PageParams = Depends(page_params),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get all snapshots for user"""
+    """Get snapshots for user, newest first (?limit=&after=&fields=)"""
     user = get_current_user(authorization, db)
-    snapshots = db.query(Snapshot).filter(Snapshot.user_id == user.id).order_by(Snapshot.created_at.desc()).all()
+    fields = parse_fields(page.fields, SNAPSHOT_FIELDS)
+    query = db.query(Snapshot).filter(Snapshot.user_id == user.id)
+    snapshots, next_cursor = paginate(query, SNAPSHOT_ORDER, page, field_columns(SNAPSHOT_FIELDS, fields))
     
-    # Parse JSON
-    result = []
-    for s in snapshots:
-        s_dict = s.__dict__
-        if isinstance(s_dict['windows'], str):
-            s_dict['windows'] = json.loads(s_dict['windows'])
-        result.append(s_dict)
-        
-    return result
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(render(snapshots, SNAPSHOT_FIELDS, fields), headers=headers)
+
+@router.get("/snapshots/{snapshot_id}", response_model=SnapshotResponse)
+async def get_snapshot(
+    snapshot_id: int,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get one snapshot with its windows"""
+    user = get_current_user(authorization, db)
+    snapshot = db.query(Snapshot).filter(Snapshot.id == snapshot_id, Snapshot.user_id == user.id).first()
+    
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    
+    return render([snapshot], SNAPSHOT_FIELDS, None)[0]
 
 @router.post("/snapshots/{snapshot_id}/resume")
 async def resume_snapshot(
@@ -1,152 +1,460 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Query, Body
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Body, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime
+from sqlalchemy import desc, tuple_, or_, update, insert
+from datetime import datetime, timezone
 from typing import List, Optional, Any, Dict
+import asyncio
+import json
+import logging
+from itertools import chain
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models import Task, User
 from app.routers.users import get_current_user
+from app.core.redis import redis_client
+from app.services.sync_jobs import get_job, events_channel
+from app.services.task_events import (
+    tasks_channel, mark_tasks_changed, bump_field_versions, DELTA_FIELDS, VERSIONS_AT,
+)
+from app.services.daily_stats import apply_status_change
+from app.services.ranking import is_valid_rank_key, needs_rebalance, schedule_rebalance
+from app.services.sync_encoding import wants_msgpack, msgpack_packer, negotiate_encoding, compress_stream
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Schema for sync pull response
-class SyncCheckpoint(Dict):
-    pass
+SSE_HEARTBEAT_SECONDS = 15
+
+# Largest pull batch a client may request (initial replication of big accounts)
+MAX_PULL_BATCH = 5000
+# Documents JSON-encoded per streamed chunk
+STREAM_CHUNK_DOCS = 500
+
+# Columns needed to build a replication document; selecting them directly
+# skips ORM object construction on large batches.
+TASK_DOC_COLUMNS = (
+    Task.id, Task.client_id, Task.title, Task.description, Task.status, Task.source,
+    Task.estimated_time, Task.prepared_items, Task.position, Task.rank_key, Task.deleted,
+    Task.updated_at, Task.created_at, Task.field_versions,
+)
+
+
+def task_document(row) -> Dict[str, Any]:
+    """Build the RxDB document for a Task row (ORM object or TASK_DOC_COLUMNS tuple)"""
+    return {
+        # Offline-created tasks keep the client's UUID as their RxDB id
+        "id": row.client_id or str(row.id),
+        "title": row.title,
+        "description": row.description,
+        "status": row.status,
+        "source": row.source,
+        "estimated_time": row.estimated_time,
+        "prepared_items": row.prepared_items,
+        "position": row.position,
+        "rank_key": row.rank_key,
+        "deleted": row.deleted,
+        "updated_at": row.updated_at.isoformat(),
+        "created_at": row.created_at.isoformat()
+    }
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC"""
+    if value and value.tzinfo:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def delta_document(row, since: datetime, since_id: int) -> Dict[str, Any]:
+    """
+    Document carrying only the fields changed after the client's
+    (updated_at, id) checkpoint. Falls back to the full document when the
+    client cannot have the row yet or its field versions are missing or stale.
+    """
+    versions = json.loads(row.field_versions) if row.field_versions else None
+    if (
+        not versions
+        or versions.get(VERSIONS_AT) != row.updated_at.isoformat()
+        or (row.created_at, row.id) > (since, since_id)
+    ):
+        return task_document(row)
+
+    doc = {"id": row.client_id or str(row.id), "updated_at": row.updated_at.isoformat(), "_delta": True}
+    for field in DELTA_FIELDS:
+        stamp = versions.get(field)
+        # The client holds the version written at stamp iff it sorts at or before its checkpoint
+        if stamp is None or (datetime.fromisoformat(stamp), row.id) > (since, since_id):
+            doc[field] = getattr(row, field)
+    return doc
+
+
+def _rows_after_checkpoint(db: Session, user_id: int, updated_at: Optional[datetime], task_id: int, limit: int):
+    """Next page of TASK_DOC_COLUMNS rows in (updated_at, id) keyset order"""
+    query = db.query(*TASK_DOC_COLUMNS).filter(Task.user_id == user_id)
+    if updated_at:
+        query = query.filter(tuple_(Task.updated_at, Task.id) > tuple_(updated_at, task_id))
+    return query.order_by(Task.updated_at.asc(), Task.id.asc()).limit(limit).all()
+
+
+def _row_checkpoint(row) -> Dict[str, Any]:
+    return {"updated_at": row.updated_at.isoformat(), "id": row.id}
+
+
+def _encode_pull_response(documents, checkpoint: Optional[Dict[str, Any]]):
+    """Stream { documents: [...], checkpoint: {...} } without building one big string"""
+    yield b'{"documents":['
+    for start in range(0, len(documents), STREAM_CHUNK_DOCS):
+        chunk = ",".join(json.dumps(d, ensure_ascii=False) for d in documents[start:start + STREAM_CHUNK_DOCS])
+        yield (("," if start else "") + chunk).encode("utf-8")
+    yield b'],"checkpoint":' + json.dumps(checkpoint).encode("utf-8") + b"}"
+
+
+def _encode_pull_response_msgpack(documents, checkpoint: Optional[Dict[str, Any]]):
+    """Same shape as _encode_pull_response, as a msgpack map"""
+    packer = msgpack_packer()
+    yield packer.pack_map_header(2) + packer.pack("documents") + packer.pack_array_header(len(documents))
+    for start in range(0, len(documents), STREAM_CHUNK_DOCS):
+        yield b"".join(packer.pack(d) for d in documents[start:start + STREAM_CHUNK_DOCS])
+    yield packer.pack("checkpoint") + packer.pack(checkpoint)
+
 
 @router.get("/sync/tasks")
 async def pull_tasks(
     min_updated_at: Optional[datetime] = None,
-    limit: int = 100,
+    min_id: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PULL_BATCH),
+    delta: bool = False,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Pull changes from server since min_updated_at.
-    Returns: { documents: [...], checkpoint: { updated_at: ... } }
+    Pull changes from server after the (min_updated_at, min_id) checkpoint.
+    Keyset order is (updated_at, id), so rows sharing a timestamp across a
+    page boundary are never skipped. Served by ix_tasks_user_updated_id.
+    delta=1 sends documents the client already holds as
+    { id, updated_at, _delta: true, <fields changed since the checkpoint> }.
+    Encoded as msgpack when Accept asks for it, compressed with br/gzip
+    per Accept-Encoding.
+    Returns: { documents: [...], checkpoint: { updated_at: ..., id: ... } }
     """
     user = get_current_user(authorization, db)
+    min_updated_at = _naive_utc(min_updated_at)
     
-    query = db.query(Task).filter(Task.user_id == user.id)
-    
-    if min_updated_at:
-        query = query.filter(Task.updated_at > min_updated_at)
-        
-    tasks = query.order_by(Task.updated_at.asc()).limit(limit).all()
-    
-    documents = []
-    last_updated_at = min_updated_at
+    rows = _rows_after_checkpoint(db, user.id, min_updated_at, min_id, limit)
+    if delta and min_updated_at:
+        documents = [delta_document(r, min_updated_at, min_id) for r in rows]
+    else:
+        documents = [task_document(r) for r in rows]
     
-    for t in tasks:
-        doc = {
-            "id": str(t.id), # RxDB expects string IDs usually, but int is fine if consistent
-            "title": t.title,
-            "description": t.description,
-            "status": t.status,
-            "source": t.source,
-            "estimated_time": t.estimated_time,
-            "prepared_items": t.prepared_items,
-            "position": t.position,
-            "deleted": t.deleted,
-            "updated_at": t.updated_at.isoformat(),
-            "created_at": t.created_at.isoformat()
-        }
-        documents.append(doc)
-        last_updated_at = t.updated_at
+    if rows:
+        checkpoint = _row_checkpoint(rows[-1])
+    elif min_updated_at:
+        # Nothing new: hand the client's checkpoint back unchanged
+        checkpoint = {"updated_at": min_updated_at.isoformat(), "id": min_id}
+    else:
+        checkpoint = None
+
+    if wants_msgpack(accept):
+        body, media_type = _encode_pull_response_msgpack(documents, checkpoint), "application/msgpack"
+    else:
+        body, media_type = _encode_pull_response(documents, checkpoint), "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding:
+        body = compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+def _sse_authorization(authorization: Optional[str], token: Optional[str]) -> Optional[str]:
+    """EventSource cannot set headers, so streams also accept ?token="""
+    if token and not authorization:
+        return f"Bearer {token}"
+    return authorization
+
+
+def _stream_user_id(authorization: Optional[str], token: Optional[str]) -> int:
+    """
+    Authenticate a stream with a short-lived session: a get_db session would
+    hold its pooled connection for as long as the stream stays open.
+    """
+    session = SessionLocal()
+    try:
+        return get_current_user(_sse_authorization(authorization, token), session).id
+    finally:
+        session.close()
+
+
+@router.get("/sync/tasks/stream")
+async def stream_tasks(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: str = Header(None),
+):
+    """
+    RxDB pull.stream$ over Server-Sent Events.
+    Sends "RESYNC" on connect so the client catches up through its own
+    checkpoint pull, then { documents, checkpoint } whenever a commit
+    touches the user's tasks (tasks:changed:<user_id> on Redis, so writes
+    from any uvicorn worker or Celery reach every connection).
+    """
+    user_id = _stream_user_id(authorization, token)
+
+    def latest_checkpoint():
+        session = SessionLocal()
+        try:
+            return session.query(Task.updated_at, Task.id).filter(Task.user_id == user_id).order_by(
+                Task.updated_at.desc(), Task.id.desc()
+            ).first()
+        finally:
+            session.close()
+
+    def rows_after(checkpoint):
+        session = SessionLocal()
+        try:
+            updated_at, task_id = checkpoint if checkpoint else (None, 0)
+            return _rows_after_checkpoint(session, user_id, updated_at, task_id, MAX_PULL_BATCH)
+        finally:
+            session.close()
+
+    async def event_stream():
+        pubsub = redis_client.get_client().pubsub()
+        await pubsub.subscribe(tasks_channel(user_id))
+        try:
+            # Taken after subscribing so no write can fall between the two
+            checkpoint = await asyncio.to_thread(latest_checkpoint)
+            yield 'data: "RESYNC"\n\n'
+
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=SSE_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                # Coalesce a burst of pings into one query
+                while await pubsub.get_message(ignore_subscribe_messages=True, timeout=0):
+                    pass
+
+                while True:
+                    rows = await asyncio.to_thread(rows_after, checkpoint)
+                    if not rows:
+                        break
+                    checkpoint = (rows[-1].updated_at, rows[-1].id)
+                    event = {"documents": [task_document(r) for r in rows], "checkpoint": _row_checkpoint(rows[-1])}
+                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                    if len(rows) < MAX_PULL_BATCH:
+                        break
+        finally:
+            await pubsub.unsubscribe(tasks_channel(user_id))
+            await pubsub.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Fields a client may change through push
+PUSH_FIELDS = ("title", "description", "status", "estimated_time", "prepared_items", "position", "rank_key", "deleted")
+
+
+def _assumed_matches(assumed: Optional[dict], master: Task) -> bool:
+    """
+    Whether the client's assumed master still equals the server row, on the
+    fields a push can change. Not by updated_at: the client stamps its own
+    and reuses its pushed document as the next assumed state, so a second
+    edit before the round-trip would look like a conflict.
+    """
+    if assumed is None:
+        return False
+    current = task_document(master)
+    return all(assumed[field] == current[field] for field in PUSH_FIELDS if field in assumed)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a document timestamp into the naive UTC datetimes the DB stores"""
+    try:
+        parsed = datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+    if parsed and parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
-    return {
-        "documents": documents,
-        "checkpoint": {
-            "updated_at": last_updated_at.isoformat() if last_updated_at else datetime.utcnow().isoformat()
-        }
-    }
 
 @router.post("/sync/tasks")
 async def push_tasks(
-    documents: List[dict] = Body(...),
+    rows: List[dict] = Body(...),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Push changes from client to server.
-    Simple Last-Write-Wins strategy.
+    Push changes from client to server (RxDB push contract).
+    Body: [{ newDocumentState, assumedMasterState }, ...]
+    A row conflicts when the client's assumed master differs from the
+    current server state; conflicts return the server document and are
+    not applied. Everything else is written with one bulk UPDATE and one
+    bulk INSERT (for offline-created documents with client UUID ids).
+    Returns: { conflicts: [...] }
     """
     user = get_current_user(authorization, db)
     
+    # Legacy clients pushed bare documents: treat them as last-write-wins
+    changes = []
+    for row in rows:
+        if "newDocumentState" in row:
+            changes.append((row["newDocumentState"], row.get("assumedMasterState"), True))
+        else:
+            changes.append((row, None, False))
+    
+    server_ids, client_ids = set(), set()
+    for doc, _, _ in changes:
+        doc_id = str(doc.get("id", ""))
+        if doc_id.isdigit():
+            server_ids.add(int(doc_id))
+        elif doc_id:
+            client_ids.add(doc_id)
+    
+    # One query for every referenced task
+    masters = {}
+    if server_ids or client_ids:
+        tasks = db.query(Task).filter(
+            Task.user_id == user.id,
+            or_(Task.id.in_(server_ids), Task.client_id.in_(client_ids))
+        ).all()
+        masters = {t.client_id or str(t.id): t for t in tasks}
+    
+    now = datetime.utcnow()
     conflicts = []
+    updates = []
+    inserts = {}
     
-    for doc in documents:
-        try:
-            # Parse ID (handle if it's string or int)
-            try:
-                task_id = int(doc["id"])
-            except ValueError:
-                # If ID is UUID generated by client for new task, we might need special handling
-                # ideally client sends temporary ID, we ignore it and create new?
-                # RxDB usually requires consistent IDs.
-                # If we want offline creation, Client MUST generate UUIDs.
-                # But our current DB uses Integer ID.
-                # CRITICAL DECISION: We must stick to Integer IDs for now or migrate to UUID.
-                # For POC, we assume Client sends 0 or negative ID for new tasks? 
-                # OR we switch to UUIDs. Switching to UUIDs is too risky for "Deep Tech Polish".
-                # Strategy: 
-                # If ID is string/UUID, treat as NEW task (create and return NEW ID mapping?).
-                # RxDB doesn't like ID changes.
-                # Alternative: Let the Client generate a temporary ID, Server creates Real ID,
-                # validation fails? No.
-                # Compromise for POC: Only sync EXISTING tasks (updates) or NEW tasks if we can handle it.
-                # Wait, for "Add Task" to work offline, we need client-generated IDs.
-                # Let's support creating new task if ID is not found or is compatible.
-                # If ID is integer, try to find it.
-                task_id = int(doc["id"])
-            except:
-                task_id = None
-                
-            task = None
-            if task_id:
-                task = db.query(Task).filter(Task.id == task_id, Task.user_id == user.id).first()
-            
-            if task:
-                # Update existing
-                task.title = doc.get("title", task.title)
-                task.description = doc.get("description", task.description)
-                task.status = doc.get("status", task.status)
-                task.position = doc.get("position", task.position)
-                task.deleted = doc.get("deleted", task.deleted)
-                task.updated_at = datetime.utcnow()
-                # etc...
-            else:
-                # Create new (only if it looks like a valid new task?)
-                # If the client generated a random large int ID, we might have issues.
-                # Ideally, we create a NEW task and let RxDB know the ID changed? No.
-                # Simplified POC: 
-                # If ID is missing, create new.
-                # But doc has ID.
-                # We will create a new task IGNORING the client ID, and rely on re-sync?
-                # No, RxDB needs the ID to match.
-                # This Impedance Mismatch (Int vs UUID) is the main blocker for RxDB with legacy SQL.
-                # Solution for POC: Use the Client ID if possible, but AutoIncrement overrides.
-                # Workaround: Client sends `id` as string. If it's a temp ID (e.g. starts with 'local-'), we create new Task.
-                # But we can't update the ID in RxDB easily.
-                # OK, for this POC, let's just assume we Update by ID. New tasks are created via standard POST /tasks (online only for creation)
-                # and then synced back.
-                # Wait, "Offline Support" means creating tasks offline.
-                # We will create the task with the Client provided ID if we can? 
-                # No, standard Postgres/SQLite autoincrement doesn't like that.
-                # Let's stick to: "POST /tasks" (legacy) for creation, "POST /sync" for updates.
-                # Offline Creation limit: Offline created tasks will fail to sync with this approach.
-                # We will fix this by allowing "Client Side ID" in a future migration (UUID).
-                # For now, just handle Updates.
-                
-                # ... actually, let's just Create it if it doesn't exist, and let the DB assign ID, 
-                # but then we have a mismatch.
-                # Skip creation in sync for now. Focus on Updating status/position offline.
-                # Or, implement a 'created_temp' logic.
-                pass
-                
-        except Exception as e:
-            print(f"Sync error for doc {doc}: {e}")
-            
+    for doc, assumed, check_conflict in changes:
+        doc_id = str(doc.get("id", ""))
+        master = masters.get(doc_id)
+        
+        if master is None:
+            # Offline-created document: the client-generated UUID becomes client_id
+            if doc_id and not doc_id.isdigit():
+                inserts[doc_id] = {
+                    "user_id": user.id,
+                    "client_id": doc_id,
+                    "title": doc.get("title") or "",
+                    "description": doc.get("description") or "",
+                    "status": doc.get("status") or "ready",
+                    "source": doc.get("source") or "manual",
+                    "estimated_time": doc.get("estimated_time") or "",
+                    "prepared_items": doc.get("prepared_items") or "[]",
+                    "position": doc.get("position") or 0,
+                    "rank_key": doc["rank_key"] if is_valid_rank_key(doc.get("rank_key")) else "",
+                    "deleted": bool(doc.get("deleted", False)),
+                    "created_at": _parse_timestamp(doc.get("created_at")) or now,
+                    "updated_at": now,
+                }
+            elif doc_id:
+                # A server id that is not (or no longer) this user's task
+                logger.warning(f"Push for unknown task {doc_id} from user {user.id} ignored")
+            continue
+        
+        if check_conflict and not _assumed_matches(assumed, master):
+            conflicts.append(task_document(master))
+            continue
+        
+        values = {"id": master.id, "updated_at": now}
+        for field in PUSH_FIELDS:
+            values[field] = doc[field] if field in doc else getattr(master, field)
+        if not is_valid_rank_key(values["rank_key"]):
+            values["rank_key"] = master.rank_key
+        # Bulk UPDATE skips the before_update hooks: stamp field versions and daily stats here
+        changed = [f for f in PUSH_FIELDS if values[f] != getattr(master, f)]
+        if "status" in changed:
+            values["completed_at"] = apply_status_change(db.connection(), user.id, master.completed_at, values["status"], now)
+        values["field_versions"] = bump_field_versions(master.field_versions, changed, now, master.updated_at)
+        updates.append(values)
+    
+    if updates:
+        db.execute(update(Task), updates)
+    if inserts:
+        for values in inserts.values():
+            values["completed_at"] = apply_status_change(db.connection(), user.id, None, values["status"], now)
+        db.execute(insert(Task), list(inserts.values()))
+    if updates or inserts:
+        mark_tasks_changed(db, user.id)
     db.commit()
+    
+    # Clients rank moves locally; keys grown long from splitting one gap get re-spaced
+    if any(needs_rebalance(v["rank_key"]) for v in chain(updates, inserts.values())):
+        schedule_rebalance(user.id)
+    
     return {"conflicts": conflicts}
 
+
+
+# --- Provider sync jobs ---
+
+@router.get("/sync/jobs/stream")
+async def stream_sync_jobs(
+    request: Request,
+    job_id: Optional[str] = None,
+    token: Optional[str] = None,
+    authorization: str = Header(None),
+):
+    """
+    Server-Sent Events stream of the user's sync job updates.
+    Each event is the full job state: { job_id, provider, status, pages_fetched, rows_applied, ... }
+    Pass job_id to follow a single job; the stream then ends when it is done or failed.
+    """
+    user_id = _stream_user_id(authorization, token)
+
+    async def event_stream():
+        pubsub = redis_client.get_client().pubsub()
+        await pubsub.subscribe(events_channel(user_id))
+        try:
+            # Replay current state so a job that finished before we subscribed is not missed
+            if job_id:
+                job = await get_job(user_id, job_id)
+                if not job:
+                    yield f"event: error\ndata: {json.dumps({'detail': 'Sync job not found'})}\n\n"
+                    return
+                yield f"event: job\ndata: {json.dumps(job)}\n\n"
+                if job.get("status") in ("done", "failed"):
+                    return
+
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=SSE_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                job = json.loads(message["data"])
+                if job_id and job.get("job_id") != job_id:
+                    continue
+                yield f"event: job\ndata: {message['data']}\n\n"
+                if job_id and job.get("status") in ("done", "failed"):
+                    return
+        finally:
+            await pubsub.unsubscribe(events_channel(user_id))
+            await pubsub.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/sync/jobs/{job_id}")
+async def get_sync_job(
+    job_id: str,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get the status of a provider sync job"""
+    user = get_current_user(authorization, db)
+    job = await get_job(user.id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
@@ -2,15 +2,28 @@
 Tasks Router - Placeholder for team implementation
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Header, Response, Body, Query
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import update
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
+import hashlib
+import json
 
+from app.core.pagination import (
+    FieldMap, PageParams, page_params, paginate, parse_fields, field_columns, render, NEXT_CURSOR_HEADER,
+)
 from app.database import get_db
 from app.models import Task, User
 from app.routers.users import get_current_user
+from app.services.ranking import (
+    rank_between, rank_sequence, rank_unranked_tasks, needs_rebalance, schedule_rebalance,
+)
+from app.services.daily_stats import apply_status_change
+from app.services.task_events import bump_field_versions, mark_tasks_changed
+from app.services.task_search import search_tasks
+from app.services.task_cache import get_task_list_version, get_cached_prepared_tasks, cache_prepared_tasks
 
 router = APIRouter()
 
@@ -32,33 +45,87 @@ class TaskResponse(BaseModel):
 
 # --- Endpoints ---
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))
+
+
+# Sparse fieldset for the list; the heavy description is opt-out via fields=
+TASK_FIELDS: FieldMap = {
+    "id": (Task.id, lambda t: t.id),
+    "title": (Task.title, lambda t: t.title),
+    "description": (Task.description, lambda t: t.description or ""),
+    "preparedItems": (Task.prepared_items, lambda t: []),
+    "estimatedTime": (Task.estimated_time, lambda t: t.estimated_time or "30分"),
+    "source": (Task.source, lambda t: t.source or "manual"),
+    "status": (Task.status, lambda t: t.status),
+    "rankKey": (Task.rank_key, lambda t: t.rank_key),
+    "created_at": (Task.created_at, lambda t: t.created_at.isoformat() if t.created_at else None),
+}
+# Never-ranked tasks ('') come first in their legacy position order
+TASK_ORDER = ((Task.rank_key, False), (Task.position, False), (Task.id, True))
+
+
 @router.get("/prepared-tasks", response_model=List[TaskResponse])
 async def get_tasks(
+    page: PageParams = Depends(page_params),
     authorization: str = Header(None),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get all tasks for current user"""
+    """
+    Get tasks for current user, a page at a time (?limit=&after=&fields=).
+    The ETag is the user's task list version: an unchanged list answers 304,
+    and the serialized page is served from Redis while the version holds.
+    """
     user = get_current_user(authorization, db)
+    fields = parse_fields(page.fields, TASK_FIELDS)
+    
+    version = await get_task_list_version(user.id)
+    headers = {"Cache-Control": "private, no-cache"}
+    if version:
+        # Each page/fieldset is its own representation
+        variant = hashlib.sha1(f"{page.limit}|{page.after}|{fields}".encode("utf-8")).hexdigest()[:12]
+        headers["ETag"] = f'"{user.id}-{version}-{variant}"'
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        cached = await get_cached_prepared_tasks(user.id, version, variant)
+        if cached is not None:
+            next_cursor, body = cached.split("\n", 1)
+            if next_cursor:
+                headers[NEXT_CURSOR_HEADER] = next_cursor
+            return Response(content=body, media_type="application/json", headers=headers)
+
     # Filter out archived/deleted tasks
-    tasks = db.query(Task).filter(
+    query = db.query(Task).filter(
         Task.user_id == user.id,
         Task.status != "archived"
-    ).order_by(Task.position.asc(), Task.id.desc()).all()
-    
-    # Map raw model to response (handling JSON fields if needed)
-    response = []
-    for t in tasks:
-        response.append(TaskResponse(
-            id=t.id,
-            title=t.title,
-            description=t.description or "",
-            prepared_items=[],
-            estimated_time=t.estimated_time or "30分",
-            source=t.source or "manual",
-            status=t.status,
-            created_at=t.created_at
-        ))
-    return response
+    )
+    tasks, next_cursor = paginate(query, TASK_ORDER, page, field_columns(TASK_FIELDS, fields))
+    
+    body = json.dumps(render(tasks, TASK_FIELDS, fields), ensure_ascii=False)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if version:
+        await cache_prepared_tasks(user.id, version, variant, f"{next_cursor or ''}\n{body}")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/tasks/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over the user's tasks (title and description).
+    Every word must match, as a prefix; results are ranked with title hits first.
+    Returns: [{ id, title, description, status, source, score, title_highlight, snippet }]
+    """
+    user = get_current_user(authorization, db)
+    return search_tasks(db, user.id, q, limit)
 
 
 @router.post("/prepared-tasks/{task_id}/start")
@@ -119,6 +186,98 @@ async def delete_task(
     return {"status": "success"}
 
 
+# op -> column values it sets; "update" takes them from fields instead
+BATCH_STATUS_OPS = {
+    "start": {"status": "in-progress"},
+    "complete": {"status": "completed"},
+    "archive": {"status": "archived"},  # same soft delete as DELETE /prepared-tasks/{id}
+}
+BATCH_UPDATE_FIELDS = ("title", "description", "status", "estimated_time", "prepared_items")
+MAX_BATCH_OPERATIONS = 500
+
+
+def _invalid_update_fields(fields: Dict[str, Any]) -> Optional[str]:
+    if not fields:
+        return "No fields"
+    unknown = sorted(set(fields) - set(BATCH_UPDATE_FIELDS))
+    if unknown:
+        return f"Unknown fields: {', '.join(unknown)}"
+    # Every updatable column is a string, and title is required
+    if not all(isinstance(v, str) for v in fields.values()) or fields.get("title", "x") == "":
+        return "Fields must be strings and title must not be empty"
+    return None
+
+
+class BatchOperation(BaseModel):
+    id: int
+    op: Literal["start", "complete", "archive", "update"]
+    fields: Dict[str, Any] = {}
+
+
+@router.post("/prepared-tasks/batch")
+async def batch_tasks(
+    operations: List[BatchOperation] = Body(..., max_length=MAX_BATCH_OPERATIONS),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply many task operations in one transaction.
+    Body: [{ id, op: start|complete|archive|update, fields }, ...]
+    Tasks are loaded with one query and each op type is written with one
+    bulk UPDATE. Invalid items are reported and skipped; the rest commit together.
+    Returns: { results: [{ id, op, status: ok|not_found|invalid, detail? }] }
+    """
+    user = get_current_user(authorization, db)
+    
+    ids = {operation.id for operation in operations}
+    tasks = {t.id: t for t in db.query(Task).filter(Task.user_id == user.id, Task.id.in_(ids)).all()}
+    
+    now = datetime.utcnow()
+    results = []
+    rows_by_op: Dict[str, list] = {}
+    seen = set()
+    for operation in operations:
+        result = {"id": operation.id, "op": operation.op, "status": "ok"}
+        results.append(result)
+        task = tasks.get(operation.id)
+        
+        if task is None:
+            result["status"] = "not_found"
+            continue
+        if operation.id in seen:
+            result.update(status="invalid", detail="Task appears more than once in the batch")
+            continue
+        
+        if operation.op == "update":
+            detail = _invalid_update_fields(operation.fields)
+            if detail:
+                result.update(status="invalid", detail=detail)
+                continue
+            values = dict(operation.fields)
+        else:
+            values = dict(BATCH_STATUS_OPS[operation.op])
+        
+        seen.add(operation.id)
+        # Bulk UPDATE skips the before_update hooks: stamp field versions and daily stats here
+        changed = [f for f, v in values.items() if getattr(task, f) != v]
+        if "status" in changed:
+            values["completed_at"] = apply_status_change(db.connection(), user.id, task.completed_at, values["status"], now)
+        rows_by_op.setdefault(operation.op, []).append({
+            "id": task.id,
+            **values,
+            "updated_at": now,
+            "field_versions": bump_field_versions(task.field_versions, changed, now, task.updated_at),
+        })
+    
+    for rows in rows_by_op.values():
+        db.execute(update(Task), rows)
+    if rows_by_op:
+        mark_tasks_changed(db, user.id)
+    db.commit()
+    
+    return {"results": results}
+
+
 class ReorderRequest(BaseModel):
     task_ids: List[int]
 
@@ -129,7 +288,10 @@ async def reorder_tasks(
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Reorder tasks based on the provided list of IDs"""
+    """
+    Reorder tasks based on the provided list of IDs.
+    Rewrites every listed row; a single drag should use POST /prepared-tasks/{id}/move.
+    """
     user = get_current_user(authorization, db)
     
     # Verify all tasks belong to user
@@ -139,11 +301,74 @@ async def reorder_tasks(
     ).all()
     
     task_map = {t.id: t for t in tasks}
+    ordered = [task_map[task_id] for task_id in request.task_ids if task_id in task_map]
     
-    # Update positions
-    for index, task_id in enumerate(request.task_ids):
-        if task_id in task_map:
-            task_map[task_id].position = index
+    # Update positions (and rank keys, which the list is sorted by)
+    for index, (task, key) in enumerate(zip(ordered, rank_sequence(len(ordered)))):
+        task.position = index
+        task.rank_key = key
             
     db.commit()
     return {"status": "success"}
+
+
+class MoveRequest(BaseModel):
+    # Neighbours after the move: after_id ends up directly above, before_id directly below.
+    # Either one is enough; neither moves the task to the top.
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
+
+
+@router.post("/prepared-tasks/{task_id}/move")
+async def move_task(
+    task_id: int,
+    request: MoveRequest,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Move a task between two others (after_id above it, before_id below it).
+    Only the moved task is written: it gets a rank key between its neighbours'.
+    Returns: { status, task_id, rank_key }
+    """
+    user = get_current_user(authorization, db)
+    
+    # One-time: tasks never ranked need keys before anything can sit between them
+    if rank_unranked_tasks(db, user.id):
+        db.flush()
+    
+    ids = {task_id, request.after_id, request.before_id} - {None}
+    tasks = {t.id: t for t in db.query(Task).filter(Task.user_id == user.id, Task.id.in_(ids)).all()}
+    if len(tasks) != len(ids):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    task = tasks[task_id]
+    after = tasks.get(request.after_id)
+    before = tasks.get(request.before_id)
+    others = db.query(Task.rank_key).filter(Task.user_id == user.id, Task.id != task_id)
+    
+    # A missing neighbour is whichever task is currently adjacent to the given one
+    if after:
+        lo = after.rank_key
+    elif before:
+        lo = others.filter(Task.rank_key < before.rank_key).order_by(Task.rank_key.desc()).limit(1).scalar()
+    else:
+        lo = None
+    if before:
+        hi = before.rank_key
+    else:
+        query = others.filter(Task.rank_key > lo) if lo else others
+        hi = query.order_by(Task.rank_key.asc()).limit(1).scalar()
+    
+    try:
+        task.rank_key = rank_between(lo, hi)
+    except ValueError:
+        # Stale client view, or duplicate keys from concurrent moves
+        db.rollback()
+        schedule_rebalance(user.id)
+        raise HTTPException(status_code=409, detail="Neighbouring tasks are out of order")
+    db.commit()
+    
+    if needs_rebalance(task.rank_key):
+        schedule_rebalance(user.id)
+    return {"status": "success", "task_id": task.id, "rank_key": task.rank_key}
@@ -3,7 +3,7 @@ Todoist Integration Router
 Sync Todoist tasks
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 import logging
 import httpx
@@ -11,6 +11,8 @@ import httpx
 from app.database import get_db, SessionLocal
 from app.models import User, OAuthToken, Task
 from app.routers.users import get_current_user
+from app.services.sync_jobs import enqueue_sync_job, noop_progress, ProgressCallback
+from app.services.change_detection import apply_if_changed, new_synced_task
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -31,7 +33,7 @@ async def get_todoist_token(user_id: int, db: Session) -> str:
     return decrypt_token(token.access_token)
 
 
-async def sync_todoist_tasks_task(user_id: int):
+async def sync_todoist_tasks_task(user_id: int, progress: ProgressCallback = noop_progress):
     """Background task for Todoist sync"""
     db = SessionLocal()
     try:
@@ -56,6 +58,7 @@ async def sync_todoist_tasks_task(user_id: int):
                 return
                 
             tasks = response.json()
+        progress(pages_fetched=1, items_fetched=len(tasks))
         
         if not tasks:
             logger.info(f"No Todoist tasks found for user {user_id}")
@@ -63,6 +66,8 @@ async def sync_todoist_tasks_task(user_id: int):
 
         # 3. Save to DB
         imported_count = 0
+        applied = 0
+        skipped = 0
         for t in tasks:
             # Check for duplicates (using Todoist ID in title or separate field? We use title/source for now)
             # Better: store external_id if model supported it.
@@ -82,42 +87,46 @@ async def sync_todoist_tasks_task(user_id: int):
             due = t.get("due")
             estimated_time = due.get("string") if due else "30分"
             
+            fields = {
+                "title": t.get("content"),
+                "description": description,
+                "status": "done" if t.get("is_completed") else "ready",
+                "estimated_time": estimated_time,
+            }
+            
             if existing:
-                # Update
-                existing.title = t.get("content")
-                existing.description = description
-                existing.status = "done" if t.get("is_completed") else "ready"
-                existing.estimated_time = estimated_time
+                # Update only if the upstream content changed
+                if apply_if_changed(existing, fields):
+                    applied += 1
+                else:
+                    skipped += 1
             else:
                 # Create
-                new_task = Task(
-                    user_id=user_id,
-                    title=t.get("content"),
-                    description=description,
-                    status="ready",
-                    source="todoist",
-                    estimated_time=estimated_time,
-                )
-                db.add(new_task)
+                # New tasks start as "ready" whatever their upstream state; the
+                # next sync applies it (the hash records what was written)
+                db.add(new_synced_task(user_id, "todoist", fields, status="ready"))
                 imported_count += 1
+                applied += 1
         
         db.commit()
-        logger.info(f"Synced {imported_count} Todoist tasks for user {user_id}")
+        progress(rows_applied=applied, rows_skipped=skipped)
+        logger.info(f"Synced {imported_count} Todoist tasks for user {user_id} ({skipped} unchanged skipped)")
+        return imported_count
 
     except Exception as e:
         logger.error(f"Error syncing Todoist: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
 @router.post("/todoist/sync")
 async def sync_todoist_tasks(
-    background_tasks: BackgroundTasks,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     """Trigger Todoist sync manually"""
     user = get_current_user(authorization, db)
-    background_tasks.add_task(sync_todoist_tasks_task, user.id)
-    return {"message": "Todoist sync started in background"}
+    job = await enqueue_sync_job(user.id, "todoist")
+    return {"message": "Todoist sync started in background", **job}
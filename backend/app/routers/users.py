@@ -11,6 +11,7 @@ from jose import jwt, JWTError
 from app.database import get_db
 from app.models import User, OAuthToken
 from app.routers.login import SECRET_KEY, ALGORITHM
+from app.services.daily_stats import is_valid_timezone, schedule_daily_stats_backfill
 
 router = APIRouter()
 
@@ -21,6 +22,7 @@ class UserProfile(BaseModel):
     name: str
     avatar_url: str
     bio: str
+    timezone: str
     connected_services: list[str]
 
     class Config:
@@ -32,6 +34,7 @@ class UpdateProfileRequest(BaseModel):
     email: Optional[str] = None
     avatar_url: Optional[str] = None
     bio: Optional[str] = None
+    timezone: Optional[str] = None  # IANA name, e.g. "Asia/Tokyo"
 
 
 def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
@@ -74,6 +77,7 @@ async def get_my_profile(
         name=user.name or "",
         avatar_url=user.avatar_url or "",
         bio=user.bio or "",
+        timezone=user.timezone or "UTC",
         connected_services=connected_services,
     )
 
@@ -100,9 +104,19 @@ async def update_my_profile(
         user.avatar_url = request.avatar_url
     if request.bio is not None:
         user.bio = request.bio
+    timezone_changed = False
+    if request.timezone is not None and request.timezone != user.timezone:
+        if not is_valid_timezone(request.timezone):
+            raise HTTPException(status_code=400, detail="無効なタイムゾーンです")
+        user.timezone = request.timezone
+        timezone_changed = True
     
     db.commit()
     db.refresh(user)
+
+    if timezone_changed:
+        # Past days were bucketed in the old timezone
+        schedule_daily_stats_backfill(user.id)
     
     # Get connected services
     oauth_tokens = db.query(OAuthToken).filter(OAuthToken.user_id == user.id).all()
@@ -114,5 +128,6 @@ async def update_my_profile(
         name=user.name or "",
         avatar_url=user.avatar_url or "",
         bio=user.bio or "",
+        timezone=user.timezone or "UTC",
         connected_services=connected_services,
     )
@@ -26,9 +26,8 @@ class AutonomyService:
         logger.info(f"Running autonomous loop for user {user_id}")
         
         # 1. Gather Context
-        # A. RAG Context (Calendar, Emails, etc.)
-        # A. RAG Context (Calendar, Emails, etc.)
-        rag_results = await self.rag.query_codebase("What are my upcoming events, recent emails, and slack conversations?", n_results=10)
+        # A. RAG Context (this user's Calendar, Emails, etc.)
+        rag_results = await self.rag.query_user_context(user_id, "What are my upcoming events, recent emails, and slack conversations?", n_results=10)
         # rag_context = "\n".join([f"- {r['content']} (Source: {r['source']})" for r in rag_results])
         rag_context = rag_results # Pass list of dicts directly
         
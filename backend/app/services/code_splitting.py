@@ -0,0 +1,104 @@
+"""
+Code Splitting
+Read and split one source file, in a worker process
+
+Splitters follow the file's language (function/class boundaries first,
+then blank lines), so a chunk is a coherent piece of code rather than an
+arbitrary 1000-character window. Kept free of app imports: this module
+is loaded by every process-pool worker.
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+MAX_FILE_BYTES = 1_000_000  # generated bundles, lockfiles, dumps
+
+LANGUAGES: Dict[str, Language] = {
+    ".py": Language.PYTHON,
+    ".ts": Language.TS,
+    ".tsx": Language.TS,
+    ".js": Language.JS,
+    ".jsx": Language.JS,
+    ".mjs": Language.JS,
+    ".md": Language.MARKDOWN,
+    ".go": Language.GO,
+    ".java": Language.JAVA,
+    ".kt": Language.KOTLIN,
+    ".rs": Language.RUST,
+    ".rb": Language.RUBY,
+    ".php": Language.PHP,
+    ".html": Language.HTML,
+    ".c": Language.C,
+    ".h": Language.C,
+    ".cpp": Language.CPP,
+    ".hpp": Language.CPP,
+    ".cs": Language.CSHARP,
+    ".swift": Language.SWIFT,
+    ".scala": Language.SCALA,
+    ".lua": Language.LUA,
+    ".sol": Language.SOL,
+}
+
+# Ingested with the generic splitter
+PLAIN_TEXT = {
+    ".json", ".yaml", ".yml", ".toml", ".sql", ".sh", ".css", ".txt", ".ini", ".cfg",
+}
+PLAIN_TEXT_NAMES = {"Dockerfile", "Makefile"}
+
+_splitters: Dict[Optional[Language], RecursiveCharacterTextSplitter] = {}
+
+
+def language_for(path: str) -> Optional[str]:
+    """Language name used for splitting, "text" for plain text, None if not ingested"""
+    name = os.path.basename(path)
+    ext = os.path.splitext(name)[1].lower()
+    if ext in LANGUAGES:
+        return LANGUAGES[ext].value
+    if ext in PLAIN_TEXT or name in PLAIN_TEXT_NAMES:
+        return "text"
+    return None
+
+
+def _splitter(language: Optional[Language]) -> RecursiveCharacterTextSplitter:
+    if language not in _splitters:
+        if language is None:
+            _splitters[language] = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        else:
+            _splitters[language] = RecursiveCharacterTextSplitter.from_language(
+                language, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+            )
+    return _splitters[language]
+
+
+def read_and_split(root: str, path: str, known_sha: Optional[str] = None) -> Tuple[str, Optional[str], Optional[List[str]]]:
+    """
+    Returns: (path, sha256, pieces).
+    pieces is None when the content still matches known_sha (only the mtime
+    moved) and [] for binary or oversized files; sha256 is None if the file
+    could not be read.
+    """
+    try:
+        with open(os.path.join(root, path), "rb") as f:
+            raw = f.read(MAX_FILE_BYTES + 1)
+    except OSError:
+        return path, None, None
+
+    sha = hashlib.sha256(raw).hexdigest()
+    if sha == known_sha:
+        return path, sha, None
+    if len(raw) > MAX_FILE_BYTES or b"\0" in raw[:8192]:
+        return path, sha, []
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return path, sha, []
+
+    ext = os.path.splitext(path)[1].lower()
+    pieces = _splitter(LANGUAGES.get(ext)).split_text(content)
+    # The path makes a chunk findable by file name and tells the reader where it came from
+    return path, sha, [f"File: {path}\n{piece}" for piece in pieces if piece.strip()]
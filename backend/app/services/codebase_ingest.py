@@ -0,0 +1,230 @@
+"""
+Codebase Ingestion
+Incremental, parallel ingestion of a source tree into the shared RAG corpus
+
+The tree is listed the way git sees it (.gitignore honoured), and a
+manifest (codebase_files) keeps each file's mtime, sha256, chunk count and
+embedding model from the last run: only files whose mtime moved are read,
+only those whose content changed are split and embedded (all of them after
+an embedding provider switch), so re-ingesting an unchanged repo
+is a walk and a stat per file. Reading and splitting run in a process pool
+(code_splitting); chunks stream into RAGService.ingest_documents in
+batches as files finish, so embedding starts before the walk is done.
+"""
+
+import asyncio
+import fnmatch
+import logging
+import multiprocessing
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.services import rag_cache
+from app.services.code_splitting import language_for, read_and_split
+from app.services.rag_service import chunk_id
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "codebase"
+BATCH_CHUNKS = 256
+MAX_WORKERS = 8
+# Never worth ingesting, ignored or not
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".next", "venv", ".venv", "dist", "build"}
+
+
+def source_id(root: str, path: str) -> str:
+    """Chunk source id of a file: two ingested roots never share chunk rows"""
+    return f"{root}:{path}"
+
+
+def list_source_files(root: str) -> List[str]:
+    """Ingestible files under root, as relative paths (git's view of the tree when available)"""
+    paths = _git_ls_files(root)
+    if paths is None:
+        paths = _walk(root)
+    return sorted(
+        p for p in paths
+        if language_for(p) and not SKIP_DIRS.intersection(p.split("/")[:-1])
+    )
+
+
+def _git_ls_files(root: str) -> Optional[List[str]]:
+    try:
+        result = subprocess.run(
+            ["git", "-C", root, "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True, timeout=60,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return [p for p in result.stdout.decode("utf-8", "surrogateescape").split("\0") if p]
+
+
+def _parse_gitignore(path: str, base: str) -> List[Tuple[str, str, bool, bool, bool]]:
+    """Rules as (base dir, pattern, negated, directories only, anchored)"""
+    rules = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        pattern = line.rstrip("/")
+        # A pattern with a slash is relative to its .gitignore's directory
+        anchored = "/" in pattern
+        rules.append((base, pattern.lstrip("/"), negated, dir_only, anchored))
+    return rules
+
+
+def _ignored(rules, rel: str, is_dir: bool) -> bool:
+    """Last matching rule wins; ignored directories are pruned by the caller"""
+    ignored = False
+    for base, pattern, negated, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if base and not rel.startswith(base + "/"):
+            continue
+        local = rel[len(base) + 1:] if base else rel
+        if fnmatch.fnmatchcase(local if anchored else local.rsplit("/", 1)[-1], pattern):
+            ignored = not negated
+    return ignored
+
+
+def _walk(root: str) -> List[str]:
+    """Fallback for trees that are not git checkouts: a minimal .gitignore matcher"""
+    paths, rules = [], []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+        if ".gitignore" in filenames:
+            rules = rules + _parse_gitignore(os.path.join(dirpath, ".gitignore"), rel_dir)
+        join = (lambda name: f"{rel_dir}/{name}") if rel_dir else (lambda name: name)
+        dirnames[:] = sorted(
+            d for d in dirnames if d not in SKIP_DIRS and not _ignored(rules, join(d), True)
+        )
+        paths.extend(join(name) for name in filenames if not _ignored(rules, join(name), False))
+    return paths
+
+
+def _stat_files(root: str, paths: List[str]) -> Dict[str, float]:
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(os.path.join(root, path)).st_mtime
+        except OSError:
+            continue  # tracked but deleted in the working tree
+    return mtimes
+
+
+def _load_manifest(session_factory, root: str) -> Dict[str, Tuple[float, str, int, Optional[str]]]:
+    from app.models import CodebaseFile
+
+    db = session_factory()
+    try:
+        rows = db.query(CodebaseFile).filter(CodebaseFile.root == root)
+        return {row.path: (row.mtime, row.sha256, row.chunks, row.embedding_model) for row in rows}
+    finally:
+        db.close()
+
+
+def _save_manifest(
+    session_factory, root: str, updates: Dict[str, Tuple[float, str, int, str]], removed: List[str]
+) -> None:
+    from app.models import CodebaseFile
+
+    db = session_factory()
+    try:
+        for path in removed:
+            db.query(CodebaseFile).filter(CodebaseFile.root == root, CodebaseFile.path == path).delete()
+        for path, (mtime, sha, chunks, model) in updates.items():
+            db.merge(CodebaseFile(root=root, path=path, mtime=mtime, sha256=sha, chunks=chunks, embedding_model=model))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def ingest_codebase(rag, root_path: str = ".", session_factory=None, max_workers: Optional[int] = None) -> int:
+    """
+    Bring the shared corpus in line with the tree at root_path.
+    Returns the number of chunks of re-read files whose content changed (0
+    for an unchanged tree); unchanged chunks among them are not re-embedded.
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+
+    root = os.path.realpath(root_path)
+    paths = await asyncio.to_thread(list_source_files, root)
+    mtimes = await asyncio.to_thread(_stat_files, root, paths)
+    manifest = await asyncio.to_thread(_load_manifest, session_factory, root)
+
+    # A provider switch makes every file stale: its chunks hold the old provider's vectors
+    model = rag.embedding_model
+    reembed = {p for p, entry in manifest.items() if entry[3] != model}
+    candidates = [p for p, mtime in mtimes.items() if p not in manifest or manifest[p][0] != mtime or p in reembed]
+    removed = [p for p in manifest if p not in mtimes]
+    updates: Dict[str, Tuple[float, str, int, str]] = {}
+    stale_ids: List[str] = []
+    reingested = 0
+
+    if candidates:
+        workers = max_workers or min(MAX_WORKERS, os.cpu_count() or 1, len(candidates))
+        loop = asyncio.get_running_loop()
+        # spawn: forking a process with a running event loop and DB pools is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                loop.run_in_executor(
+                    pool, read_and_split, root, path, None if path in reembed else manifest.get(path, (None, None))[1]
+                )
+                for path in candidates
+            ]
+            batch, batch_chunks = [], 0
+            for future in asyncio.as_completed(futures):
+                path, sha, pieces = await future
+                if sha is None:
+                    continue
+                previous = manifest.get(path, (None, None, 0))[2]
+                if pieces is None:
+                    # Touched, not changed
+                    updates[path] = (mtimes[path], sha, previous, model)
+                    continue
+                updates[path] = (mtimes[path], sha, len(pieces), model)
+                stale_ids.extend(chunk_id(None, SOURCE, source_id(root, path), i) for i in range(len(pieces), previous))
+                if pieces:
+                    batch.append({
+                        "id": source_id(root, path),
+                        "content": "",
+                        "chunks": pieces,
+                        "metadata": {"source": SOURCE, "root": root, "path": path, "language": language_for(path)},
+                    })
+                    batch_chunks += len(pieces)
+                    reingested += len(pieces)
+                if batch_chunks >= BATCH_CHUNKS:
+                    await rag.ingest_documents(batch)
+                    batch, batch_chunks = [], 0
+            if batch:
+                await rag.ingest_documents(batch)
+
+    for path in removed:
+        stale_ids.extend(chunk_id(None, SOURCE, source_id(root, path), i) for i in range(manifest[path][2]))
+    if stale_ids:
+        await rag.delete_chunks(stale_ids)
+        await asyncio.to_thread(rag_cache.bump_corpus_versions, [rag_cache.owner_key(None)])
+
+    if updates or removed:
+        await asyncio.to_thread(_save_manifest, session_factory, root, updates, removed)
+    logger.info(
+        f"Codebase ingest of {root}: {len(paths)} files, {len(candidates)} re-read, "
+        f"{reingested} chunks re-ingested, {len(removed)} removed"
+    )
+    return reingested
@@ -0,0 +1,267 @@
+"""
+Daily Stats Service
+Incrementally maintained user_daily_stats rollup
+
+Mapper hooks bump (user_id, day) counters on the same connection, and so
+in the same transaction, as the write that caused them:
+- a task becoming completed (+1 on that day; Task.completed_at records it)
+- a completed task going back to an active status (-1 on its completion day)
+- a focus session being recorded
+Archiving keeps the count: the work was still done that day.
+Bulk UPDATE/INSERT paths that bypass the ORM call apply_status_change().
+Stats endpoints then read O(days) rows instead of scanning tasks.
+
+Days are the user's local calendar days (User.timezone), bucketed in SQL:
+AT TIME ZONE on PostgreSQL, a local_date() function registered on SQLite
+connections in lite mode. Changing the timezone rebuilds the user's rollup.
+"""
+
+import logging
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+import pytz
+from sqlalchemy import Date, DateTime, bindparam, cast, event, func, inspect, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Task, FocusSession, User, UserDailyStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEZONE = "UTC"
+
+# Local calendar day of a naive UTC timestamp in an IANA zone
+_LOCAL_DAY_SQL = {
+    "postgresql": "CAST(timezone({tz}, timezone('UTC', CAST({ts} AS TIMESTAMP))) AS DATE)",
+    "sqlite": "local_date({ts}, {tz})",
+}
+
+# Plain ON CONFLICT upsert (SQLite 3.24+); the day comes from users.timezone
+_UPSERT_SQL = """
+    INSERT INTO user_daily_stats (user_id, day, tasks_completed, focus_minutes)
+    SELECT id, {day}, :tasks_completed, :focus_minutes
+    FROM users WHERE id = :user_id
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        tasks_completed = user_daily_stats.tasks_completed + excluded.tasks_completed,
+        focus_minutes = user_daily_stats.focus_minutes + excluded.focus_minutes
+"""
+
+
+def get_timezone(name: Optional[str]):
+    try:
+        return pytz.timezone(name or DEFAULT_TIMEZONE)
+    except pytz.UnknownTimeZoneError:
+        return pytz.utc
+
+
+def is_valid_timezone(name: str) -> bool:
+    return name in pytz.all_timezones_set
+
+
+def local_today(tz_name: Optional[str], now: Optional[datetime] = None) -> date:
+    """The user's current calendar day"""
+    moment = pytz.utc.localize(now or datetime.utcnow())
+    return moment.astimezone(get_timezone(tz_name)).date()
+
+
+def _sqlite_local_date(value, tz_name):
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return pytz.utc.localize(moment.replace(tzinfo=None)).astimezone(get_timezone(tz_name)).date().isoformat()
+
+
+def _install_sqlite_functions(dbapi_connection, connection_record) -> None:
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function("local_date", 2, _sqlite_local_date, deterministic=True)
+
+
+def _dialect_name(bind) -> str:
+    name = bind.dialect.name
+    return name if name in _LOCAL_DAY_SQL else "sqlite"
+
+
+def local_day(column, tz_column, dialect_name: str):
+    """SQL expression: the local day of a UTC timestamp column (a string on SQLite)"""
+    if dialect_name == "postgresql":
+        return cast(func.timezone(tz_column, func.timezone("UTC", column)), Date)
+    return func.local_date(column, tz_column)
+
+
+def bump_daily_stats(connection, user_id: int, moment: datetime, tasks_completed: int = 0, focus_minutes: int = 0) -> None:
+    day = _LOCAL_DAY_SQL[_dialect_name(connection)].format(ts=":moment", tz="users.timezone")
+    sql = text(_UPSERT_SQL.format(day=day)).bindparams(bindparam("moment", type_=DateTime))
+    connection.execute(sql, {
+        "user_id": user_id,
+        "moment": moment,
+        "tasks_completed": tasks_completed,
+        "focus_minutes": focus_minutes,
+    })
+
+
+def apply_status_change(
+    connection,
+    user_id: int,
+    completed_at: Optional[datetime],
+    new_status: str,
+    now: datetime,
+) -> Optional[datetime]:
+    """
+    Keep the rollup in step with a task's new status.
+    completed_at marks a task already counted. Returns its new completed_at.
+    """
+    if new_status == "completed":
+        if completed_at is None:
+            bump_daily_stats(connection, user_id, now, tasks_completed=1)
+            return now
+        return completed_at
+    if new_status == "archived":
+        return completed_at
+    if completed_at is not None:
+        bump_daily_stats(connection, user_id, completed_at, tasks_completed=-1)
+    return None
+
+
+def _task_before_insert(mapper, connection, target) -> None:
+    if target.status == "completed" and target.completed_at is None:
+        target.completed_at = datetime.utcnow()
+
+
+def _task_after_insert(mapper, connection, target) -> None:
+    # An archived task imported with its completion date still counts
+    if target.completed_at is not None and target.status in ("completed", "archived"):
+        bump_daily_stats(connection, target.user_id, target.completed_at, tasks_completed=1)
+
+
+def _task_before_update(mapper, connection, target) -> None:
+    if inspect(target).attrs.status.history.has_changes():
+        target.completed_at = apply_status_change(
+            connection, target.user_id, target.completed_at, target.status, datetime.utcnow()
+        )
+
+
+def _focus_session_after_insert(mapper, connection, target) -> None:
+    bump_daily_stats(
+        connection, target.user_id, target.completed_at or datetime.utcnow(),
+        focus_minutes=target.duration_minutes or 0,
+    )
+
+
+def register_daily_stats_events() -> None:
+    """Attach the rollup hooks (mapper events are global, so only once)"""
+    if event.contains(Task, "after_insert", _task_after_insert):
+        return
+    event.listen(Engine, "connect", _install_sqlite_functions)
+    event.listen(Task, "before_insert", _task_before_insert)
+    event.listen(Task, "after_insert", _task_after_insert)
+    event.listen(Task, "before_update", _task_before_update)
+    event.listen(FocusSession, "after_insert", _focus_session_after_insert)
+
+
+def get_daily_stats(db: Session, user_id: int, start: date, end: date) -> Dict[date, UserDailyStats]:
+    """Rollup rows for start..end inclusive, keyed by day (missing days had no activity)"""
+    rows = db.query(UserDailyStats).filter(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.day >= start,
+        UserDailyStats.day <= end,
+    ).all()
+    return {row.day: row for row in rows}
+
+
+# Gaps and islands: over consecutive active days, day minus its row number is
+# constant, so each run of days collapses into one group. A single indexed
+# range scan of the user's rollup rows, however long the history.
+_STREAKS_SQL = """
+    WITH active AS (
+        SELECT day, {day_number} - ROW_NUMBER() OVER (ORDER BY day) AS island
+        FROM user_daily_stats
+        WHERE user_id = :user_id AND day <= :today
+          AND (tasks_completed > 0 OR focus_minutes > 0)
+    ),
+    islands AS (
+        SELECT MAX(day) AS last_day, COUNT(*) AS length
+        FROM active
+        GROUP BY island
+    )
+    SELECT
+        COALESCE(MAX(length), 0) AS longest,
+        COALESCE(MAX(CASE WHEN last_day >= :yesterday THEN length END), 0) AS current
+    FROM islands
+"""
+
+_DAY_NUMBER = {
+    "postgresql": "(day - DATE '2000-01-01')",
+    "sqlite": "CAST(julianday(day) AS INTEGER)",
+}
+
+
+def schedule_daily_stats_backfill(user_id: int) -> None:
+    """Best-effort: queue a rebuild of the user's rollup (e.g. after a timezone change)"""
+    try:
+        from app.worker import backfill_daily_stats_task
+        backfill_daily_stats_task.delay(user_id)
+    except Exception as e:
+        logger.warning(f"Could not schedule daily stats backfill for user {user_id}: {e}")
+
+
+def get_streaks(db: Session, user_id: int, today: date) -> Dict[str, int]:
+    """
+    Consecutive active days (any completed task or focus time).
+    The current streak still counts if today has no activity yet but yesterday did.
+    Returns: { current, longest }
+    """
+    sql = text(_STREAKS_SQL.format(day_number=_DAY_NUMBER.get(db.bind.dialect.name, _DAY_NUMBER["sqlite"])))
+    sql = sql.bindparams(bindparam("today", type_=Date), bindparam("yesterday", type_=Date))
+    row = db.execute(sql, {"user_id": user_id, "today": today, "yesterday": today - timedelta(days=1)}).one()
+    return {"current": int(row.current), "longest": int(row.longest)}
+
+
+def _as_date(value) -> date:
+    # Local days come back as strings on SQLite and dates on PostgreSQL
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def backfill_daily_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Rebuild the rollup from tasks and focus sessions (all users, or one).
+    Completed tasks without completed_at are dated by updated_at, as the
+    old stats queries did. Returns the number of rollup rows written.
+    """
+    task_filter = [Task.status == "completed", Task.completed_at.is_(None)]
+    if user_id is not None:
+        task_filter.append(Task.user_id == user_id)
+    # Core UPDATE: no hooks, nothing is re-counted. updated_at is pinned, or its
+    # onupdate default would move every row past the pull checkpoints; completed_at
+    # is in no client payload, so there is nothing to replicate or publish
+    db.execute(update(Task).where(*task_filter).values(completed_at=Task.updated_at, updated_at=Task.updated_at))
+
+    dialect_name = _dialect_name(db.bind)
+    completion_day = local_day(Task.completed_at, User.timezone, dialect_name)
+    focus_day = local_day(FocusSession.completed_at, User.timezone, dialect_name)
+    completions = db.query(Task.user_id, completion_day, func.count(Task.id)).join(
+        User, User.id == Task.user_id
+    ).filter(Task.completed_at.isnot(None), Task.status.in_(("completed", "archived")))
+    focus = db.query(FocusSession.user_id, focus_day, func.sum(FocusSession.duration_minutes)).join(
+        User, User.id == FocusSession.user_id
+    ).filter(FocusSession.completed_at.isnot(None))
+    stale = db.query(UserDailyStats)
+    if user_id is not None:
+        completions = completions.filter(Task.user_id == user_id)
+        focus = focus.filter(FocusSession.user_id == user_id)
+        stale = stale.filter(UserDailyStats.user_id == user_id)
+
+    totals: Dict[tuple, Dict[str, int]] = {}
+    for uid, day, count in completions.group_by(Task.user_id, completion_day):
+        totals.setdefault((uid, _as_date(day)), {"tasks_completed": 0, "focus_minutes": 0})["tasks_completed"] = count
+    for uid, day, minutes in focus.group_by(FocusSession.user_id, focus_day):
+        totals.setdefault((uid, _as_date(day)), {"tasks_completed": 0, "focus_minutes": 0})["focus_minutes"] = int(minutes or 0)
+
+    stale.delete(synchronize_session=False)
+    db.bulk_insert_mappings(UserDailyStats, [
+        {"user_id": uid, "day": day, **counts} for (uid, day), counts in totals.items()
+    ])
+    db.commit()
+    logger.info(f"Backfilled {len(totals)} daily stats rows" + (f" for user {user_id}" if user_id else ""))
+    return len(totals)
@@ -0,0 +1,131 @@
+"""
+Embedding Batcher
+Async micro-batching in front of a (blocking) embeddings provider
+
+Concurrent ingestion jobs submit chunks with `await batcher.embed(texts)`.
+A collector task drains them into micro-batches, closed at max_batch_size
+texts or max_wait_ms after the first one, and sends each batch to the
+provider's batch API in a worker thread. A semaphore bounds the requests
+in flight, and failed requests are retried with exponential backoff.
+The event loop never blocks on the provider.
+
+Ingestion entry points call `aclose()` when done, so a loop that is about
+to close (Celery's run_async) is not left with a pending collector.
+"""
+
+import asyncio
+import logging
+import random
+from typing import List, Optional, Set, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch_size: int = 100,
+        max_wait_ms: int = 50,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_concurrency = max_concurrency
+        # Queue, semaphore and collector belong to one event loop; Celery
+        # tasks run each job in a fresh loop (asyncio.run), so rebind lazily.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        # Strong references: the loop only keeps weak ones to running tasks
+        self._dispatches: Set[asyncio.Task] = set()
+        self._waiting = 0
+
+    def _ensure_collector(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._dispatches = set()
+            self._collector = loop.create_task(self._collect())
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Vectors for texts, in order (batched together with other callers' texts)"""
+        if not texts:
+            return []
+        self._ensure_collector()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+        self._waiting += 1
+        try:
+            return list(await asyncio.gather(*futures))
+        finally:
+            self._waiting -= 1
+
+    async def aclose(self) -> None:
+        """
+        Stop the collector and wait for in-flight batches. Left running while
+        other callers still wait (concurrent jobs share the batcher); the next
+        embed() starts a new collector.
+        """
+        if self._waiting or self._collector is None or self._loop is not asyncio.get_running_loop():
+            return
+        collector, self._collector = self._collector, None
+        collector.cancel()
+        await asyncio.gather(collector, *self._dispatches, return_exceptions=True)
+
+    async def _collect(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Wait for a slot here, so the queue (not the thread pool) absorbs backpressure
+            await self._semaphore.acquire()
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await self._embed_with_retry([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        finally:
+            self._semaphore.release()
+
+    async def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.to_thread(self.embeddings.embed_documents, texts)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"Embedding batch of {len(texts)} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
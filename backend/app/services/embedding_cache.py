@@ -0,0 +1,173 @@
+"""
+Embedding Cache
+Content-addressed cache in front of the embedding API
+
+Chunks are keyed by (model, sha256(text)), so re-ingesting the same
+calendar events, mails or Slack messages reuses the stored vectors and only
+new text goes to the API. Repeated queries (the autonomy loop asks the same
+question every run) reuse their query vectors the same way. Vectors are stored as float32 bytes, the
+precision pgvector keeps anyway.
+Hits, misses and time spent in the API accumulate in the
+rag:embedding_metrics Redis hash (best-effort) and on the instance.
+"""
+
+import hashlib
+import logging
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List
+
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import text
+
+from app.models import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "rag:embedding_metrics"
+METRIC_FIELDS = ("hits", "misses", "api_requests", "api_ms")
+QUERY_SUFFIX = "#query"
+
+# Bound on the IN (...) list of one lookup
+LOOKUP_BATCH_SIZE = 500
+
+_INSERT = text("""
+    INSERT INTO embedding_cache (model, content_hash, embedding, created_at)
+    VALUES (:model, :content_hash, :embedding, CURRENT_TIMESTAMP)
+    ON CONFLICT (model, content_hash) DO NOTHING
+""")
+
+
+def content_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(data: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends uncached texts to `inner`.
+    Models like Gemini embed queries and documents differently, so query
+    vectors are cached under their own model key (model + QUERY_SUFFIX).
+    """
+
+    def __init__(self, inner: Embeddings, model: str, session_factory):
+        self.inner = inner
+        self.model = model
+        self.query_model = f"{model}{QUERY_SUFFIX}"
+        self.session_factory = session_factory
+        self.stats = dict.fromkeys(METRIC_FIELDS, 0)
+        self._redis = None
+
+    def _load(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        hashes = list(hashes)
+        found = {}
+        db = self.session_factory()
+        try:
+            for i in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                rows = db.query(EmbeddingCache.content_hash, EmbeddingCache.embedding).filter(
+                    EmbeddingCache.model == model,
+                    EmbeddingCache.content_hash.in_(hashes[i:i + LOOKUP_BATCH_SIZE]),
+                )
+                found.update({key: unpack_vector(data) for key, data in rows})
+        finally:
+            db.close()
+        return found
+
+    def _store(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(_INSERT, [
+                {"model": model, "content_hash": key, "embedding": pack_vector(vector)}
+                for key, vector in vectors.items()
+            ])
+            db.commit()
+        finally:
+            db.close()
+
+    def _record(self, model: str, **counts: int) -> None:
+        for field, count in counts.items():
+            self.stats[field] += count
+        try:
+            if self._redis is None:
+                from app.services.sync_jobs import get_sync_redis
+                self._redis = get_sync_redis()
+            pipe = self._redis.pipeline(transaction=False)
+            for field, count in counts.items():
+                if count:
+                    pipe.hincrby(METRICS_KEY, f"{model}:{field}", count)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Embedding metrics not recorded: {e}")
+
+    def _embed_cached(
+        self, model: str, texts: List[str], embed: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        keys = [content_hash(t) for t in texts]
+        try:
+            vectors = self._load(model, set(keys))
+        except Exception as e:
+            # A broken cache must not break ingestion
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            vectors = {}
+
+        # Each distinct uncached text is embedded once, in input order
+        texts_by_key = dict(zip(keys, texts))
+        missing = [key for key in texts_by_key if key not in vectors]
+        api_ms = 0
+        if missing:
+            start = time.perf_counter()
+            fresh = dict(zip(missing, embed([texts_by_key[key] for key in missing])))
+            api_ms = int((time.perf_counter() - start) * 1000)
+            try:
+                self._store(model, fresh)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+            vectors.update(fresh)
+
+        self._record(
+            model,
+            hits=len(texts) - len(missing),
+            misses=len(missing),
+            api_requests=1 if missing else 0,
+            api_ms=api_ms,
+        )
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._embed_cached(self.model, texts, self.inner.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_cached(self.query_model, [text], lambda texts: [self.inner.embed_query(texts[0])])[0]
+
+
+def summarize_metrics(counts: Dict[str, int]) -> Dict[str, float]:
+    """Hit rate plus the API time the hits saved (at the observed ms per embedded chunk)"""
+    hits, misses, api_ms = counts.get("hits", 0), counts.get("misses", 0), counts.get("api_ms", 0)
+    lookups = hits + misses
+    return {
+        **{field: counts.get(field, 0) for field in METRIC_FIELDS},
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "saved_api_ms": round(hits * api_ms / misses) if misses else 0,
+    }
+
+
+def get_embedding_metrics() -> Dict[str, Dict[str, float]]:
+    """Fleet-wide counters per model. Returns: { model: { hits, misses, ..., hit_rate, saved_api_ms } }"""
+    from app.services.sync_jobs import get_sync_redis
+
+    per_model: Dict[str, Dict[str, int]] = {}
+    for name, value in get_sync_redis().hgetall(METRICS_KEY).items():
+        model, _, field = name.rpartition(":")
+        per_model.setdefault(model, {})[field] = int(value)
+    return {model: summarize_metrics(counts) for model, counts in per_model.items()}
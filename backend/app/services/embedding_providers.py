@@ -0,0 +1,87 @@
+"""
+Embedding Providers
+The embedding backends RAGService can run on, selected by settings.embedding_provider
+
+- "gemini": Google's embedding API (the default). Needs GEMINI_API_KEY and
+  sends every chunk and query to Google; wrapped in the embedding cache.
+- "hashing": a deterministic feature-hashing vectorizer on the CPU (NumPy).
+  No network, no key, no model download: for tests, benchmarks, CI and
+  deployments whose data must not leave the host. It matches words and
+  word fragments rather than meaning, so retrieval is closer to keyword
+  search than to the API's.
+Both produce vectors of the column's dimensions. Vectors of different
+providers are not comparable: switching re-embeds every chunk on its next
+ingest (chunks record their embedding_model).
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+GEMINI_EMBEDDING_MODEL = "models/embedding-001"
+
+_TOKEN = re.compile(r"\w+")
+
+# Weight of one character trigram relative to a whole word
+TRIGRAM_WEIGHT = 0.25
+
+
+class EmbeddingProvider(NamedTuple):
+    embeddings: Embeddings
+    model: str  # key in the embedding cache and in chunk metadata
+    remote: bool  # worth caching: a lookup is cheaper than the call
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature: str, dimensions: int) -> Tuple[int, float]:
+    """Index and sign of a feature. blake2b, not hash(): stable across processes and restarts."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dimensions, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Words and their character trigrams ("<ab", "abc", "bc>"), hashed into
+    `dimensions` buckets with a random sign so collisions cancel out rather
+    than pile up; sublinear term frequency, L2-normalized.
+    Queries and documents embed the same way.
+    """
+
+    def __init__(self, dimensions: int = 768):
+        self.dimensions = dimensions
+        self.model = f"hashing-v1-{dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in _TOKEN.findall(text.lower()):
+            index, sign = _bucket(word, self.dimensions)
+            vector[index] += sign
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                index, sign = _bucket(padded[i:i + 3], self.dimensions)
+                vector[index] += sign * TRIGRAM_WEIGHT
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def create_embedding_provider(name: str, dimensions: int, api_key: str = "") -> EmbeddingProvider:
+    if name == "gemini":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        embeddings = GoogleGenerativeAIEmbeddings(model=GEMINI_EMBEDDING_MODEL, google_api_key=api_key)
+        return EmbeddingProvider(embeddings, GEMINI_EMBEDDING_MODEL, remote=True)
+    if name == "hashing":
+        embeddings = HashingEmbeddings(dimensions)
+        return EmbeddingProvider(embeddings, embeddings.model, remote=False)
+    raise ValueError(f"Unknown embedding provider: {name} (expected 'gemini' or 'hashing')")
@@ -1,18 +1,35 @@
+import functools
 import logging
+import time
 from typing import List, Dict
 from sqlalchemy.orm import Session
-from app.services.rag_service import get_rag_service
+from app.services.rag_service import get_rag_service, normalize_timestamp
 from app.models import OAuthToken
 from app.routers.google import fetch_calendar_events # Potential circular import, watching carefully
 from app.services.encryption import decrypt_token
 
 logger = logging.getLogger(__name__)
 
+# maxResults of fetch_calendar_events
+CALENDAR_PAGE_SIZE = 50
+
+def _closes_batcher(method):
+    """Entry points: leave no embedding batcher tasks behind on the (possibly closing) loop"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            await self.rag.aclose()
+    return wrapper
+
+
 class IngestionService:
     def __init__(self, db: Session):
         self.db = db
         self.rag = get_rag_service()
 
+    @_closes_batcher
     async def ingest_user_calendar(self, user_id: int):
         """
         Fetch user's calendar events and ingest into RAG
@@ -33,6 +50,7 @@ class IngestionService:
         # We might want a longer range for "Context".
         try:
             # Re-using router logic. ideally this should be in a separate service layer.
+            fetched_at = time.time()
             events = await fetch_calendar_events(decrypt_token(token.access_token), days=30)
         except Exception as e:
             logger.error(f"Failed to fetch calendar for user {user_id}: {e}")
@@ -47,6 +65,7 @@ class IngestionService:
             # Creative formatting for LLM
             content = f"Calendar Event: {event.title}\nTime: {event.start} to {event.end}\nDescription: {event.description}"
             documents.append({
+                "id": event.id,
                 "content": content,
                 "metadata": {
                     "source": "google_calendar",
@@ -57,16 +76,25 @@ class IngestionService:
                 }
             })
 
-        # 4. Ingest
-        count = await self.rag.ingest_documents(documents)
+        # 4. Ingest. The fetch covers events starting from now for 30 days (up to,
+        # not including, the last start returned when the page is full: events
+        # sharing it may not have fit): events in that range that are gone were
+        # cancelled, earlier ones are past and stay.
+        window_end = fetched_at + 30 * 86400
+        if len(events) >= CALENDAR_PAGE_SIZE:
+            window_end = normalize_timestamp(events[-1].start) or fetched_at
+        count = await self.rag.ingest_documents(
+            documents, user_id=user_id, source="google_calendar", window=(fetched_at, window_end)
+        )
         logger.info(f"Ingested {count} calendar events for user {user_id}")
         return count
 
+    @_closes_batcher
     async def ingest_user_emails(self, user_id: int):
         """
         Fetch user's recent Gmails and ingest into RAG
         """
-        from app.routers.gmail import fetch_gmail_emails
+        from app.routers.gmail import fetch_gmail_messages
         
         token = self.db.query(OAuthToken).filter(
             OAuthToken.user_id == user_id,
@@ -78,7 +106,7 @@ class IngestionService:
             return 0
 
         try:
-            emails = await fetch_gmail_emails(decrypt_token(token.access_token), limit=20)
+            emails, listed = await fetch_gmail_messages(decrypt_token(token.access_token), limit=20)
         except Exception as e:
             logger.error(f"Failed to fetch emails for user {user_id}: {e}")
             return 0
@@ -91,20 +119,30 @@ class IngestionService:
             # Format: "Email from <Sender>: <Subject>\n<Snippet>..."
             content = f"Email from {email.sender}\nSubject: {email.subject}\nSnippet: {email.snippet}"
             documents.append({
+                "id": email.id,
                 "content": content,
                 "metadata": {
                     "source": "gmail",
                     "type": "email",
                     "user_id": str(user_id),
                     "email_id": email.id,
-                    "timestamp": email.date
+                    "date": email.date,
+                    # Receive time: the order Gmail lists mail in (the Date header is sender-set)
+                    "timestamp": email.receivedAt
                 }
             })
 
-        count = await self.rag.ingest_documents(documents)
+        # The latest `limit` mails by receive time: one missing from between the
+        # oldest of them and now was deleted (or left the inbox); older mail is
+        # history. Without every listed mail's details nothing is known missing.
+        timestamps = [e.receivedAt for e in emails if e.receivedAt is not None]
+        complete = len(emails) == listed and len(timestamps) == len(emails)
+        window = (min(timestamps), time.time()) if complete else None
+        count = await self.rag.ingest_documents(documents, user_id=user_id, source="gmail", window=window)
         logger.info(f"Ingested {count} emails for user {user_id}")
         return count
 
+    @_closes_batcher
     async def ingest_user_slack(self, user_id: int):
         """
         Fetch user's recent Slack messages and ingest into RAG
@@ -136,6 +174,7 @@ class IngestionService:
             # Format: "Slack in #<channel>: <message>"
             content = f"Slack in #{msg['channel']}: {msg['text']}"
             documents.append({
+                "id": f"{msg['channel']}:{msg.get('timestamp')}",
                 "content": content,
                 "metadata": {
                     "source": "slack",
@@ -145,6 +184,8 @@ class IngestionService:
                 }
             })
 
+        # No deletions: channels that fail to load are skipped and history is
+        # paged, so a message missing from the fetch is not known to be deleted
         count = await self.rag.ingest_documents(documents)
         logger.info(f"Ingested {count} slack messages for user {user_id}")
         return count
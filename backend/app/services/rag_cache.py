@@ -0,0 +1,96 @@
+"""
+RAG Result Cache
+Retrieval results cached per (owner, query, corpus version)
+
+rag:corpus:<owner> is bumped whenever ingestion writes or deletes chunks
+of that owner (a user id, or "shared" for the codebase), and result sets
+are cached under it: a repeated query is free until new data lands, and a
+stale entry is simply never read again. Time decay moves slowly, so
+entries also expire after RESULT_TTL_SECONDS.
+Everything here is best-effort: without Redis queries run uncached.
+Sync client: callers run these in a thread, next to the vector search.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESULT_TTL_SECONDS = 600
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        from app.services.sync_jobs import get_sync_redis
+        _client = get_sync_redis()
+    return _client
+
+
+def owner_key(user_id) -> str:
+    return str(user_id) if user_id is not None else "shared"
+
+
+def corpus_version_key(owner: str) -> str:
+    return f"rag:corpus:{owner}"
+
+
+def query_hash(query: str, **params) -> str:
+    """Hash of the query text plus everything else that shapes the result"""
+    payload = json.dumps({"query": query, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def result_key(owner: str, version: str, digest: str) -> str:
+    return f"rag:results:{owner}:{version}:{digest}"
+
+
+def _corpus_version(client, owner: str) -> str:
+    # Start from the clock, not 0, so a flushed Redis never re-issues an old version
+    client.set(corpus_version_key(owner), int(time.time() * 1000), nx=True)
+    return client.get(corpus_version_key(owner))
+
+
+def bump_corpus_versions(owners: Iterable[str]) -> None:
+    """Called after ingestion changed chunks of these owners"""
+    owners = set(owners)
+    if not owners:
+        return
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for owner in owners:
+            pipe.set(corpus_version_key(owner), int(time.time() * 1000), nx=True)
+            pipe.incr(corpus_version_key(owner))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"RAG corpus version bump failed for {sorted(owners)}: {e}")
+
+
+def get_cached_results(owner: str, digest: str) -> Tuple[Optional[str], Optional[List[Dict]]]:
+    """
+    Returns: (corpus version, cached results or None).
+    Cache a fresh result under the version read here, before retrieving, so
+    an ingest landing in between cannot file old results under its version.
+    """
+    try:
+        client = _redis()
+        version = _corpus_version(client, owner)
+        cached = client.get(result_key(owner, version, digest))
+        return version, json.loads(cached) if cached is not None else None
+    except Exception as e:
+        logger.debug(f"RAG result cache read failed for {owner}: {e}")
+        return None, None
+
+
+def cache_results(owner: str, version: Optional[str], digest: str, results: List[Dict]) -> None:
+    if version is None:
+        return
+    try:
+        _redis().set(result_key(owner, version, digest), json.dumps(results), ex=RESULT_TTL_SECONDS)
+    except Exception as e:
+        logger.debug(f"RAG result cache write failed for {owner}: {e}")
@@ -1,20 +1,213 @@
 
 import os
 import glob
-from typing import List, Dict
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import asyncio
+import datetime
+import email.utils
+import hashlib
+import logging
+import uuid
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import Float, cast, literal_column, text
 # from langchain_community.vectorstores import Chroma # Removed
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
 from app.config import get_settings
+from app.services import rag_cache
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import CachedEmbeddings
+from app.services.embedding_providers import GEMINI_EMBEDDING_MODEL, create_embedding_provider
+
+logger = logging.getLogger(__name__)
+
+# Fixed so the column can carry an HNSW index (alembic revision a41c9e3d7b20)
+EMBEDDING_DIMENSIONS = 768
+
+# Candidates fetched per result, for the time decay to re-order and the
+# content-hash dedup to collapse (recurring calendar events share text).
+# A query gets fewer than n_results rows only when more than
+# (CANDIDATE_FACTOR - 1) * n_results of its candidates are duplicates.
+CANDIDATE_FACTOR = 3
+
+# Score multiplier per hour of age: distance * (1 + DECAY_RATE * age_hours)
+DECAY_RATE = 0.005
+
+# Owner of a chunk (IngestionService tags user_id; codebase chunks have none).
+# Spelled out literally so the planner matches it to the expression index.
+USER_ID_SQL = "langchain_pg_embedding.cmetadata ->> 'user_id'"
+
+SOURCE_SQL = "langchain_pg_embedding.cmetadata ->> 'source'"
+
+TS_SQL = "langchain_pg_embedding.cmetadata ->> 'ts'"
+
+USER_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_user
+    ON langchain_pg_embedding (collection_id, (cmetadata ->> 'user_id'))
+"""
+
+# Reciprocal rank fusion constant (Cormack et al.): damps the weight of the
+# very top ranks so neither retriever dominates
+RRF_K = 60
+
+# Terms are OR-ed: websearch_to_tsquery ANDs them, which misses chunks that
+# name the identifier but not every other word of the question
+LEXICAL_SQL = """
+    SELECT id, document, cmetadata, ts_rank_cd(document_tsv, query) AS rank
+    FROM langchain_pg_embedding,
+         CAST(replace(CAST(websearch_to_tsquery('simple', :query) AS text), '&', '|') AS tsquery) AS query
+    WHERE collection_id = :collection_id AND {owner_filter} AND document_tsv @@ query
+    ORDER BY rank DESC
+    LIMIT :k
+"""
+
+# Vectors of different providers are not comparable: only the current
+# provider's chunks are searched. Chunks from before embedding_model was
+# recorded all came from Gemini.
+EMBEDDING_MODEL_SQL = f"coalesce(langchain_pg_embedding.cmetadata ->> 'embedding_model', '{GEMINI_EMBEDDING_MODEL}')"
+
+# Nearest chunks by cosine distance (<=>, PGVector's default), through the HNSW index
+VECTOR_SQL = f"""
+    SELECT id, document, cmetadata, embedding <=> CAST(:embedding AS vector) AS distance
+    FROM langchain_pg_embedding
+    WHERE collection_id = :collection_id AND {{owner_filter}} AND {EMBEDDING_MODEL_SQL} = :embedding_model
+    ORDER BY distance
+    LIMIT :k
+"""
+
+# Candidates (:k per retriever) are scored, decayed by the age of their
+# ingest-time "ts", collapsed per content hash and cut to at most
+# :n_results, all in one statement. Rows ingested before ts/content_hash existed fall back
+# to no decay and md5 of the text.
+_AGE_HOURS_SQL = "greatest(0, (:now - coalesce(CAST(cmetadata ->> 'ts' AS double precision), :now)) / 3600.0)"
+_CONTENT_KEY_SQL = "coalesce(cmetadata ->> 'content_hash', md5(document))"
+
+_SCORED_SQL = {
+    # Lower is better: distance grows with age
+    "vector": f"""
+        vector_hits AS ({VECTOR_SQL}),
+        scored AS (
+            SELECT id, document, cmetadata, distance AS score,
+                   distance * (1 + :decay_rate * {_AGE_HOURS_SQL}) AS decayed_score
+            FROM vector_hits
+        )""",
+    # Higher is better: reciprocal rank fusion (sum of 1 / (RRF_K + rank)) shrinks with age
+    "hybrid": f"""
+        vector_hits AS ({VECTOR_SQL}),
+        lexical_hits AS ({LEXICAL_SQL}),
+        fused AS (
+            SELECT coalesce(v.id, l.id) AS id, coalesce(v.document, l.document) AS document,
+                   coalesce(v.cmetadata, l.cmetadata) AS cmetadata,
+                   coalesce(1.0 / (:rrf_k + v.position), 0) + coalesce(1.0 / (:rrf_k + l.position), 0) AS score
+            FROM (SELECT *, row_number() OVER (ORDER BY distance) AS position FROM vector_hits) v
+            FULL OUTER JOIN (SELECT *, row_number() OVER (ORDER BY rank DESC) AS position FROM lexical_hits) l
+                ON v.id = l.id
+        ),
+        scored AS (
+            SELECT id, document, cmetadata, score,
+                   score / (1 + :decay_rate * {_AGE_HOURS_SQL}) AS decayed_score
+            FROM fused
+        )""",
+}
+
+RANKED_SQL = """
+    WITH {scored}
+    SELECT id, document, cmetadata, score, decayed_score
+    FROM (
+        SELECT DISTINCT ON ({content_key}) *
+        FROM scored
+        ORDER BY {content_key}, decayed_score {direction}
+    ) deduped
+    ORDER BY decayed_score {direction}
+    LIMIT :n_results
+"""
+
+
+def normalize_timestamp(value) -> Optional[float]:
+    """
+    Epoch seconds from the timestamps sources hand us: numbers and numeric
+    strings (Slack ts), ISO 8601 (Calendar dateTime / all-day date) and
+    RFC 2822 (Gmail Date header). Naive values are taken as UTC.
+    None when absent or unparseable.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        moment = value
+    elif isinstance(value, (int, float)):
+        return float(value)
+    else:
+        value = str(value).strip()
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            moment = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                moment = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp()
+
+
+def ranked_sql(mode: str, user_id: Optional[int]) -> str:
+    """RANKED_SQL for a retrieval mode ("vector" or "hybrid") and owner (None: shared chunks)"""
+    if mode not in _SCORED_SQL:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    owner_filter = f"{USER_ID_SQL} = :user_id" if user_id is not None else f"{USER_ID_SQL} IS NULL"
+    return RANKED_SQL.format(
+        scored=_SCORED_SQL[mode].format(owner_filter=owner_filter),
+        content_key=_CONTENT_KEY_SQL,
+        direction="ASC" if mode == "vector" else "DESC",
+    )
+
+
+def ranked_params(
+    query: str, embedding: List[float], collection_id, user_id: Optional[int], embedding_model: str, n_results: int
+) -> Dict:
+    return {
+        "query": query,
+        "embedding": "[" + ",".join(str(float(x)) for x in embedding) + "]",
+        "collection_id": collection_id,
+        "user_id": str(user_id),
+        "embedding_model": embedding_model,
+        "k": n_results * CANDIDATE_FACTOR,
+        "n_results": n_results,
+        "now": datetime.datetime.now(datetime.timezone.utc).timestamp(),
+        "decay_rate": DECAY_RATE,
+        "rrf_k": RRF_K,
+    }
+
+
+def chunk_id(user_id, source: Optional[str], source_id: str, chunk_index: int) -> str:
+    """Stable ID of a chunk: the same item re-ingested lands on the same rows"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"rag-chunk:{user_id or ''}:{source or ''}:{source_id}:{chunk_index}"))
+
 
 class RAGService:
 
     def __init__(self):
         settings = get_settings()
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=settings.gemini_api_key
+        provider = create_embedding_provider(
+            settings.embedding_provider, EMBEDDING_DIMENSIONS, api_key=settings.gemini_api_key
+        )
+        self.embedding_model = provider.model
+        self.embeddings = provider.embeddings
+        if provider.remote:
+            # Only chunks the cache has not seen go to the embedding API
+            from app.database import SessionLocal
+            self.embeddings = CachedEmbeddings(self.embeddings, model=provider.model, session_factory=SessionLocal)
+        # Ingestion embeds through shared micro-batches (see embedding_batcher)
+        self.ef_search = settings.rag_ef_search
+        self.iterative_scan = False
+        self.batcher = EmbeddingBatcher(
+            self.embeddings,
+            max_batch_size=settings.embedding_batch_size,
+            max_wait_ms=settings.embedding_batch_wait_ms,
+            max_concurrency=settings.embedding_concurrency,
+            max_retries=settings.embedding_max_retries,
         )
         
         # PGVector connection
@@ -40,8 +233,11 @@ class RAGService:
                 embeddings=self.embeddings,
                 collection_name="dreamcatcher_codebase",
                 connection=self.connection_string,
+                embedding_length=EMBEDDING_DIMENSIONS,
                 use_jsonb=True,
             )
+             self._ensure_user_index()
+             self.iterative_scan = self._supports_iterative_scan()
         except Exception as e:
             # Fallback for build time / if DB not ready
             print(f"PGVector init failed (expected during build): {e}")
@@ -53,9 +249,44 @@ class RAGService:
             separators=["\n\n", "\n", " ", ""]
         )
 
-    async def ingest_documents(self, documents: List[Dict[str, str]]) -> int:
+    def _ensure_user_index(self):
+        """btree on the chunk owner, so per-user searches only visit that user's rows"""
+        with self.vector_store.session_maker() as session:
+            session.execute(text(USER_INDEX_DDL))
+            session.commit()
+
+    def _supports_iterative_scan(self) -> bool:
+        """pgvector 0.8+ can keep walking the HNSW graph until enough rows pass a filter"""
+        with self.vector_store.session_maker() as session:
+            version = session.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+        try:
+            return tuple(int(part) for part in version.split(".")[:2]) >= (0, 8)
+        except (AttributeError, ValueError):
+            return False
+
+    async def ingest_documents(
+        self,
+        documents: List[Dict[str, str]],
+        user_id: Optional[int] = None,
+        source: Optional[str] = None,
+        window: Optional[Tuple[float, float]] = None,
+    ) -> int:
         """
-        Ingest generic documents (text, metadata) into vector store.
+        Ingest generic documents ({ content, metadata, id?, chunks? }) into vector store.
+        chunks: already split pieces (e.g. code split per language), used instead of content.
+        Chunks get stable IDs (see chunk_id), so re-ingesting overwrites rows
+        instead of appending duplicates, and unchanged chunks are not rewritten.
+        metadata["timestamp"], in whatever format the source uses, is stored
+        as numeric "ts" for the time decay; "content_hash" serves dedup.
+        "embedding_model" makes a provider switch re-embed the chunk.
+        window: [start, end) epoch seconds the fetch fully covered. With
+        user_id and source too, documents is that user's complete set for the
+        source within the window: chunks whose ts falls inside it but that are
+        no longer fetched (cancelled events, deleted mail) are deleted. Chunks
+        outside the window are history and are kept.
+        Returns the number of live chunks.
         """
         if not self.vector_store:
              print("Vector store not initialized")
@@ -64,100 +295,210 @@ class RAGService:
         if not documents:
             return 0
             
-        docs = []
+        chunks: Dict[str, Tuple[str, Dict]] = {}
         for d in documents:
-            doc = Document(
-                page_content=d["content"],
-                metadata=d.get("metadata", {})
-            )
-            docs.append(doc)
-            
-        chunks = self.text_splitter.split_documents(docs)
+            metadata = dict(d.get("metadata", {}))
+            ts = normalize_timestamp(metadata.get("timestamp"))
+            if ts is not None:
+                metadata["ts"] = ts
+            source_id = str(d.get("id") or hashlib.sha256(d["content"].encode("utf-8")).hexdigest())
+            pieces = d["chunks"] if d.get("chunks") is not None else self.text_splitter.split_text(d["content"])
+            for index, piece in enumerate(pieces):
+                key = chunk_id(metadata.get("user_id"), metadata.get("source"), source_id, index)
+                chunks[key] = (piece, {
+                    **metadata,
+                    "source_id": source_id,
+                    "chunk_index": index,
+                    "content_hash": hashlib.sha256(piece.encode("utf-8")).hexdigest(),
+                    "embedding_model": self.embedding_model,
+                })
         
         if not chunks:
             return 0
-            
-        self.vector_store.add_documents(chunks)
+
+        # Blocking DB and provider calls stay off the event loop
+        unchanged = await asyncio.to_thread(self._unchanged_chunks, chunks)
+        changed = {key: chunk for key, chunk in chunks.items() if key not in unchanged}
+        if changed:
+            texts = [piece for piece, _ in changed.values()]
+            vectors = await self.batcher.embed(texts)
+            await asyncio.to_thread(
+                self.vector_store.add_embeddings,
+                texts,
+                vectors,
+                [metadata for _, metadata in changed.values()],
+                list(changed),
+            )
+
+        deleted = 0
+        if user_id is not None and source and window:
+            deleted = await asyncio.to_thread(self._delete_stale_chunks, user_id, source, window, list(chunks))
+
+        # New data invalidates the owners' cached query results
+        owners = {rag_cache.owner_key(metadata.get("user_id")) for _, metadata in changed.values()}
+        if deleted:
+            owners.add(rag_cache.owner_key(user_id))
+        await asyncio.to_thread(rag_cache.bump_corpus_versions, owners)
+        logger.info(f"Ingested {len(chunks)} chunks ({len(changed)} written, {deleted} stale deleted)")
         
         return len(chunks)
 
+    def _unchanged_chunks(self, chunks: Dict[str, Tuple[str, Dict]]) -> set:
+        """IDs whose stored text and metadata already match"""
+        store = self.vector_store
+        ids = list(chunks)
+        unchanged = set()
+        with store.session_maker() as session:
+            for i in range(0, len(ids), 500):
+                rows = session.query(
+                    store.EmbeddingStore.id, store.EmbeddingStore.document, store.EmbeddingStore.cmetadata
+                ).filter(store.EmbeddingStore.id.in_(ids[i:i + 500]))
+                unchanged.update(row.id for row in rows if (row.document, row.cmetadata) == chunks[row.id])
+        return unchanged
+
+    def _delete_stale_chunks(self, user_id: int, source: str, window: Tuple[float, float], live_ids: List[str]) -> int:
+        store = self.vector_store
+        with store.session_maker() as session:
+            collection = store.get_collection(session)
+            if not collection:
+                return 0
+            deleted = session.query(store.EmbeddingStore).filter(
+                store.EmbeddingStore.collection_id == collection.uuid,
+                literal_column(USER_ID_SQL) == str(user_id),
+                literal_column(SOURCE_SQL) == source,
+                cast(literal_column(TS_SQL), Float) >= window[0],
+                cast(literal_column(TS_SQL), Float) < window[1],
+                store.EmbeddingStore.id.notin_(live_ids),
+            ).delete(synchronize_session=False)
+            session.commit()
+        return deleted
+
     async def ingest_codebase(self, root_path: str = ".") -> int:
-        # Codebase ingestion logic remains same, just calling ingest_documents
-        # ... (omitted for brevity, assume implementation in other tools or kept same if minimal change)
-        # Actually logic is same loop, so just need to keep the file reading part or re-implement if replacing whole class.
-        # Since I am replacing __init__ and methods, I should be careful.
-        # Let's keep the existing implementation details for ingest_codebase if possible or overwrite carefully.
-        # Because this is `replace_file_content`, I need to replace the WHOLE CLASS content or range.
-        # The prompt implies I am replacing from `__init__` down? 
-        # Actually, let's just replace __init__ and the relevant methods.
-        pass # Placeholder for thought
-        
-    # Re-implementing codebase ingestion loop to be safe since I'm overwriting large chunk
-    # Wait, replace_file_content is mostly for contiguous blocks.
-    # I will replace __init__ through ingest_documents first.
-    pass
+        """
+        Incrementally ingest a source tree (see codebase_ingest): only files
+        changed since the last run are read, split and embedded.
+        Returns the number of chunks of changed files.
+        """
+        if not self.vector_store:
+             print("Vector store not initialized")
+             return 0
+
+        from app.services.codebase_ingest import ingest_codebase
+        try:
+            return await ingest_codebase(self, root_path)
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """End of an ingestion entry point: release the batcher's tasks on this loop"""
+        await self.batcher.aclose()
+
+    async def delete_chunks(self, ids: List[str]) -> int:
+        if not ids:
+            return 0
+        return await asyncio.to_thread(self._delete_chunk_ids, ids)
+
+    def _delete_chunk_ids(self, ids: List[str]) -> int:
+        store = self.vector_store
+        with store.session_maker() as session:
+            deleted = session.query(store.EmbeddingStore).filter(
+                store.EmbeddingStore.id.in_(ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+        return deleted
+
+    def _ranked_search(
+        self, query: str, n_results: int, user_id: Optional[int], ef_search: Optional[int], mode: str
+    ) -> List[Dict]:
+        """
+        Final results of one owner: user_id's chunks, or the shared (codebase)
+        ones when None. Owner filter, time decay and dedup all run in RANKED_SQL,
+        which returns at most n_results rows (see CANDIDATE_FACTOR).
+        mode: "vector" ranks by decayed cosine distance; "hybrid" fuses in
+        full-text matches (GIN-indexed document_tsv, alembic revision c7e2f4a9d1b3).
+        ef_search sets the HNSW candidate list for this query only.
+
+        The owner filter applies to what the HNSW scan returns, and a plain
+        scan returns only the ef_search nearest rows of the whole table, so a
+        user owning a small share of it would get few or no rows. On pgvector
+        0.8+ the scan is iterative (strict_order: it continues until enough
+        rows pass the filter, up to hnsw.max_scan_tuples). On older versions,
+        per-user queries skip HNSW and take an exact scan of the owner's rows
+        through the btree owner index: linear in that user's chunk count,
+        which stays small; shared (codebase) queries keep the HNSW scan.
+        """
+        sql = ranked_sql(mode, user_id)
+        store = self.vector_store
+        embedding = self.embeddings.embed_query(query)
+
+        with store.session_maker() as session:
+            collection = store.get_collection(session)
+            if not collection:
+                return []
+            # HNSW returns at most ef_search rows per scan
+            planner = {"hnsw.ef_search": str(max(ef_search or self.ef_search, n_results * CANDIDATE_FACTOR))}
+            if self.iterative_scan:
+                planner["hnsw.iterative_scan"] = "strict_order"
+            elif user_id is not None:
+                # HNSW has no bitmap scans: this leaves the btree owner index
+                planner["enable_indexscan"] = "off"
+            # Transaction-local, so pooled connections keep the defaults
+            for name, value in planner.items():
+                session.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
+            params = ranked_params(query, embedding, collection.uuid, user_id, self.embedding_model, n_results)
+            rows = session.execute(text(sql), params).all()
 
-    async def query_codebase(self, query: str, n_results: int = 4) -> List[Dict]:
+        return [
+            {
+                "content": row.document,
+                "source": row.cmetadata.get("source", "unknown"),
+                "score": float(row.score),
+                "decayed_score": float(row.decayed_score),
+                "timestamp": row.cmetadata.get("ts", 0.0),
+            }
+            for row in rows
+        ]
+
+    async def _query(
+        self, user_id: Optional[int], query: str, n_results: int, ef_search: Optional[int], mode: str
+    ) -> List[Dict]:
+        """Retrieve and re-rank, served from the result cache while the owner's corpus is unchanged"""
+        owner = rag_cache.owner_key(user_id)
+        digest = rag_cache.query_hash(
+            query, n_results=n_results, ef_search=ef_search or self.ef_search, mode=mode, model=self.embedding_model
+        )
+        version, cached = await asyncio.to_thread(rag_cache.get_cached_results, owner, digest)
+        if cached is not None:
+            return cached
+
+        ranked = await asyncio.to_thread(self._ranked_search, query, n_results, user_id, ef_search, mode)
+        await asyncio.to_thread(rag_cache.cache_results, owner, version, digest, ranked)
+        return ranked
+
+    async def query_codebase(
+        self, query: str, n_results: int = 4, ef_search: Optional[int] = None, mode: str = "vector"
+    ) -> List[Dict]:
         """
         Query the codebase for relevant context with Time-Decay and Deduplication
+        (shared chunks only: no user's ingested mail, calendar or Slack).
+        mode: "vector", or "hybrid" to fuse in full-text matches for exact identifiers.
         """
         if not self.vector_store:
             return []
 
-        # Fetch more candidates for re-ranking
-        results = self.vector_store.similarity_search_with_score(query, k=n_results * 3)
-        
-        processed_results = []
-        seen_content = set()
-        
-        import datetime
-        now = datetime.datetime.now().timestamp()
+        return await self._query(None, query, n_results, ef_search, mode)
 
-        for doc, score in results:
-            # PGVector returns DISTANCE (Cosine/Euclidean) usually depending on config.
-            # Assuming Cosine distance: 0 is identical, 1 is opposite.
-            
-            content_hash = hash(doc.page_content)
-            if content_hash in seen_content:
-                continue
-            seen_content.add(content_hash)
-            
-            metadata = doc.metadata
-            timestamp = 0.0
-            
-            try:
-                ts_val = metadata.get("timestamp")
-                if ts_val:
-                    if isinstance(ts_val, (int, float)):
-                        timestamp = float(ts_val)
-                    else:
-                         try:
-                             timestamp = float(ts_val)
-                         except ValueError:
-                             dt = datetime.datetime.fromisoformat(str(ts_val))
-                             timestamp = dt.timestamp()
-            except Exception:
-                timestamp = 0.0
-                
-            age_hours = 0
-            if timestamp > 0:
-                age_hours = (now - timestamp) / 3600.0
-                if age_hours < 0: age_hours = 0
-            
-            decay_rate = 0.005
-            decayed_score = score * (1 + (decay_rate * age_hours))
-            
-            processed_results.append({
-                "content": doc.page_content,
-                "source": metadata.get("source", "unknown"),
-                "score": score,
-                "decayed_score": decayed_score,
-                "timestamp": timestamp
-            })
-            
-        processed_results.sort(key=lambda x: x["decayed_score"])
-        
-        return processed_results[:n_results]
+    async def query_user_context(
+        self, user_id: int, query: str, n_results: int = 4, ef_search: Optional[int] = None, mode: str = "vector"
+    ) -> List[Dict]:
+        """
+        Query one user's ingested context (calendar, Gmail, Slack) with
+        Time-Decay and Deduplication
+        """
+        if not self.vector_store:
+            return []
+
+        return await self._query(user_id, query, n_results, ef_search, mode)
 
 # Singleton
 _rag_service = None
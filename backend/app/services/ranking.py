@@ -0,0 +1,125 @@
+"""
+Task Ranking
+Lexicographic (fractional-index) rank keys for manual task order
+
+Tasks sort by rank_key, so moving a task between two others only writes a
+key that sorts between theirs: one row, one updated_at bump. Keys are
+base-36 digit strings read as fractions in [0, 1) and never end in "0", so
+there is always room between two of them. '' marks a task that has never
+been ranked (it sorts first, by position). Keys grow by about one character
+each time the same gap is split; past REBALANCE_KEY_LENGTH the user's list
+is re-spaced in the background.
+
+Lowercase alphanumerics compare the same bytewise and under the usual
+PostgreSQL collations, so ORDER BY rank_key matches Python string order.
+"""
+
+import logging
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Task
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+REBALANCE_KEY_LENGTH = 24
+
+
+def _digit(key: str, i: int) -> int:
+    index = ALPHABET.find(key[i])
+    if index < 0:
+        raise ValueError(f"Invalid rank key: {key!r}")
+    return index
+
+
+def rank_between(lo: Optional[str], hi: Optional[str]) -> str:
+    """
+    A key strictly between lo and hi.
+    None or '' for lo means "from the start", None for hi "to the end".
+    Keys ending in "0" are rejected: nothing sorts between "a" and "a0".
+    """
+    lo = lo or ""
+    if lo.endswith("0") or (hi is not None and hi.endswith("0")):
+        raise ValueError(f"Rank keys must not end in '0': {lo!r}, {hi!r}")
+    if hi is not None and lo >= hi:
+        raise ValueError(f"Rank keys out of order: {lo!r} >= {hi!r}")
+
+    key = []
+    i = 0
+    while True:
+        low = _digit(lo, i) if i < len(lo) else 0
+        high = _digit(hi, i) if hi is not None and i < len(hi) else BASE
+        if high - low > 1:
+            key.append(ALPHABET[(low + high) // 2])
+            return "".join(key)
+        key.append(ALPHABET[low])
+        if high - low == 1:
+            # Our prefix is now below hi's, so hi no longer bounds us
+            hi = None
+        i += 1
+
+
+def rank_sequence(n: int, lo: Optional[str] = None, hi: Optional[str] = None) -> List[str]:
+    """n ascending keys between lo and hi, split evenly so they stay short"""
+    if n <= 0:
+        return []
+    middle = rank_between(lo, hi)
+    left = n // 2
+    return rank_sequence(left, lo, middle) + [middle] + rank_sequence(n - left - 1, middle, hi)
+
+
+def is_valid_rank_key(key) -> bool:
+    """A key rank_between can work with ('' = unranked)"""
+    return (
+        isinstance(key, str) and len(key) <= 64 and not key.endswith("0")
+        and all(c in ALPHABET for c in key)
+    )
+
+
+def needs_rebalance(key: Optional[str]) -> bool:
+    return bool(key) and len(key) > REBALANCE_KEY_LENGTH
+
+
+def rank_unranked_tasks(db: Session, user_id: int) -> int:
+    """
+    Give never-ranked tasks keys ahead of the ranked ones, keeping their
+    current (position, newest first) order. Returns the number of rows ranked.
+    """
+    unranked = db.query(Task).filter(Task.user_id == user_id, Task.rank_key == "").order_by(
+        Task.position.asc(), Task.id.desc()
+    ).all()
+    if not unranked:
+        return 0
+    first = db.query(Task.rank_key).filter(Task.user_id == user_id, Task.rank_key != "").order_by(
+        Task.rank_key.asc()
+    ).limit(1).scalar()
+    for task, key in zip(unranked, rank_sequence(len(unranked), None, first)):
+        task.rank_key = key
+    return len(unranked)
+
+
+def rebalance_ranks(db: Session, user_id: int) -> int:
+    """Re-space every key of a user's list; only rows whose key changes are written"""
+    tasks = db.query(Task).filter(Task.user_id == user_id).order_by(
+        Task.rank_key.asc(), Task.position.asc(), Task.id.desc()
+    ).all()
+    changed = 0
+    for task, key in zip(tasks, rank_sequence(len(tasks))):
+        if task.rank_key != key:
+            task.rank_key = key
+            changed += 1
+    db.commit()
+    logger.info(f"Rebalanced {changed} rank keys for user {user_id}")
+    return changed
+
+
+def schedule_rebalance(user_id: int) -> None:
+    """Best-effort: queue a background rebalance of the user's rank keys"""
+    try:
+        from app.worker import rebalance_task_ranks_task
+        rebalance_task_ranks_task.delay(user_id)
+    except Exception as e:
+        logger.warning(f"Could not schedule rank rebalance for user {user_id}: {e}")
@@ -0,0 +1,77 @@
+"""
+Sync Payload Encoding
+Content negotiation for replication responses: msgpack and gzip/brotli
+
+msgpack and brotli are optional; without them the server falls back to
+JSON and gzip.
+"""
+
+import zlib
+from typing import Iterable, Iterator, Optional
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    if not accept or msgpack is None:
+        return False
+    return any(media in accept for media in MSGPACK_MEDIA_TYPES)
+
+
+def msgpack_packer():
+    """Packer for streaming a response piece by piece (str as raw, bytes as bin)"""
+    return msgpack.Packer(use_bin_type=True)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br > gzip from Accept-Encoding (q=0 entries are refused)"""
+    if not accept_encoding:
+        return None
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Incrementally compress a streamed body"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            out = compressor.process(chunk)
+            if out:
+                yield out
+        yield compressor.finish()
+    else:
+        # wbits 16+MAX_WBITS writes a gzip header/trailer
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+
+
+def compress_bytes(body: bytes, encoding: str) -> bytes:
+    return b"".join(compress_stream([body], encoding))
@@ -0,0 +1,168 @@
+"""
+Sync Job Service
+Single-flight provider sync jobs (GitHub, Todoist, Notion, Linear, Slack)
+
+A trigger takes a Redis lock per (user_id, provider) holding the job ID and
+hands the work to Celery. Repeat triggers while the lock is held coalesce
+into the running job instead of starting a second sync.
+
+Job state is a Redis hash; every change is also published on the user's
+sync:events channel so the SSE stream can push progress to the client.
+"""
+
+import json
+import uuid
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import redis as redis_sync
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+SYNC_PROVIDERS = ("github", "todoist", "notion", "linear", "slack")
+
+# A crashed worker must not block the provider forever
+LOCK_TTL_SECONDS = 15 * 60
+JOB_TTL_SECONDS = 24 * 60 * 60
+
+
+def lock_key(user_id: int, provider: str) -> str:
+    return f"sync:lock:{user_id}:{provider}"
+
+
+def job_key(job_id: str) -> str:
+    return f"sync:job:{job_id}"
+
+
+def events_channel(user_id: int) -> str:
+    return f"sync:events:{user_id}"
+
+
+# Fleet-wide counters: "<provider>:rows_applied" / "<provider>:rows_skipped"
+METRICS_KEY = "sync:metrics"
+
+
+# Progress callback handed to the provider sync functions, e.g. progress(pages_fetched=1)
+ProgressCallback = Callable[..., None]
+
+
+def noop_progress(**fields) -> None:
+    pass
+
+
+async def enqueue_sync_job(user_id: int, provider: str) -> Dict[str, str]:
+    """
+    Start a sync job for the provider, or join the one already running.
+    Returns: { job_id, status, coalesced }
+    """
+    if provider not in SYNC_PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown sync provider: {provider}")
+
+    client = redis_client.get_client()
+    key = lock_key(user_id, provider)
+
+    # Two attempts: the lock may expire between SET NX and GET
+    for _ in range(2):
+        job_id = str(uuid.uuid4())
+        if await client.set(key, job_id, nx=True, ex=LOCK_TTL_SECONDS):
+            break
+        existing = await client.get(key)
+        if existing:
+            status = await client.hget(job_key(existing), "status") or "queued"
+            return {"job_id": existing, "status": status, "coalesced": True}
+    else:
+        raise HTTPException(status_code=409, detail="Sync lock is busy, retry shortly")
+
+    job = {
+        "job_id": job_id,
+        "user_id": str(user_id),
+        "provider": provider,
+        "status": "queued",
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    await client.hset(job_key(job_id), mapping=job)
+    await client.expire(job_key(job_id), JOB_TTL_SECONDS)
+    await client.publish(events_channel(user_id), json.dumps(job))
+
+    try:
+        from app.worker import run_sync_job_task
+        run_sync_job_task.apply_async(args=[job_id, user_id, provider], task_id=job_id)
+    except Exception as e:
+        logger.error(f"Failed to enqueue {provider} sync for user {user_id}: {e}")
+        await client.delete(key)
+        await client.hset(job_key(job_id), mapping={"status": "failed", "error": str(e)})
+        raise HTTPException(status_code=503, detail="Sync queue is unavailable")
+
+    logger.info(f"Queued {provider} sync job {job_id} for user {user_id}")
+    return {"job_id": job_id, "status": "queued", "coalesced": False}
+
+
+async def get_job(user_id: int, job_id: str) -> Optional[Dict[str, str]]:
+    """Current job state, or None if unknown/expired or owned by another user"""
+    job = await redis_client.get_client().hgetall(job_key(job_id))
+    if not job or job.get("user_id") != str(user_id):
+        return None
+    return job
+
+
+async def try_enqueue_sync_job(user_id: int, provider: str) -> Optional[Dict[str, str]]:
+    """Best-effort variant for OAuth callbacks: a queue outage must not break linking"""
+    try:
+        return await enqueue_sync_job(user_id, provider)
+    except HTTPException as e:
+        logger.warning(f"Skipping initial {provider} sync for user {user_id}: {e.detail}")
+        return None
+
+
+async def record_sync_metrics(provider: str, rows_applied: int = 0, rows_skipped: int = 0) -> None:
+    """Best-effort: add row counts of a sync that does not run as a job to sync:metrics"""
+    try:
+        pipe = redis_client.get_client().pipeline(transaction=False)
+        for field, count in (("rows_applied", rows_applied), ("rows_skipped", rows_skipped)):
+            if count:
+                pipe.hincrby(METRICS_KEY, f"{provider}:{field}", count)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Recording {provider} sync metrics failed: {e}")
+
+
+# --- Worker side (synchronous Redis client) ---
+
+# Delete the lock only if it still belongs to this job
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def get_sync_redis() -> redis_sync.Redis:
+    return redis_sync.Redis.from_url(get_settings().redis_url, decode_responses=True)
+
+
+def update_job(client: redis_sync.Redis, job_id: str, user_id: int, **fields) -> None:
+    """Merge fields into the job hash and publish the new state"""
+    fields["updated_at"] = datetime.utcnow().isoformat()
+    client.hset(job_key(job_id), mapping={k: str(v) for k, v in fields.items()})
+    client.expire(job_key(job_id), JOB_TTL_SECONDS)
+    client.publish(events_channel(user_id), json.dumps(client.hgetall(job_key(job_id))))
+
+
+def release_lock(client: redis_sync.Redis, user_id: int, provider: str, job_id: str) -> None:
+    client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key(user_id, provider), job_id)
+
+
+
+def record_job_metrics(client: redis_sync.Redis, job_id: str, provider: str) -> None:
+    """Add the job's written/skipped row counts to the sync:metrics counters"""
+    job = client.hgetall(job_key(job_id))
+    for field in ("rows_applied", "rows_skipped"):
+        count = int(job.get(field) or 0)
+        if count:
+            client.hincrby(METRICS_KEY, f"{provider}:{field}", count)
@@ -0,0 +1,78 @@
+"""
+Task List Cache
+Per-user task list version and cached /prepared-tasks responses
+
+tasks:version:<user_id> is bumped after every commit that writes the user's
+tasks (see task_events). It is the ETag of the task list, and serialized
+responses are cached under it, so a stale entry is simply never read again.
+Everything here is best-effort: without Redis the endpoints serve uncached.
+A bump lost to a Redis error would leave clients on 304s for the old
+version, so versions expire after VERSION_TTL_SECONDS (the next read starts
+a fresh one) and a failed bump falls back to deleting the version.
+"""
+
+import logging
+import time
+from typing import Iterable, Optional
+
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Bound on how long a lost bump can serve a stale list; costs one full
+# (uncached) response per user per period
+VERSION_TTL_SECONDS = 300
+CACHE_TTL_SECONDS = VERSION_TTL_SECONDS
+
+
+def version_key(user_id: int) -> str:
+    return f"tasks:version:{user_id}"
+
+
+def prepared_tasks_key(user_id: int, version: str, variant: str) -> str:
+    """variant distinguishes pages and fieldsets of the same list version"""
+    return f"tasks:prepared:{user_id}:{version}:{variant}"
+
+
+def _initial_version() -> int:
+    # Start from the clock, not 0, so a flushed Redis never re-issues an old ETag
+    return int(time.time() * 1000)
+
+
+def bump_task_list_versions(client, user_ids: Iterable[int]) -> None:
+    """INCR the version of each user (sync client, called after commit)"""
+    pipe = client.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.set(version_key(user_id), _initial_version(), nx=True, ex=VERSION_TTL_SECONDS)
+        pipe.incr(version_key(user_id))
+    pipe.execute()
+
+
+def invalidate_task_lists(client, user_ids: Iterable[int]) -> None:
+    """Fallback when a bump failed: drop the versions, so the next read starts new ones"""
+    client.delete(*(version_key(user_id) for user_id in user_ids))
+
+
+async def get_task_list_version(user_id: int) -> Optional[str]:
+    try:
+        client = redis_client.get_client()
+        await client.set(version_key(user_id), _initial_version(), nx=True, ex=VERSION_TTL_SECONDS)
+        return await client.get(version_key(user_id))
+    except Exception as e:
+        logger.warning(f"Task list version unavailable for user {user_id}: {e}")
+        return None
+
+
+async def get_cached_prepared_tasks(user_id: int, version: str, variant: str) -> Optional[str]:
+    try:
+        return await redis_client.get_client().get(prepared_tasks_key(user_id, version, variant))
+    except Exception as e:
+        logger.warning(f"Task list cache read failed for user {user_id}: {e}")
+        return None
+
+
+async def cache_prepared_tasks(user_id: int, version: str, variant: str, body: str) -> None:
+    try:
+        await redis_client.get_client().set(prepared_tasks_key(user_id, version, variant), body, ex=CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Task list cache write failed for user {user_id}: {e}")
@@ -0,0 +1,133 @@
+"""
+Task Change Events
+Publish a per-user ping on Redis after every commit that wrote tasks
+
+Session hooks collect the user_id of every Task flushed in a transaction.
+After commit they bump the user's task list version (task_cache) and
+publish to tasks:changed:<user_id>, so API processes, Celery workers and
+bulk writes all feed the live replication stream and invalidate caches.
+Bulk statements that bypass the unit of work call mark_tasks_changed().
+
+A before_update hook also records, per replicated field, the updated_at of
+its last change (Task.field_versions) so pulls can send field-level deltas.
+"""
+
+import json
+import logging
+from datetime import datetime
+from itertools import chain
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models import Task
+from app.services.task_cache import bump_task_list_versions, invalidate_task_lists
+
+logger = logging.getLogger(__name__)
+
+_CHANGED_KEY = "changed_task_users"
+_redis = None
+
+
+def tasks_channel(user_id: int) -> str:
+    return f"tasks:changed:{user_id}"
+
+
+def mark_tasks_changed(session: Session, user_id: int) -> None:
+    """Record a task write the flush hooks cannot see (bulk UPDATE/INSERT)"""
+    session.info.setdefault(_CHANGED_KEY, set()).add(user_id)
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        from app.services.sync_jobs import get_sync_redis
+        _redis = get_sync_redis()
+    return _redis
+
+
+def publish_task_changes(user_ids) -> None:
+    try:
+        client = _get_redis()
+        # Version first, so a client reacting to the ping sees the new ETag
+        bump_task_list_versions(client, user_ids)
+        for user_id in user_ids:
+            client.publish(tasks_channel(user_id), str(user_id))
+    except Exception as e:
+        # Never fail a committed write because the notification path is down
+        logger.warning(f"Failed to publish task changes for users {sorted(user_ids)}: {e}")
+        try:
+            invalidate_task_lists(_get_redis(), user_ids)
+        except Exception as e:
+            logger.warning(f"Task list versions of users {sorted(user_ids)} left to expire: {e}")
+
+
+# Replicated fields tracked in Task.field_versions
+DELTA_FIELDS = (
+    "title", "description", "status", "source", "estimated_time",
+    "prepared_items", "position", "rank_key", "deleted",
+)
+# Key holding the updated_at the versions were written with; a row whose
+# updated_at differs was written by something that bypassed the hook
+VERSIONS_AT = "_at"
+
+
+def bump_field_versions(
+    current: Optional[str],
+    changed: Iterable[str],
+    now: datetime,
+    previous: Optional[datetime],
+) -> str:
+    """Return field_versions JSON with the changed fields stamped at now"""
+    versions = json.loads(current) if current else {}
+    if not versions and previous:
+        # First tracked write: everything else last changed at the old updated_at
+        versions = {field: previous.isoformat() for field in DELTA_FIELDS}
+    stamp = now.isoformat()
+    for field in changed:
+        versions[field] = stamp
+    versions[VERSIONS_AT] = stamp
+    return json.dumps(versions, separators=(",", ":"))
+
+
+@event.listens_for(Task, "before_update")
+def _stamp_field_versions(mapper, connection, target) -> None:
+    state = inspect(target)
+    if not any(attr.history.has_changes() for attr in state.attrs if attr.key != "user"):
+        return
+    changed = [field for field in DELTA_FIELDS if state.attrs[field].history.has_changes()]
+    # Reading field_versions loads any expired columns, updated_at included
+    current = target.field_versions
+    history = state.attrs.updated_at.history
+    previous = history.deleted or history.unchanged
+    # Keep an explicitly assigned updated_at; otherwise set it here (instead
+    # of onupdate) so it matches the versions exactly
+    now = history.added[0] if history.added and history.added[0] else datetime.utcnow()
+    target.updated_at = now
+    target.field_versions = bump_field_versions(
+        current, changed, now, previous[0] if previous else None
+    )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Task) and obj.user_id is not None:
+            mark_tasks_changed(session, obj.user_id)
+
+
+def _after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids:
+        publish_task_changes(user_ids)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def register_task_events(session_factory) -> None:
+    """Attach the change hooks to a sessionmaker"""
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
@@ -0,0 +1,156 @@
+"""
+Task Search Service
+Database-native full-text search over task titles and descriptions
+
+PostgreSQL: a generated tsvector column (title weighted above description)
+with a GIN index, queried with prefix terms and ranked by ts_rank_cd.
+SQLite (lite mode): an external-content FTS5 table kept in step with tasks
+by triggers, ranked by bm25.
+Both use the 'simple'/unicode61 tokenization, since task text mixes
+Japanese and English and a language-specific stemmer would only fit one.
+"""
+
+import html
+import logging
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Highlight markers survive the database untouched and are swapped for
+# <mark> only after the text itself has been HTML-escaped.
+_START, _STOP = "\x02", "\x03"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_POSTGRES_DDL = (
+    """
+    ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+)
+
+_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+)
+
+
+def ensure_search_index(conn) -> None:
+    """Create the search column/index (PostgreSQL) or FTS5 table and triggers (SQLite)"""
+    if conn.dialect.name == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            conn.execute(text(ddl))
+    elif conn.dialect.name == "sqlite":
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'")).first()
+        for ddl in _SQLITE_DDL:
+            conn.execute(text(ddl))
+        if not exists:
+            # Index the rows that predate the triggers
+            conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+    conn.commit()
+
+
+def search_terms(q: str) -> List[str]:
+    return _TERM_RE.findall(q)[:16]
+
+
+def _highlight(value: str) -> str:
+    escaped = html.escape(value or "")
+    return escaped.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _search_postgres(db: Session, user_id: int, terms: List[str], limit: int):
+    # Every term must match, each as a prefix ("dep" finds "deploy")
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    return db.execute(text(f"""
+        WITH hits AS (
+            SELECT id, title, description, status, source,
+                   ts_rank_cd(search_vector, query) AS score, query
+            FROM tasks, to_tsquery('simple', :tsquery) AS query
+            WHERE user_id = :user_id AND deleted IS NOT TRUE AND status != 'archived'
+              AND search_vector @@ query
+            ORDER BY score DESC, id DESC
+            LIMIT :limit
+        )
+        SELECT id, title, description, status, source, score,
+               ts_headline('simple', title, query,
+                   'StartSel={_START}, StopSel={_STOP}, HighlightAll=true') AS title_highlight,
+               ts_headline('simple', coalesce(description, ''), query,
+                   'StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MaxWords=20, MinWords=5') AS snippet
+        FROM hits
+        ORDER BY score DESC, id DESC
+    """), {"tsquery": tsquery, "user_id": user_id, "limit": limit}).all()
+
+
+def _search_sqlite(db: Session, user_id: int, terms: List[str], limit: int):
+    match = " ".join(f'"{term}"*' for term in terms)
+    # bm25 is lower-is-better; the title column weighs 10x the description
+    return db.execute(text(f"""
+        SELECT t.id, t.title, t.description, t.status, t.source,
+               -bm25(tasks_fts, 10.0, 1.0) AS score,
+               highlight(tasks_fts, 0, '{_START}', '{_STOP}') AS title_highlight,
+               snippet(tasks_fts, 1, '{_START}', '{_STOP}', '…', 16) AS snippet
+        FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+        WHERE tasks_fts MATCH :match
+          AND t.user_id = :user_id AND coalesce(t.deleted, 0) = 0 AND t.status != 'archived'
+        ORDER BY bm25(tasks_fts, 10.0, 1.0), t.id DESC
+        LIMIT :limit
+    """), {"match": match, "user_id": user_id, "limit": limit}).all()
+
+
+def search_tasks(db: Session, user_id: int, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Ranked prefix search over the user's tasks.
+    Returns: [{ id, title, description, status, source, score, title_highlight, snippet }]
+    Highlights are HTML-escaped with matches wrapped in <mark>.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    if db.bind.dialect.name == "postgresql":
+        rows = _search_postgres(db, user_id, terms, limit)
+    else:
+        rows = _search_sqlite(db, user_id, terms, limit)
+
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "status": row.status,
+            "source": row.source,
+            "score": float(row.score),
+            "title_highlight": _highlight(row.title_highlight),
+            "snippet": _highlight(row.snippet),
+        }
+        for row in rows
+    ]
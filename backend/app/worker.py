@@ -3,6 +3,7 @@ import os
 import logging
 from celery import Celery
 import asyncio
+from datetime import datetime
 from typing import Dict, Any
 
 # Configure logging
@@ -35,8 +36,19 @@ celery.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_acks_late=True, # Safety: Only ack after success
+    task_reject_on_worker_lost=True, # Redeliver jobs lost to a worker restart
 )
 
+
+def run_async(coro):
+    """Run a coroutine to completion on a fresh event loop (Celery tasks are sync)"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
 @celery.task(bind=True, max_retries=3, default_retry_delay=60)
 def send_slack_message_task(self, user_id: int, channel: str, text: str, proposal_id: int = None):
     """
@@ -48,15 +60,6 @@ def send_slack_message_task(self, user_id: int, channel: str, text: str, proposa
     from app.models import Proposal # Added
     
     logger.info(f"Task: Sending Slack Message to {channel} for User {user_id}")
-    
-    # helper for async in celery
-    def run_async(coro):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-             return loop.run_until_complete(coro)
-        finally:
-             loop.close()
 
     db = SessionLocal()
     try:
@@ -125,6 +128,82 @@ def log_action_task(self, user_id: int, action_type: str, details: Dict[str, Any
     finally:
         db.close()
 
+def _get_sync_handler(provider: str):
+    """Resolve provider -> sync coroutine function (lazy to avoid router imports at boot)"""
+    if provider == "github":
+        from app.routers.github import sync_github_issues_task
+        return sync_github_issues_task
+    if provider == "todoist":
+        from app.routers.todoist import sync_todoist_tasks_task
+        return sync_todoist_tasks_task
+    if provider == "notion":
+        from app.routers.notion import sync_notion_pages_task
+        return sync_notion_pages_task
+    if provider == "linear":
+        from app.routers.linear import sync_linear_tasks_task
+        return sync_linear_tasks_task
+    if provider == "slack":
+        from app.routers.slack import sync_slack_tasks_task
+        return sync_slack_tasks_task
+    raise ValueError(f"Unknown sync provider: {provider}")
+
+
+@celery.task(bind=True)
+def run_sync_job_task(self, job_id: str, user_id: int, provider: str):
+    """
+    Run one provider sync job.
+    The single-flight lock was taken by enqueue_sync_job; release it when done.
+    """
+    from app.services.sync_jobs import get_sync_redis, update_job, release_lock, record_job_metrics
+
+    client = get_sync_redis()
+    logger.info(f"Task: {provider} sync job {job_id} for User {user_id}")
+    update_job(client, job_id, user_id, status="running", started_at=datetime.utcnow().isoformat())
+
+    def progress(**fields):
+        update_job(client, job_id, user_id, **fields)
+
+    try:
+        imported = run_async(_get_sync_handler(provider)(user_id, progress=progress))
+        update_job(client, job_id, user_id, status="done", imported=imported or 0)
+        record_job_metrics(client, job_id, provider)
+        return {"status": "done", "imported": imported or 0}
+    except Exception as e:
+        logger.error(f"Sync job {job_id} failed: {e}")
+        update_job(client, job_id, user_id, status="failed", error=str(e))
+        raise
+    finally:
+        release_lock(client, user_id, provider, job_id)
+        client.close()
+
+
+@celery.task(bind=True)
+def rebalance_task_ranks_task(self, user_id: int):
+    """Re-space a user's task rank keys once repeated moves have made them long"""
+    from app.database import SessionLocal
+    from app.services.ranking import rank_unranked_tasks, rebalance_ranks
+
+    db = SessionLocal()
+    try:
+        rank_unranked_tasks(db, user_id)
+        return {"rebalanced": rebalance_ranks(db, user_id)}
+    finally:
+        db.close()
+
+
+@celery.task(bind=True)
+def backfill_daily_stats_task(self, user_id: int = None):
+    """Rebuild the user_daily_stats rollup from tasks and focus sessions"""
+    from app.database import SessionLocal
+    from app.services.daily_stats import backfill_daily_stats
+
+    db = SessionLocal()
+    try:
+        return {"rows": backfill_daily_stats(db, user_id)}
+    finally:
+        db.close()
+
+
 @celery.task(bind=True)
 def test_task(self):
     logger.info("Test task executed")
@@ -0,0 +1,89 @@
+"""
+Benchmark: codebase ingestion and retrieval, fully offline
+
+Ingests this repository through codebase_ingest (gitignore-aware listing,
+manifest, process pool, language splitters) with the local hashing
+provider behind the EmbeddingBatcher, into an in-memory index standing in
+for pgvector (brute-force cosine). Then a second, unchanged ingest, and
+100 lookups: a line of code from a random file as the question; a hit is
+a chunk of that file in the top 5. No network, API key or PostgreSQL.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import numpy as np
+
+from app.services import codebase_ingest
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_providers import HashingEmbeddings
+from benchmarks.common import make_session_factory
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+QUERIES = 100
+K = 5
+
+
+class LocalIndex:
+    """What codebase_ingest needs from RAGService, over a NumPy matrix"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.embedding_model = embeddings.model
+        self.batcher = EmbeddingBatcher(embeddings)
+        self.chunks = {}  # id -> (path, text, vector)
+        self._matrix = None
+
+    async def ingest_documents(self, documents):
+        from app.services.rag_service import chunk_id
+
+        pieces = [(d["id"], d["metadata"]["path"], i, piece) for d in documents for i, piece in enumerate(d["chunks"])]
+        vectors = await self.batcher.embed([piece for _, _, _, piece in pieces])
+        for (source_id, path, i, piece), vector in zip(pieces, vectors):
+            self.chunks[chunk_id(None, codebase_ingest.SOURCE, source_id, i)] = (path, piece, vector)
+        self._matrix = None
+        return len(pieces)
+
+    async def delete_chunks(self, ids):
+        for key in ids:
+            self.chunks.pop(key, None)
+        self._matrix = None
+        return len(ids)
+
+    def search(self, query, k=K):
+        if self._matrix is None:
+            self._paths = [path for path, _, _ in self.chunks.values()]
+            self._matrix = np.array([vector for _, _, vector in self.chunks.values()], dtype=np.float32)
+        scores = self._matrix @ np.array(self.embeddings.embed_query(query), dtype=np.float32)
+        return [self._paths[i] for i in np.argsort(-scores)[:k]]
+
+
+def main():
+    codebase_ingest.rag_cache.bump_corpus_versions = lambda owners: None  # no Redis needed
+    session_factory = make_session_factory()
+    index = LocalIndex(HashingEmbeddings())
+
+    for label in ("first ingest", "unchanged re-ingest"):
+        start = time.perf_counter()
+        reingested = asyncio.run(codebase_ingest.ingest_codebase(index, ROOT, session_factory))
+        print(f"{label:<20}: {time.perf_counter() - start:7.2f} s  {reingested:6d} chunks re-ingested")
+
+    rng = random.Random(0)
+    questions = []
+    for path, piece, _ in rng.sample(sorted(index.chunks.values(), key=lambda c: c[1]), QUERIES * 3):
+        lines = [line.strip() for line in piece.splitlines()[1:] if len(line.strip()) > 30]
+        if lines:
+            questions.append((rng.choice(lines), path))
+    questions = questions[:QUERIES]
+
+    start = time.perf_counter()
+    hits = sum(path in index.search(question) for question, path in questions)
+    elapsed = (time.perf_counter() - start) * 1000 / len(questions)
+    print(f"retrieval           : recall@{K} {hits / len(questions):.3f}  {elapsed:6.2f} ms/query "
+          f"over {len(index.chunks)} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: embedding throughput for concurrent ingestion jobs
+
+20 jobs ingest 10 documents of 5 chunks each at the same time, against a
+stub embedder with remote-call latency (80 ms per request + 2 ms per text).
+Batches are capped at 25 texts, so concurrency matters.
+"blocking" is the old path: each document embedded synchronously inside
+the coroutine, which stalls the event loop for every other job.
+"""
+
+import asyncio
+import time
+
+from app.services.embedding_batcher import EmbeddingBatcher
+from benchmarks.common import StubEmbeddings
+
+JOBS = 20
+DOCUMENTS = 10
+CHUNKS = 5
+
+
+def job_documents(job):
+    return [[f"job {job} doc {d} chunk {c}" for c in range(CHUNKS)] for d in range(DOCUMENTS)]
+
+
+async def blocking_job(stub, job):
+    for chunks in job_documents(job):
+        stub.embed_documents(chunks)
+
+
+async def batched_job(batcher, job):
+    for chunks in job_documents(job):
+        await batcher.embed(chunks)
+
+
+async def run(label, stub, make_job):
+    start = time.perf_counter()
+    await asyncio.gather(*(make_job(job) for job in range(JOBS)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32}: {elapsed * 1000:8.1f} ms  {stub.texts / elapsed:8.1f} chunks/s  {stub.requests:4d} requests")
+
+
+async def main():
+    stub = StubEmbeddings()
+    await run("blocking", stub, lambda job: blocking_job(stub, job))
+    for concurrency in (1, 4, 8):
+        stub = StubEmbeddings()
+        batcher = EmbeddingBatcher(stub, max_batch_size=25, max_wait_ms=20, max_concurrency=concurrency)
+        await run(f"micro-batched (concurrency {concurrency})", stub, lambda job: batched_job(batcher, job))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
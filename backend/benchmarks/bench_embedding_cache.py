@@ -0,0 +1,48 @@
+"""
+Benchmark: embedding API calls on steady-state re-ingestion
+
+Ingests 2k chunks, re-ingests them unchanged (the /rag/ingest/* pattern:
+the same 30 days of events and recent mails every time), then again with
+10% of the chunks edited. The embedder is a stub with remote-call latency.
+"""
+
+import time
+
+from app.services.embedding_cache import CachedEmbeddings, summarize_metrics
+from benchmarks.common import make_session_factory, StubEmbeddings
+
+CHUNKS = 2_000
+BATCH = 100  # texts per embed_documents call, as the vector store sends them
+
+
+def ingest(embeddings, texts):
+    start = time.perf_counter()
+    for i in range(0, len(texts), BATCH):
+        embeddings.embed_documents(texts[i:i + BATCH])
+    return time.perf_counter() - start
+
+
+def main():
+    session_factory = make_session_factory()
+    stub = StubEmbeddings()
+    cached = CachedEmbeddings(stub, model="stub", session_factory=session_factory)
+    texts = [f"Email from team@example.com\nSubject: Weekly sync #{i}\nSnippet: notes {i}" for i in range(CHUNKS)]
+    edited = [t + " (updated)" if i % 10 == 0 else t for i, t in enumerate(texts)]
+
+    for label, batch in (("cold", texts), ("unchanged", texts), ("10% edited", edited)):
+        before = dict(cached.stats)
+        requests = stub.requests
+        elapsed = ingest(cached, batch)
+        delta = {field: cached.stats[field] - before[field] for field in cached.stats}
+        print(
+            f"{label:<11}: {elapsed * 1000:8.1f} ms  api requests {stub.requests - requests:3d}  "
+            f"hits {delta['hits']:5d}  misses {delta['misses']:5d}"
+        )
+
+    uncached = StubEmbeddings()
+    print(f"uncached   : {ingest(uncached, texts) * 1000:8.1f} ms  api requests {uncached.requests:3d} (per re-ingest)")
+    print("totals     :", summarize_metrics(cached.stats))
+
+
+if __name__ == "__main__":
+    main()
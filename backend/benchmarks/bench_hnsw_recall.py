@@ -0,0 +1,92 @@
+"""
+Benchmark: HNSW recall and latency vs brute force (PostgreSQL + pgvector)
+
+Loads 20k random 768-d vectors into a temporary table, builds the same
+HNSW index as alembic revision a41c9e3d7b20, and runs 100 top-10 cosine
+queries exactly (index scans disabled) and through the index at several
+hnsw.ef_search values. Needs DATABASE_URL pointing at PostgreSQL with the
+vector extension; nothing outside the temporary table is touched.
+"""
+
+import statistics
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+
+VECTORS = 20_000
+DIMENSIONS = 768
+QUERIES = 100
+K = 10
+EF_SEARCH = (10, 20, 40, 80, 160, 320)
+
+
+def literal(vector) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+def top_k(conn, query, k=K):
+    start = time.perf_counter()
+    rows = conn.execute(
+        text("SELECT id FROM bench_vectors ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),
+        {"q": literal(query), "k": k},
+    ).scalars().all()
+    return rows, (time.perf_counter() - start) * 1000
+
+
+def run(conn, queries, exact=None):
+    results, latencies = [], []
+    for query in queries:
+        ids, ms = top_k(conn, query)
+        results.append(ids)
+        latencies.append(ms)
+    recall = None
+    if exact is not None:
+        recall = statistics.mean(len(set(r) & set(e)) / K for r, e in zip(results, exact))
+    latencies.sort()
+    return results, recall, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    url = get_settings().database_url
+    if not url.startswith(("postgresql", "postgres")):
+        raise SystemExit("DATABASE_URL must point at PostgreSQL with pgvector")
+    engine = create_engine(url.replace("postgres://", "postgresql://", 1))
+
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(VECTORS, DIMENSIONS)).astype(np.float32)
+    # Queries near stored vectors, like real questions near real chunks
+    queries = data[rng.choice(VECTORS, QUERIES, replace=False)] + rng.normal(scale=0.3, size=(QUERIES, DIMENSIONS))
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text(f"CREATE TEMPORARY TABLE bench_vectors (id int PRIMARY KEY, embedding vector({DIMENSIONS}))"))
+        for i in range(0, VECTORS, 1000):
+            conn.execute(
+                text("INSERT INTO bench_vectors (id, embedding) VALUES (:id, CAST(:embedding AS vector))"),
+                [{"id": i + j, "embedding": literal(v)} for j, v in enumerate(data[i:i + 1000])],
+            )
+        conn.execute(text("ANALYZE bench_vectors"))
+
+        conn.execute(text("SET enable_indexscan = off"))
+        exact, _, p50, p95 = run(conn, queries)
+        print(f"brute force       : recall 1.000  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+        conn.execute(text("SET enable_indexscan = on"))
+
+        start = time.perf_counter()
+        conn.execute(text(
+            "CREATE INDEX ON bench_vectors USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        ))
+        print(f"hnsw build        : {time.perf_counter() - start:.1f} s")
+
+        for ef_search in EF_SEARCH:
+            conn.execute(text(f"SET hnsw.ef_search = {int(ef_search)}"))
+            _, recall, p50, p95 = run(conn, queries, exact)
+            print(f"hnsw ef_search={ef_search:<3}: recall {recall:.3f}  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
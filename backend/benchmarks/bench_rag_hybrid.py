@@ -0,0 +1,108 @@
+"""
+Benchmark: identifier recall, vector-only vs hybrid RAG retrieval (PostgreSQL + pgvector)
+
+5k synthetic mail/Slack chunks, each naming one issue key (ABC-123) among
+filler text, in a session-local copy of langchain_pg_embedding (a TEMP
+table shadows the real one, so RAGService's SQL runs unchanged). 200
+questions about one key each; a hit is the chunk naming it in the top 5.
+Vector-only and hybrid run RANKED_SQL, the statement RAGService runs
+(fusion, decay and dedup included); lexical is its full-text half alone.
+Vectors come from the local hashing provider (EMBEDDING_PROVIDER=hashing),
+so no API key is needed; vector recall with the Gemini API differs.
+Needs DATABASE_URL pointing at PostgreSQL with the vector extension.
+"""
+
+import json
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+from app.services.embedding_providers import HashingEmbeddings
+from app.services.rag_service import LEXICAL_SQL, USER_ID_SQL, ranked_params, ranked_sql
+
+CHUNKS = 5_000
+QUERIES = 200
+DIMENSIONS = 768
+K = 5
+WORDS = "deploy review meeting budget design release sync customer invoice roadmap hiring offsite".split()
+
+
+embeddings = HashingEmbeddings(DIMENSIONS)
+embed = embeddings.embed_query
+
+
+def literal(vector) -> str:
+    return "[" + ",".join(f"{x:.5f}" for x in vector) + "]"
+
+
+def ranked_search(conn, collection_id, query, mode):
+    params = ranked_params(query, embed(query), collection_id, 1, embeddings.model, K)
+    return list(conn.execute(text(ranked_sql(mode, 1)), params).scalars())
+
+
+def lexical_search(conn, collection_id, query):
+    sql = text(LEXICAL_SQL.format(owner_filter=f"{USER_ID_SQL} = :user_id"))
+    rows = conn.execute(sql, {"query": query, "collection_id": collection_id, "user_id": "1", "k": K * 2})
+    return [row.id for row in rows]
+
+
+def measure(label, search, questions):
+    hits, latencies = 0, []
+    for question, expected in questions:
+        start = time.perf_counter()
+        ids = search(question)[:K]
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += expected in ids
+    latencies.sort()
+    print(f"{label:<12}: recall@{K} {hits / len(questions):.3f}  p50 {statistics.median(latencies):6.2f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:6.2f} ms")
+
+
+def main():
+    url = get_settings().database_url
+    if not url.startswith(("postgresql", "postgres")):
+        raise SystemExit("DATABASE_URL must point at PostgreSQL with pgvector")
+    engine = create_engine(url.replace("postgres://", "postgresql://", 1))
+    rng = random.Random(0)
+    collection_id = uuid.uuid4()
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text(f"""
+            CREATE TEMPORARY TABLE langchain_pg_embedding (
+                id VARCHAR PRIMARY KEY, collection_id UUID, embedding vector({DIMENSIONS}),
+                document VARCHAR, cmetadata JSONB,
+                document_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', coalesce(document, ''))) STORED
+            )
+        """))
+        rows, keys = [], {}
+        for i in range(CHUNKS):
+            key = f"ABC-{i + 100}"
+            document = f"Re: {' '.join(rng.choices(WORDS, k=3))} ({key})\n" + " ".join(rng.choices(WORDS, k=40))
+            keys[key] = str(i)
+            rows.append({"id": str(i), "collection_id": collection_id, "embedding": literal(embed(document)),
+                         "document": document,
+                         "cmetadata": json.dumps({"user_id": "1", "source": "gmail", "embedding_model": embeddings.model})})
+        conn.execute(text("""
+            INSERT INTO langchain_pg_embedding (id, collection_id, embedding, document, cmetadata)
+            VALUES (:id, :collection_id, CAST(:embedding AS vector), :document, CAST(:cmetadata AS jsonb))
+        """), rows)
+        conn.execute(text("CREATE INDEX ON langchain_pg_embedding USING gin (document_tsv)"))
+        conn.execute(text("CREATE INDEX ON langchain_pg_embedding USING hnsw (embedding vector_cosine_ops)"))
+        conn.execute(text("ANALYZE langchain_pg_embedding"))
+
+        questions = [(f"What did we decide about {key} in the {rng.choice(WORDS)} thread?", keys[key])
+                     for key in rng.sample(sorted(keys), QUERIES)]
+
+        measure("vector-only", lambda q: ranked_search(conn, collection_id, q, "vector"), questions)
+        measure("lexical", lambda q: lexical_search(conn, collection_id, q), questions)
+        measure("hybrid", lambda q: ranked_search(conn, collection_id, q, "hybrid"), questions)
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
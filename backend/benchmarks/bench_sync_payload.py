@@ -0,0 +1,94 @@
+"""
+Benchmark: bytes on the wire for GET /api/sync/tasks
+
+Initial pull of 5k tasks, then an incremental pull after a status change on
+10% of them, for full vs delta documents, JSON vs msgpack and
+identity/gzip/br. Sizes are the raw (still compressed) response bodies.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import Task
+from benchmarks.common import make_session_factory, make_user, make_client, bearer_headers
+
+TASKS = 5_000
+CHANGED = TASKS // 10
+WORDS = "review deploy fix update migrate design write test refactor document api sync user".split()
+
+
+def seed(session_factory):
+    db = session_factory()
+    user = make_user(db, email="bench@example.com", name="Bench")
+    base = datetime(2025, 1, 1)
+    rows = []
+    for i in range(TASKS):
+        stamp = base + timedelta(seconds=i)
+        rows.append({
+            "user_id": user.id,
+            "title": f"Imported issue #{i}: " + " ".join(random.choices(WORDS, k=5)),
+            "description": " ".join(random.choices(WORDS, k=random.randint(10, 80))),
+            "status": "ready",
+            "source": "linear",
+            "estimated_time": "30分",
+            "prepared_items": '[{"type": "link", "title": "Issue", "url": "https://linear.app/issue/%d"}]' % i,
+            "position": i,
+            "deleted": False,
+            "created_at": stamp,
+            "updated_at": stamp,
+        })
+    db.execute(insert(Task), rows)
+    db.commit()
+    headers = bearer_headers(user)
+    db.close()
+    return headers
+
+
+def complete_some(session_factory):
+    """Status-only edits through the ORM, so field versions are recorded"""
+    db = session_factory()
+    for task in db.query(Task).order_by(Task.id).limit(CHANGED):
+        task.status = "completed"
+    db.commit()
+    db.close()
+
+
+def pull_size(client, headers, params, accept, encoding):
+    request_headers = {**headers, "Accept": accept, "Accept-Encoding": encoding}
+    start = time.perf_counter()
+    with client.stream("GET", "/api/sync/tasks", params=params, headers=request_headers) as response:
+        size = sum(len(chunk) for chunk in response.iter_raw())
+    return size, time.perf_counter() - start
+
+
+def report(client, headers, label, params):
+    print(label)
+    for accept in ("application/json", "application/msgpack"):
+        for encoding in ("identity", "gzip", "br"):
+            size, elapsed = pull_size(client, headers, params, accept, encoding)
+            print(f"  {accept:<20} {encoding:<8}: {size / 1024:9.1f} KiB  {elapsed * 1000:7.1f} ms")
+
+
+def main():
+    session_factory = make_session_factory()
+    headers = seed(session_factory)
+    client = make_client(session_factory)
+
+    initial = client.get("/api/sync/tasks", params={"limit": TASKS}, headers=headers).json()
+    report(client, headers, f"Initial pull ({TASKS} tasks)", {"limit": TASKS})
+
+    complete_some(session_factory)
+    since = {
+        "limit": TASKS,
+        "min_updated_at": initial["checkpoint"]["updated_at"],
+        "min_id": initial["checkpoint"]["id"],
+    }
+    report(client, headers, f"Incremental pull, {CHANGED} status changes (full documents)", since)
+    report(client, headers, f"Incremental pull, {CHANGED} status changes (delta=1)", {**since, "delta": 1})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: initial RxDB replication of a 50k-task user via GET /api/sync/tasks
+
+Timestamps are clustered (10 rows per updated_at) so page boundaries land
+inside ties; the run asserts every row arrives exactly once.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import Task
+from benchmarks.common import make_session_factory, make_user, make_client, bearer_headers
+
+TASKS = 50_000
+ROWS_PER_TIMESTAMP = 10
+
+
+def seed(session_factory):
+    db = session_factory()
+    user = make_user(db, email="bench@example.com", name="Bench")
+    base = datetime(2025, 1, 1)
+    rows = []
+    for i in range(TASKS):
+        stamp = base + timedelta(seconds=i // ROWS_PER_TIMESTAMP)
+        rows.append({
+            "user_id": user.id,
+            "title": f"Imported issue #{i}",
+            "description": "x" * random.randint(0, 400),
+            "status": "ready",
+            "source": "linear",
+            "estimated_time": "30分",
+            "prepared_items": "[]",
+            "position": i,
+            "deleted": False,
+            "created_at": stamp,
+            "updated_at": stamp,
+        })
+    db.execute(insert(Task), rows)
+    db.commit()
+    headers = bearer_headers(user)
+    db.close()
+    return headers
+
+
+def replicate(client, headers, batch_size: int):
+    seen = set()
+    requests = 0
+    params = {"limit": batch_size}
+    start = time.perf_counter()
+    while True:
+        body = client.get("/api/sync/tasks", params=params, headers=headers).json()
+        requests += 1
+        if not body["documents"]:
+            break
+        for doc in body["documents"]:
+            assert doc["id"] not in seen, f"duplicate {doc['id']}"
+            seen.add(doc["id"])
+        params = {
+            "limit": batch_size,
+            "min_updated_at": body["checkpoint"]["updated_at"],
+            "min_id": body["checkpoint"]["id"],
+        }
+    elapsed = time.perf_counter() - start
+    assert len(seen) == TASKS, f"expected {TASKS} rows, got {len(seen)}"
+    return elapsed, requests
+
+
+def main():
+    session_factory = make_session_factory()
+    headers = seed(session_factory)
+    client = make_client(session_factory)
+
+    print(f"Initial replication of {TASKS} tasks ({ROWS_PER_TIMESTAMP} rows per timestamp)")
+    for batch_size in (100, 1000, 5000):
+        elapsed, requests = replicate(client, headers, batch_size)
+        print(f"  batch={batch_size:>5}: {requests:>4} requests, {elapsed * 1000:8.1f} ms, "
+              f"{TASKS / elapsed:,.0f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
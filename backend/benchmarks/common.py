@@ -0,0 +1,38 @@
+"""
+Benchmark helpers
+Shared test setup (in-memory SQLite, user, TestClient) and a stub embedder.
+Run benchmarks from backend/: python -m benchmarks.<name>
+"""
+
+import random
+import time
+
+# Same database, user and client setup as the test suite
+from tests.conftest import bearer_headers, make_client, make_session_factory, make_user  # noqa: F401
+
+
+class StubEmbeddings:
+    """
+    Stand-in for the embedding API: deterministic vectors, with the latency
+    of a remote call (a fixed cost per request plus a cost per text).
+    """
+
+    def __init__(self, dimensions: int = 768, request_ms: float = 80.0, per_text_ms: float = 2.0):
+        self.dimensions = dimensions
+        self.request_ms = request_ms
+        self.per_text_ms = per_text_ms
+        self.requests = 0
+        self.texts = 0
+
+    def _vector(self, text: str):
+        rng = random.Random(text)
+        return [rng.uniform(-1.0, 1.0) for _ in range(self.dimensions)]
+
+    def embed_documents(self, texts):
+        self.requests += 1
+        self.texts += len(texts)
+        time.sleep((self.request_ms + self.per_text_ms * len(texts)) / 1000)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
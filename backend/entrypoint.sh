@@ -26,7 +26,8 @@ elif [ "$MODE" = "worker" ]; then
     
 else
     echo "Starting Uvicorn API..."
-    # Auto-run migrations in single-container mode if strictly needed
-    # alembic upgrade head
+    # Schema-level migrations (e.g. the pgvector HNSW index); app tables are
+    # still checked by app.migration on startup
+    alembic upgrade head || echo "alembic upgrade failed; continuing"
     exec uvicorn app.main:app --host 0.0.0.0 --port 8000
 fi
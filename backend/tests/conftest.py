@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import get_db
+from app.models import Base, User
+from app.routers.login import create_access_token
+
+
+# Plain helpers behind the fixtures; the benchmarks import these too
+
+
+def make_session_factory():
+    """Fresh in-memory SQLite database with the full schema"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def make_user(db, email: str = "sync@example.com", name: str = "Sync Tester") -> User:
+    user = User(email=email, name=name)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def bearer_headers(user: User) -> dict:
+    token = create_access_token({"sub": user.email, "user_id": user.id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_client(session_factory) -> TestClient:
+    """TestClient bound to the given database (startup hooks are not run)"""
+    from app.main import app
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture
+def session_factory():
+    factory = make_session_factory()
+    yield factory
+    factory.kw["bind"].dispose()
+
+
+@pytest.fixture
+def db_session(session_factory):
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def user(db_session):
+    return make_user(db_session)
+
+
+@pytest.fixture
+def auth_headers(user):
+    return bearer_headers(user)
+
+
+@pytest.fixture
+def client(session_factory):
+    from app.main import app
+
+    yield make_client(session_factory)
+    app.dependency_overrides.clear()
@@ -0,0 +1,43 @@
+from app.models import Task
+from app.services.change_detection import content_hash, apply_if_changed, new_synced_task
+
+
+def test_content_hash_is_order_independent():
+    assert content_hash({"a": 1, "b": "x"}) == content_hash({"b": "x", "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+
+def test_unchanged_upstream_skips_write_and_keeps_local_edits():
+    fields = {"title": "Fix login", "status": "ready"}
+    task = new_synced_task(1, "linear", fields)
+    task.status = "in-progress"  # user started the task locally
+
+    assert apply_if_changed(task, fields) is False
+    assert task.status == "in-progress"
+
+
+def test_changed_upstream_is_applied():
+    task = new_synced_task(1, "linear", {"title": "Fix login", "status": "ready"})
+    changed = {"title": "Fix login (v2)", "status": "ready"}
+
+    assert apply_if_changed(task, changed) is True
+    assert task.title == "Fix login (v2)"
+    assert task.content_hash == content_hash(changed)
+
+
+def test_legacy_row_without_hash_compares_values():
+    task = Task(user_id=1, title="Standup", description="Daily", content_hash=None)
+
+    assert apply_if_changed(task, {"description": "Daily"}) is False
+    assert task.content_hash is None
+    assert apply_if_changed(task, {"description": "Weekly"}) is True
+
+
+def test_new_task_starts_ready_and_takes_upstream_status_on_next_sync():
+    closed = {"title": "[ENG-1] Old bug", "status": "done"}
+    task = new_synced_task(1, "linear", closed, status="ready")
+    assert task.status == "ready"
+
+    assert apply_if_changed(task, closed) is True
+    assert task.status == "done"
+    assert apply_if_changed(task, closed) is False
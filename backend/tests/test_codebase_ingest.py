@@ -0,0 +1,98 @@
+import asyncio
+
+from app.models import CodebaseFile
+from app.services import codebase_ingest
+from app.services.code_splitting import read_and_split
+from app.services.rag_service import chunk_id
+
+
+class RecordingRAG:
+    def __init__(self):
+        self.embedding_model = "hashing-v1-768"
+        self.ingested = []
+        self.deleted = []
+
+    async def ingest_documents(self, documents):
+        self.ingested.extend(documents)
+        return sum(len(d["chunks"]) for d in documents)
+
+    async def delete_chunks(self, ids):
+        self.deleted.extend(ids)
+        return len(ids)
+
+
+def test_walk_honours_gitignore(tmp_path, monkeypatch):
+    monkeypatch.setattr(codebase_ingest, "_git_ls_files", lambda root: None)
+    (tmp_path / ".gitignore").write_text("*.log\n/build/\nsecrets.py\n!keep.log\n")
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "main.py").write_text("print('hi')\n")
+    (tmp_path / "app" / "secrets.py").write_text("KEY = 1\n")
+    (tmp_path / "app" / ".gitignore").write_text("generated/\n")
+    (tmp_path / "app" / "generated").mkdir()
+    (tmp_path / "app" / "generated" / "schema.py").write_text("x = 1\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.js").write_text("x\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "lib.js").write_text("x\n")
+    (tmp_path / "keep.log").write_text("x\n")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    (tmp_path / "README.md").write_text("# Readme\n")
+
+    assert codebase_ingest.list_source_files(str(tmp_path)) == ["README.md", "app/main.py"]
+
+
+def test_read_and_split_skips_unchanged_and_binary(tmp_path):
+    (tmp_path / "mod.py").write_text("def f():\n    return 1\n\n\nclass A:\n    pass\n")
+    (tmp_path / "blob.py").write_bytes(b"\0\1\2")
+
+    path, sha, pieces = read_and_split(str(tmp_path), "mod.py")
+    assert pieces and pieces[0].startswith("File: mod.py\n")
+    assert read_and_split(str(tmp_path), "mod.py", known_sha=sha) == ("mod.py", sha, None)
+    assert read_and_split(str(tmp_path), "blob.py")[2] == []
+    assert read_and_split(str(tmp_path), "missing.py")[1] is None
+
+
+def test_reingest_only_touches_changed_files(tmp_path, session_factory, monkeypatch):
+    monkeypatch.setattr(codebase_ingest, "_git_ls_files", lambda root: None)
+    monkeypatch.setattr(codebase_ingest.rag_cache, "bump_corpus_versions", lambda owners: None)
+    (tmp_path / "a.py").write_text("A = 1\n")
+    (tmp_path / "b.py").write_text("B = 2\n")
+    rag = RecordingRAG()
+
+    def ingest():
+        return asyncio.run(codebase_ingest.ingest_codebase(rag, str(tmp_path), session_factory, max_workers=1))
+
+    assert ingest() == 2
+    assert ingest() == 0
+    assert len(rag.ingested) == 2
+
+    (tmp_path / "a.py").write_text("A = 10\n")
+    (tmp_path / "b.py").unlink()
+    assert ingest() == 1
+    assert rag.ingested[-1]["metadata"]["path"] == "a.py"
+    assert len(rag.deleted) == 1
+
+    db = session_factory()
+    assert [row.path for row in db.query(CodebaseFile)] == ["a.py"]
+    db.close()
+
+    # Another embedding provider: unchanged files are re-embedded too
+    rag.embedding_model = "models/embedding-001"
+    assert ingest() == 1
+    assert ingest() == 0
+
+
+def test_roots_do_not_share_chunks(tmp_path, session_factory, monkeypatch):
+    monkeypatch.setattr(codebase_ingest, "_git_ls_files", lambda root: None)
+    monkeypatch.setattr(codebase_ingest.rag_cache, "bump_corpus_versions", lambda owners: None)
+    for name in ("one", "two"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "main.py").write_text(f"NAME = '{name}'\n")
+    rag = RecordingRAG()
+    for name in ("one", "two"):
+        asyncio.run(codebase_ingest.ingest_codebase(rag, str(tmp_path / name), session_factory, max_workers=1))
+
+    assert len({d["id"] for d in rag.ingested}) == 2
+    (tmp_path / "one" / "main.py").unlink()
+    asyncio.run(codebase_ingest.ingest_codebase(rag, str(tmp_path / "one"), session_factory, max_workers=1))
+    assert rag.deleted == [chunk_id(None, "codebase", codebase_ingest.source_id(str(tmp_path / "one"), "main.py"), 0)]
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+
+from app.models import FocusSession, Task, UserDailyStats
+from app.services.daily_stats import backfill_daily_stats, get_daily_stats, get_streaks, local_today
+
+
+def _rollup(db, user_id):
+    db.expire_all()
+    return {
+        row.day: (row.tasks_completed, row.focus_minutes)
+        for row in db.query(UserDailyStats).filter(UserDailyStats.user_id == user_id)
+    }
+
+
+def test_rollup_follows_completion_and_focus(client, db_session, user, auth_headers):
+    task = Task(user_id=user.id, title="Write report", status="ready")
+    db_session.add(task)
+    db_session.commit()
+    today = datetime.utcnow().date()
+
+    assert client.post(f"/api/prepared-tasks/{task.id}/complete", headers=auth_headers).status_code == 200
+    assert _rollup(db_session, user.id) == {today: (1, 0)}
+
+    # Archiving keeps the count, re-opening takes it back
+    assert client.post("/api/prepared-tasks/batch", headers=auth_headers, json=[
+        {"id": task.id, "op": "archive"},
+    ]).status_code == 200
+    assert _rollup(db_session, user.id) == {today: (1, 0)}
+    assert client.post("/api/prepared-tasks/batch", headers=auth_headers, json=[
+        {"id": task.id, "op": "start"},
+    ]).status_code == 200
+    assert _rollup(db_session, user.id) == {today: (0, 0)}
+
+    assert client.post("/api/stats/focus", headers=auth_headers, json={"durationMinutes": 90}).status_code == 200
+    assert _rollup(db_session, user.id) == {today: (0, 90)}
+
+    weekly = client.get("/api/stats/weekly", headers=auth_headers).json()
+    assert weekly["data"][-1]["hours"] == 1.5
+    assert weekly["summary"]["totalTasks"] == 0
+
+
+def test_backfill_rebuilds_rollup(db_session, user):
+    day = datetime(2026, 3, 2, 9, 0)
+    db_session.add_all([
+        Task(user_id=user.id, title="Done", status="completed", completed_at=day),
+        Task(user_id=user.id, title="Done later", status="archived", completed_at=day + timedelta(days=1)),
+        FocusSession(user_id=user.id, duration_minutes=25, completed_at=day),
+    ])
+    db_session.commit()
+    expected = _rollup(db_session, user.id)
+
+    # Drift the table, then rebuild it from the source rows
+    db_session.query(UserDailyStats).delete()
+    db_session.add(UserDailyStats(user_id=user.id, day=date(2026, 1, 1), tasks_completed=7))
+    db_session.commit()
+
+    assert backfill_daily_stats(db_session, user.id) == 2
+    assert _rollup(db_session, user.id) == expected == {
+        date(2026, 3, 2): (1, 25),
+        date(2026, 3, 3): (1, 0),
+    }
+    assert list(get_daily_stats(db_session, user.id, date(2026, 3, 3), date(2026, 3, 9))) == [date(2026, 3, 3)]
+
+
+def test_streaks_span_long_histories(db_session, user):
+    today = date(2026, 10, 19)
+    # 400 active days ending yesterday, a gap, then an older 3-day run
+    days = [today - timedelta(days=i) for i in range(1, 401)] + [today - timedelta(days=i) for i in range(405, 408)]
+    db_session.add_all([UserDailyStats(user_id=user.id, day=d, focus_minutes=25) for d in days])
+    # A day whose completion was taken back is not active
+    db_session.add(UserDailyStats(user_id=user.id, day=today - timedelta(days=402), tasks_completed=0))
+    db_session.commit()
+
+    assert get_streaks(db_session, user.id, today) == {"current": 400, "longest": 400}
+    # Today not active yet, and yesterday neither: the streak is broken
+    assert get_streaks(db_session, user.id, today + timedelta(days=2))["current"] == 0
+    # Only days up to "today" count
+    assert get_streaks(db_session, user.id, today - timedelta(days=405)) == {"current": 3, "longest": 3}
+
+
+def test_days_follow_the_user_timezone(client, db_session, user, auth_headers, monkeypatch):
+    from app.routers import users as users_router
+
+    scheduled = []
+    monkeypatch.setattr(users_router, "schedule_daily_stats_backfill", scheduled.append)
+    assert client.patch("/api/users/me", headers=auth_headers, json={"timezone": "Mars/Olympus"}).status_code == 400
+    response = client.patch("/api/users/me", headers=auth_headers, json={"timezone": "Asia/Tokyo"})
+    assert response.json()["timezone"] == "Asia/Tokyo"
+    assert scheduled == [user.id]
+
+    # 20:30 UTC is already the next morning in Tokyo
+    evening = datetime(2026, 3, 2, 20, 30)
+    db_session.add_all([
+        Task(user_id=user.id, title="Late work", status="completed", completed_at=evening),
+        FocusSession(user_id=user.id, duration_minutes=30, completed_at=evening),
+    ])
+    db_session.commit()
+    assert _rollup(db_session, user.id) == {date(2026, 3, 3): (1, 30)}
+    assert backfill_daily_stats(db_session, user.id) == 1
+    assert _rollup(db_session, user.id) == {date(2026, 3, 3): (1, 30)}
+
+    user.timezone = "UTC"
+    db_session.commit()
+    backfill_daily_stats(db_session, user.id)
+    assert _rollup(db_session, user.id) == {date(2026, 3, 2): (1, 30)}
+    assert local_today("Asia/Tokyo", evening) == date(2026, 3, 3)
+
+
+def test_backfill_keeps_updated_at(db_session, user):
+    # Legacy completions are dated by updated_at without moving it (pull checkpoints)
+    updated = datetime(2024, 1, 1, 12, 0)
+    task = Task(user_id=user.id, title="Legacy", status="completed")
+    db_session.add(task)
+    db_session.commit()
+    # As rows from before completed_at existed
+    db_session.execute(Task.__table__.update().values(completed_at=None, updated_at=updated))
+    db_session.commit()
+
+    backfill_daily_stats(db_session, user.id)
+    db_session.expire_all()
+    assert (task.completed_at, task.updated_at) == (updated, updated)
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class FlakyEmbeddings:
+    """Fails the first request, then embeds each text as [len(text)]"""
+
+    def __init__(self):
+        self.requests = []
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        if len(self.requests) == 1:
+            raise RuntimeError("429 Too Many Requests")
+        return [[float(len(t))] for t in texts]
+
+
+def test_concurrent_callers_share_batches_and_retry():
+    inner = FlakyEmbeddings()
+    batcher = EmbeddingBatcher(inner, max_batch_size=4, max_wait_ms=20, max_concurrency=2, backoff_seconds=0.01)
+
+    async def main():
+        results = await asyncio.gather(
+            batcher.embed(["a", "bb"]),
+            batcher.embed(["ccc"]),
+            batcher.embed(["dddd", "eeeee", "ffffff"]),
+        )
+        # Nothing left pending when the loop closes; a later embed starts over
+        await batcher.aclose()
+        assert [t for t in asyncio.all_tasks() if t is not asyncio.current_task()] == []
+        assert await batcher.embed(["g"]) == [[1.0]]
+        await batcher.aclose()
+        return results
+
+    results = asyncio.run(main())
+    assert results == [[[1.0], [2.0]], [[3.0]], [[4.0], [5.0], [6.0]]]
+    # Six texts in batches of at most four; the failed first request was retried
+    successful = inner.requests[1:-1]
+    assert all(len(batch) <= 4 for batch in successful)
+    assert sorted(t for batch in successful for t in batch) == ["a", "bb", "ccc", "dddd", "eeeee", "ffffff"]
+    assert inner.requests[0] in successful
+    assert inner.requests[-1] == ["g"]
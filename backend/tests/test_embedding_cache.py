@@ -0,0 +1,35 @@
+from app.models import EmbeddingCache
+from app.services.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+    def embed_query(self, text):
+        return [0.0, 1.0]
+
+
+def test_only_unseen_chunks_are_embedded(session_factory):
+    inner = CountingEmbeddings()
+    cached = CachedEmbeddings(inner, model="test-model", session_factory=session_factory)
+
+    first = cached.embed_documents(["alpha", "beta", "alpha"])
+    assert inner.calls == [["alpha", "beta"]]
+    assert first == [[5.0, 0.5], [4.0, 0.5], [5.0, 0.5]]
+
+    assert cached.embed_documents(["beta", "gamma"]) == [[4.0, 0.5], [5.0, 0.5]]
+    assert inner.calls[-1] == ["gamma"]
+    assert cached.stats["hits"] == 2 and cached.stats["misses"] == 3 and cached.stats["api_requests"] == 2
+
+    # Entries are per model
+    other = CachedEmbeddings(inner, model="other-model", session_factory=session_factory)
+    other.embed_documents(["alpha"])
+    assert inner.calls[-1] == ["alpha"]
+    db = session_factory()
+    assert db.query(EmbeddingCache).count() == 4
+    db.close()
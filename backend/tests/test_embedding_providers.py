@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from app.services.embedding_providers import HashingEmbeddings, create_embedding_provider
+
+
+def test_hashing_embeddings_are_deterministic_and_normalized():
+    embeddings = HashingEmbeddings(dimensions=768)
+    vector = embeddings.embed_query("Standup moved to 10:30 in #eng-sync")
+    assert len(vector) == 768
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+    assert embeddings.embed_documents(["Standup moved to 10:30 in #eng-sync"]) == [vector]
+    assert embeddings.embed_query("") == [0.0] * 768
+
+    # Same vector in another interpreter (str hash() is salted per process)
+    script = "from app.services.embedding_providers import HashingEmbeddings; print(HashingEmbeddings(768).embed_query('release ABC-123')[:8])"
+    other = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert other.strip() == str(embeddings.embed_query("release ABC-123")[:8])
+
+
+def test_hashing_embeddings_rank_shared_words_first():
+    embeddings = HashingEmbeddings()
+    query = np.array(embeddings.embed_query("when is the budget review?"))
+    related, unrelated = (np.array(v) for v in embeddings.embed_documents([
+        "Budget review meeting on Friday with finance",
+        "Deploy the new onboarding flow to staging",
+    ]))
+    assert query @ related > query @ unrelated
+
+
+def test_provider_is_selected_by_name():
+    provider = create_embedding_provider("hashing", 768)
+    assert provider.model == "hashing-v1-768" and not provider.remote
+    with pytest.raises(ValueError):
+        create_embedding_provider("word2vec", 768)
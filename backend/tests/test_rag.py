@@ -0,0 +1,99 @@
+from app.services.rag_service import chunk_id, normalize_timestamp
+
+
+def test_chunk_ids_are_stable_and_scoped():
+    assert chunk_id("5", "gmail", "msg-1", 0) == chunk_id("5", "gmail", "msg-1", 0)
+    assert chunk_id("5", "gmail", "msg-1", 0) != chunk_id("6", "gmail", "msg-1", 0)
+    assert chunk_id("5", "gmail", "msg-1", 0) != chunk_id("5", "gmail", "msg-1", 1)
+
+
+def test_source_timestamps_normalize_to_epoch_seconds():
+    moment = 1760865600.0  # 2025-10-19 09:20:00 UTC
+    assert normalize_timestamp("1760865600.000100") == 1760865600.0001  # Slack ts
+    assert normalize_timestamp("2025-10-19T18:20:00+09:00") == moment  # Calendar dateTime
+    assert normalize_timestamp("2025-10-19T09:20:00Z") == moment
+    assert normalize_timestamp("Sun, 19 Oct 2025 09:20:00 +0000") == moment  # Gmail Date header
+    assert normalize_timestamp("2025-10-19") == moment - (9 * 3600 + 20 * 60)  # all-day event, UTC midnight
+    assert normalize_timestamp("") is None
+    assert normalize_timestamp("next tuesday") is None
+
+
+class FakeSyncRedis:
+    """Just the sync calls rag_cache makes"""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_result_cache_is_invalidated_by_ingestion(monkeypatch):
+    from app.services import rag_cache
+
+    monkeypatch.setattr(rag_cache, "_client", FakeSyncRedis())
+    digest = rag_cache.query_hash("upcoming events?", n_results=10, mode="vector")
+    version, cached = rag_cache.get_cached_results("5", digest)
+    assert cached is None
+    rag_cache.cache_results("5", version, digest, [{"content": "Standup at 10", "score": 0.1}])
+    assert rag_cache.get_cached_results("5", digest) == (version, [{"content": "Standup at 10", "score": 0.1}])
+
+    # Another owner's ingest leaves it alone; the owner's own ingest retires it
+    rag_cache.bump_corpus_versions(["6", "shared"])
+    assert rag_cache.get_cached_results("5", digest)[1] is not None
+    rag_cache.bump_corpus_versions(["5"])
+    assert rag_cache.get_cached_results("5", digest)[1] is None
+
+
+def test_gmail_prunes_only_a_fully_fetched_receive_window(db_session, user, monkeypatch):
+    import asyncio
+    from app.models import OAuthToken
+    from app.routers import gmail
+    from app.services import ingestion
+
+    class RecordingRAG:
+        async def ingest_documents(self, documents, user_id=None, source=None, window=None):
+            self.documents, self.window = documents, window
+            return len(documents)
+
+        async def aclose(self):
+            pass
+
+    def mail(id, received_at, date="Mon, 1 Jan 2001 00:00:00 +0000"):
+        # Back-dated Date header: the window must follow Gmail's receive time
+        return gmail.EmailMessage(id=id, threadId=id, snippet="", sender="a", subject="s", date=date, receivedAt=received_at)
+
+    db_session.add(OAuthToken(user_id=user.id, provider="google", access_token="token"))
+    db_session.commit()
+    rag = RecordingRAG()
+    monkeypatch.setattr(ingestion, "get_rag_service", lambda: rag)
+    monkeypatch.setattr(ingestion, "decrypt_token", lambda token: token)
+    service = ingestion.IngestionService(db_session)
+
+    async def fetched(access_token, limit):
+        return [mail("a", 1700000200.0), mail("b", 1700000100.0)], 2
+    monkeypatch.setattr(gmail, "fetch_gmail_messages", fetched)
+    asyncio.run(service.ingest_user_emails(user.id))
+    assert rag.window[0] == 1700000100.0
+    assert [d["metadata"]["timestamp"] for d in rag.documents] == [1700000200.0, 1700000100.0]
+
+    async def one_detail_failed(access_token, limit):
+        return [mail("a", 1700000200.0)], 2
+    monkeypatch.setattr(gmail, "fetch_gmail_messages", one_detail_failed)
+    asyncio.run(service.ingest_user_emails(user.id))
+    assert rag.window is None
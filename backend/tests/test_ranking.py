@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from app.models import Task
+from app.services.ranking import is_valid_rank_key, rank_between, rank_sequence
+
+
+def test_rank_between_stays_ordered_under_repeated_splits():
+    keys = [rank_between(None, None)]
+    rng = random.Random(7)
+    for _ in range(500):
+        i = rng.randrange(len(keys) + 1)
+        lo = keys[i - 1] if i > 0 else None
+        hi = keys[i] if i < len(keys) else None
+        key = rank_between(lo, hi)
+        assert (lo is None or lo < key) and (hi is None or key < hi)
+        keys.insert(i, key)
+    assert keys == sorted(keys)
+
+    with pytest.raises(ValueError):
+        rank_between("b", "a")
+    # No key sorts between "a" and "a0": keys ending in "0" are refused
+    with pytest.raises(ValueError):
+        rank_between("a", "a0")
+    assert not is_valid_rank_key("a0") and is_valid_rank_key("a") and is_valid_rank_key("")
+
+
+def test_rank_sequence_is_sorted_and_short():
+    keys = rank_sequence(10_000)
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert max(len(k) for k in keys) <= 5
+
+
+def test_move_writes_only_the_moved_task(client, db_session, user, auth_headers):
+    tasks = [Task(user_id=user.id, title=f"Task {i}", position=i) for i in range(5)]
+    db_session.add_all(tasks)
+    db_session.commit()
+    ids = [t.id for t in tasks]
+
+    # First move ranks the legacy (position-ordered) list once
+    client.post(f"/api/prepared-tasks/{ids[4]}/move", json={"before_id": ids[0]}, headers=auth_headers)
+    db_session.expire_all()
+    before = {t.id: (t.rank_key, t.updated_at) for t in db_session.query(Task)}
+
+    response = client.post(f"/api/prepared-tasks/{ids[0]}/move",
+                           json={"after_id": ids[2], "before_id": ids[3]}, headers=auth_headers)
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    after = {t.id: (t.rank_key, t.updated_at) for t in db_session.query(Task)}
+    assert [i for i in ids if after[i] != before[i]] == [ids[0]]
+
+    order = [t["id"] for t in client.get("/api/prepared-tasks", headers=auth_headers).json()]
+    assert order == [ids[4], ids[1], ids[2], ids[0], ids[3]]
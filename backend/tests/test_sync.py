@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from app.models import Task
+
+
+def test_pull_does_not_skip_rows_sharing_a_timestamp(client, db_session, user, auth_headers):
+    stamp = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(7):
+        db_session.add(Task(user_id=user.id, title=f"Task {i}", updated_at=stamp, created_at=stamp))
+    db_session.commit()
+
+    seen = []
+    params = {"limit": 3}
+    for _ in range(5):
+        body = client.get("/api/sync/tasks", params=params, headers=auth_headers).json()
+        if not body["documents"]:
+            break
+        seen.extend(doc["id"] for doc in body["documents"])
+        params = {
+            "limit": 3,
+            "min_updated_at": body["checkpoint"]["updated_at"],
+            "min_id": body["checkpoint"]["id"],
+        }
+
+    assert sorted(seen, key=int) == [str(t.id) for t in db_session.query(Task).order_by(Task.id)]
+    # An empty page echoes the checkpoint back
+    assert body["checkpoint"]["id"] == params["min_id"]
+
+
+def _pull_all(client, auth_headers):
+    return client.get("/api/sync/tasks", params={"limit": 100}, headers=auth_headers).json()["documents"]
+
+
+def test_push_applies_changes_reports_conflicts_and_creates_offline_tasks(client, db_session, user, auth_headers):
+    fresh = Task(user_id=user.id, title="Fresh")
+    stale = Task(user_id=user.id, title="Stale")
+    db_session.add_all([fresh, stale])
+    db_session.commit()
+    masters = {doc["title"]: doc for doc in _pull_all(client, auth_headers)}
+
+    # Server-side edit after the client pulled: the client's view of "Stale" is outdated
+    stale.title = "Edited on server"
+    stale.updated_at = datetime(2030, 1, 1)
+    db_session.commit()
+
+    offline_id = "0b6c3f0e-6a52-4c35-9d0e-3b8b2c1f9a10"
+    rows = [
+        {"newDocumentState": {**masters["Fresh"], "status": "completed"}, "assumedMasterState": masters["Fresh"]},
+        {"newDocumentState": {**masters["Stale"], "status": "completed"}, "assumedMasterState": masters["Stale"]},
+        {"newDocumentState": {"id": offline_id, "title": "Written offline", "updated_at": "2026-01-01T00:00:00Z"},
+         "assumedMasterState": None},
+    ]
+    body = client.post("/api/sync/tasks", json=rows, headers=auth_headers).json()
+
+    assert [c["title"] for c in body["conflicts"]] == ["Edited on server"]
+    docs = {doc["id"]: doc for doc in _pull_all(client, auth_headers)}
+    assert docs[masters["Fresh"]["id"]]["status"] == "completed"
+    assert docs[masters["Stale"]["id"]]["status"] != "completed"
+    assert docs[offline_id]["title"] == "Written offline"
+
+    # Re-pushing the offline document updates it instead of inserting a duplicate
+    rows = [{"newDocumentState": {**docs[offline_id], "title": "Renamed"}, "assumedMasterState": docs[offline_id]}]
+    assert client.post("/api/sync/tasks", json=rows, headers=auth_headers).json()["conflicts"] == []
+    assert db_session.query(Task).filter(Task.client_id == offline_id).count() == 1
+
+
+def test_consecutive_pushes_reuse_the_pushed_document_as_assumed_state(client, db_session, user, auth_headers):
+    db_session.add(Task(user_id=user.id, title="Draft"))
+    db_session.commit()
+    master = _pull_all(client, auth_headers)[0]
+
+    # Two edits before any pull: RxDB assumes its first pushed state, with its own updated_at
+    first = {**master, "title": "Draft 2", "updated_at": "2026-10-19T09:00:00+00:00"}
+    second = {**first, "title": "Draft 3", "updated_at": "2026-10-19T09:00:05+00:00"}
+    for new, assumed in ((first, master), (second, first)):
+        rows = [{"newDocumentState": new, "assumedMasterState": assumed}]
+        assert client.post("/api/sync/tasks", json=rows, headers=auth_headers).json()["conflicts"] == []
+    assert _pull_all(client, auth_headers)[0]["title"] == "Draft 3"
+
+
+def test_commits_publish_changed_task_users(session_factory, user, monkeypatch):
+    from app.services import task_events
+
+    published = []
+    monkeypatch.setattr(task_events, "publish_task_changes", lambda ids: published.append(set(ids)))
+    task_events.register_task_events(session_factory)
+
+    db = session_factory()
+    db.add(Task(user_id=user.id, title="Live"))
+    db.commit()
+    db.add(Task(user_id=user.id, title="Rolled back"))
+    db.flush()
+    db.rollback()
+    db.close()
+
+    assert published == [{user.id}]
+
+
+def test_delta_pull_sends_only_changed_fields(client, db_session, user, auth_headers):
+    task = Task(user_id=user.id, title="Write report", description="Long description " * 20,
+                created_at=datetime(2025, 12, 1), updated_at=datetime(2026, 1, 1))
+    db_session.add(task)
+    db_session.commit()
+    checkpoint = client.get("/api/sync/tasks", headers=auth_headers).json()["checkpoint"]
+
+    task.status = "completed"
+    db_session.commit()
+
+    params = {"delta": 1, "min_updated_at": checkpoint["updated_at"], "min_id": checkpoint["id"]}
+    doc = client.get("/api/sync/tasks", params=params, headers=auth_headers).json()["documents"][0]
+    assert doc["_delta"] is True
+    assert doc["status"] == "completed"
+    assert "description" not in doc and "title" not in doc
+
+
+def test_pull_negotiates_msgpack_and_compression(client, db_session, user, auth_headers):
+    import brotli
+    import msgpack
+
+    db_session.add_all([Task(user_id=user.id, title=f"Task {i}") for i in range(50)])
+    db_session.commit()
+    headers = {**auth_headers, "Accept": "application/msgpack", "Accept-Encoding": "br"}
+
+    with client.stream("GET", "/api/sync/tasks", headers=headers) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert len(msgpack.unpackb(brotli.decompress(raw))["documents"]) == 50
+
+    # httpx decodes gzip transparently
+    response = client.get("/api/sync/tasks", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["documents"]) == 50
@@ -0,0 +1,38 @@
+import pytest
+
+from app.models import Task
+from app.services.task_search import ensure_search_index
+
+
+@pytest.fixture
+def search_index(session_factory):
+    with session_factory.kw["bind"].connect() as conn:
+        ensure_search_index(conn)
+
+
+def test_search_ranks_prefix_matches_and_highlights(client, db_session, user, auth_headers, search_index):
+    db_session.add_all([
+        Task(user_id=user.id, title="Deploy <api> server", description="Roll out the new build"),
+        Task(user_id=user.id, title="Write notes", description="Notes about the deployment checklist"),
+        Task(user_id=user.id, title="Deploy old thing", status="archived"),
+        Task(user_id=user.id + 1, title="Deploy someone else's task"),
+    ])
+    db_session.commit()
+
+    results = client.get("/api/tasks/search", params={"q": "depl"}, headers=auth_headers).json()
+
+    # Title hits rank above description hits; archived and other users' tasks are excluded
+    assert [r["title"] for r in results] == ["Deploy <api> server", "Write notes"]
+    assert results[0]["title_highlight"] == "<mark>Deploy</mark> &lt;api&gt; server"
+    assert "<mark>deployment</mark>" in results[1]["snippet"]
+
+
+def test_search_index_follows_updates(client, db_session, user, auth_headers, search_index):
+    task = Task(user_id=user.id, title="Quarterly report")
+    db_session.add(task)
+    db_session.commit()
+    task.title = "Annual summary"
+    db_session.commit()
+
+    assert client.get("/api/tasks/search", params={"q": "quarterly"}, headers=auth_headers).json() == []
+    assert len(client.get("/api/tasks/search", params={"q": "annual summ"}, headers=auth_headers).json()) == 1
@@ -0,0 +1,121 @@
+from app.core.redis import redis_client
+from app.models import Task
+
+
+class FakeRedis:
+    """Just the async calls task_cache makes"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+def test_prepared_tasks_etag_and_cache(client, db_session, user, auth_headers, monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_client, "client", fake)
+    db_session.add(Task(user_id=user.id, title="Write report", status="ready"))
+    db_session.commit()
+
+    first = client.get("/api/prepared-tasks", headers=auth_headers)
+    assert first.status_code == 200
+    assert first.json()[0]["estimatedTime"] == "30分"
+    etag = first.headers["etag"]
+
+    assert client.get("/api/prepared-tasks", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    # Served from the cache: the list changes in the DB but the version does not
+    db_session.add(Task(user_id=user.id, title="Not yet visible", status="ready"))
+    db_session.commit()
+    assert len(client.get("/api/prepared-tasks", headers=auth_headers).json()) == 1
+
+    # A write bumps the version (normally done by the after_commit hook)
+    key = f"tasks:version:{user.id}"
+    fake.data[key] = str(int(fake.data[key]) + 1)
+    second = client.get("/api/prepared-tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert len(second.json()) == 2
+
+
+def test_prepared_tasks_without_redis(client, db_session, user, auth_headers):
+    db_session.add(Task(user_id=user.id, title="Write report", status="ready"))
+    db_session.commit()
+
+    response = client.get("/api/prepared-tasks", headers=auth_headers)
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert [t["title"] for t in response.json()] == ["Write report"]
+
+
+def test_prepared_tasks_pages_with_cursor_and_sparse_fields(client, db_session, user, auth_headers):
+    # Ties on position are broken by id (descending), so no page boundary drops a row
+    db_session.add_all([Task(user_id=user.id, title=f"Task {i}", position=i // 3) for i in range(7)])
+    db_session.commit()
+
+    seen, params = [], {"limit": 3, "fields": "title"}
+    while True:
+        response = client.get("/api/prepared-tasks", params=params, headers=auth_headers)
+        page = response.json()
+        assert all(set(item) == {"id", "title"} for item in page)
+        seen.extend(item["title"] for item in page)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+
+    assert seen == ["Task 2", "Task 1", "Task 0", "Task 5", "Task 4", "Task 3", "Task 6"]
+    # Callers that never ask for a page keep getting the whole list
+    response = client.get("/api/prepared-tasks", headers=auth_headers)
+    assert len(response.json()) == 7 and "x-next-cursor" not in response.headers
+    assert client.get("/api/prepared-tasks", params={"fields": "secret"}, headers=auth_headers).status_code == 400
+    assert client.get("/api/prepared-tasks", params={"after": "garbage"}, headers=auth_headers).status_code == 400
+
+
+def test_batch_applies_operations_in_one_request(client, db_session, user, auth_headers):
+    tasks = [Task(user_id=user.id, title=f"Task {i}", status="ready") for i in range(3)]
+    db_session.add_all(tasks)
+    db_session.commit()
+    a, b, c = (t.id for t in tasks)
+
+    response = client.post("/api/prepared-tasks/batch", headers=auth_headers, json=[
+        {"id": a, "op": "complete"},
+        {"id": b, "op": "update", "fields": {"title": "Renamed", "estimated_time": "1h"}},
+        {"id": c, "op": "archive"},
+        {"id": c, "op": "start"},
+        {"id": 9999, "op": "start"},
+        {"id": a, "op": "update", "fields": {"user_id": 2}},
+    ])
+    assert [r["status"] for r in response.json()["results"]] == ["ok", "ok", "ok", "invalid", "not_found", "invalid"]
+
+    db_session.expire_all()
+    by_id = {t.id: t for t in db_session.query(Task)}
+    assert by_id[a].status == "completed" and by_id[a].user_id == user.id
+    assert (by_id[b].title, by_id[b].estimated_time, by_id[b].status) == ("Renamed", "1h", "ready")
+    assert by_id[c].status == "archived"
+
+
+def test_failed_version_bump_drops_the_version(monkeypatch):
+    from app.services import task_events
+
+    class BrokenPipeline:
+        def __init__(self):
+            self.deleted = []
+
+        def pipeline(self, transaction=False):
+            raise ConnectionError("redis went away")
+
+        def delete(self, *keys):
+            self.deleted.extend(keys)
+
+    fake = BrokenPipeline()
+    monkeypatch.setattr(task_events, "_redis", fake)
+    task_events.publish_task_changes({1, 2})
+    assert sorted(fake.deleted) == ["tasks:version:1", "tasks:version:2"]
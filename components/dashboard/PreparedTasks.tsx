@@ -163,7 +163,7 @@ function SortableTaskItem(props: {
 
 export function PreparedTasks() {
     // Switch to RxDB hook
-    const { tasks: rxTasks, loading, startTask, deleteTask, reorderTasks } = useRxTasks();
+    const { tasks: rxTasks, loading, startTask, deleteTask, moveTask } = useRxTasks();
 
     // Map RxTask to PreparedTask shape
     const tasks: PreparedTask[] = rxTasks.map(t => ({
@@ -213,15 +213,14 @@ export function PreparedTasks() {
             const newIndex = rxTasks.findIndex(t => t.id === over.id);
 
             if (oldIndex !== -1 && newIndex !== -1) {
-                // Optimistic reorder if using local state? 
                 // RxDB will trigger update from DB.
-                // We calculate the new order array and pass to reorderTasks.
-                const newOrderFn = arrayMove(rxTasks, oldIndex, newIndex);
-                // We re-assign updated 'position' index to each
-                const updated = newOrderFn.map((t, idx) => ({ ...t, position: idx }));
-
-                // Call hook
-                await reorderTasks(updated);
+                // Only the dragged task is rewritten: it gets a rank between its new neighbours.
+                const newOrder = arrayMove(rxTasks, oldIndex, newIndex);
+                await moveTask(
+                    String(active.id),
+                    newOrder[newIndex - 1]?.id ?? null,
+                    newOrder[newIndex + 1]?.id ?? null
+                );
             }
         }
     };
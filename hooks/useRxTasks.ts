@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { initDB, RxTaskCollection, TaskDocType } from '@/lib/rxdb';
 import { Subscription } from 'rxjs';
 import { v4 as uuidv4 } from 'uuid';
+import { rankBetween, rankSequence } from '@/lib/rank';
 
 export type RxTask = TaskDocType & {
     // Helper accessors if needed
@@ -20,12 +21,12 @@ export function useRxTasks() {
                 const db = await initDB();
                 setCollection(db.tasks);
 
-                // Initial Query: Not deleted, sorted by position
+                // Initial Query: Not deleted, sorted by rank (unranked first, by position)
                 const query = db.tasks.find({
                     selector: {
                         deleted: { $eq: false }
                     },
-                    sort: [{ position: 'asc' }]
+                    sort: [{ rank_key: 'asc' }, { position: 'asc' }]
                 });
 
                 sub = query.$.subscribe(docs => {
@@ -58,6 +59,7 @@ export function useRxTasks() {
             estimated_time: "15m",
             prepared_items: "[]",
             position: tasks.length,
+            rank_key: rankBetween(tasks.length ? tasks[tasks.length - 1].rank_key : null, null),
             deleted: false,
             updated_at: now,
             created_at: now
@@ -93,29 +95,30 @@ export function useRxTasks() {
         await updateTask(String(id), { deleted: true });
     };
 
-    const reorderTasks = async (newOrder: RxTask[]) => {
+    // Move one task between two neighbours: only the moved document is written.
+    // afterId ends up directly above it, beforeId directly below (null = list edge).
+    const moveTask = async (id: string, afterId: string | null, beforeId: string | null) => {
         if (!collection) return;
-        // Batch update positions
-        // This can be heavy if many tasks. DND-kit gives new array.
-        // We update the 'position' field for all affected tasks.
+        const now = new Date().toISOString();
 
-        // Optimistic UI handled by RxDB subscription update?
-        // Yes, but we need to write to DB.
+        // One-time: never-ranked tasks (they sort first) get keys ahead of the ranked ones
+        const ranks = new Map(tasks.map(t => [t.id, t.rank_key || '']));
+        const unranked = tasks.filter(t => !t.rank_key);
+        if (unranked.length > 0) {
+            const firstRanked = tasks.find(t => t.rank_key)?.rank_key ?? null;
+            const keys = rankSequence(unranked.length, null, firstRanked);
+            await Promise.all(unranked.map(async (task, i) => {
+                ranks.set(task.id, keys[i]);
+                const doc = await collection.findOne(task.id).exec();
+                if (doc) await doc.patch({ rank_key: keys[i], updated_at: now });
+            }));
+        }
 
-        // Simple approach: Iterate and update.
-        // Better: atomicUpdate if possible, or Promise.all
-        const now = new Date().toISOString();
-        const promises = newOrder.map((task, index) => {
-            if (task.position !== index) {
-                return collection.findOne(task.id).exec().then(doc => {
-                    if (doc) return doc.patch({ position: index, updated_at: now });
-                });
-            }
-            return Promise.resolve();
-        });
-        await Promise.all(promises);
+        const lo = afterId ? ranks.get(afterId) : null;
+        const hi = beforeId ? ranks.get(beforeId) : null;
+        const doc = await collection.findOne(id).exec();
+        if (doc) await doc.patch({ rank_key: rankBetween(lo, hi), updated_at: now });
     };
-
     return {
         tasks,
         loading,
@@ -124,6 +127,6 @@ export function useRxTasks() {
         startTask,
         completeTask,
         deleteTask,
-        reorderTasks
+        moveTask
     };
 }
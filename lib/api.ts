@@ -73,6 +73,58 @@ export interface SkillAnalysisResponse {
     summary: string;
 }
 
+export type SyncProvider = "github" | "todoist" | "notion" | "linear" | "slack";
+
+// Values come from a Redis hash, so counters arrive as strings
+export interface SyncJob {
+    job_id: string;
+    provider?: SyncProvider;
+    status?: "queued" | "running" | "done" | "failed";
+    pages_fetched?: string;
+    items_fetched?: string;
+    rows_applied?: string;
+    imported?: string;
+    error?: string;
+}
+
+export interface TaskSearchResult {
+    id: number;
+    title: string;
+    description: string;
+    status: string;
+    source: string;
+    score: number;
+    title_highlight: string;
+    snippet: string;
+}
+
+export interface TaskBatchOperation {
+    id: number;
+    op: "start" | "complete" | "archive" | "update";
+    fields?: Partial<Record<"title" | "description" | "status" | "estimated_time" | "prepared_items", string>>;
+}
+
+export interface TaskBatchResult {
+    id: number;
+    op: TaskBatchOperation["op"];
+    status: "ok" | "not_found" | "invalid";
+    detail?: string;
+}
+
+export interface PageParams {
+    limit?: number;
+    after?: string;
+    fields?: string[];
+}
+
+export interface Page<T> {
+    items: T[];
+    nextCursor: string | null;
+}
+
+// Server-side cap on ?limit=
+const MAX_PAGE_SIZE = 500;
+
 // API Client
 class VisionAPIClient {
     private baseUrl: string;
@@ -81,7 +133,7 @@ class VisionAPIClient {
         this.baseUrl = baseUrl;
     }
 
-    private async fetch<T>(endpoint: string, options?: RequestInit): Promise<T> {
+    private async request(endpoint: string, options?: RequestInit): Promise<Response> {
         const token = typeof window !== 'undefined' ? localStorage.getItem("vision-token") : null;
         console.log(`[VisionAPI] Fetching ${endpoint}, Token exists: ${!!token}`);
 
@@ -106,13 +158,44 @@ class VisionAPIClient {
             throw new Error(`API Error: ${response.status} ${response.statusText}`);
         }
 
+        return response;
+    }
+
+    private async fetch<T>(endpoint: string, options?: RequestInit): Promise<T> {
+        const response = await this.request(endpoint, options);
         return response.json();
     }
 
+    // Paginated list endpoints: ?limit=&after=&fields=, next cursor in X-Next-Cursor
+    async fetchPage<T>(endpoint: string, params: PageParams = {}): Promise<Page<T>> {
+        const query = new URLSearchParams();
+        if (params.limit) query.set("limit", String(params.limit));
+        if (params.after) query.set("after", params.after);
+        if (params.fields?.length) query.set("fields", params.fields.join(","));
+        const qs = query.toString();
+
+        const response = await this.request(qs ? `${endpoint}?${qs}` : endpoint);
+        return {
+            items: await response.json(),
+            nextCursor: response.headers.get("X-Next-Cursor"),
+        };
+    }
+
+    private async fetchAllPages<T>(endpoint: string, fields?: string[]): Promise<T[]> {
+        const items: T[] = [];
+        let after: string | null = null;
+        do {
+            const page: Page<T> = await this.fetchPage<T>(endpoint, { limit: MAX_PAGE_SIZE, after: after ?? undefined, fields });
+            items.push(...page.items);
+            after = page.nextCursor;
+        } while (after);
+        return items;
+    }
+
     // Prepared Tasks
     async getPreparedTasks(): Promise<PreparedTask[]> {
         if (useMock('tasks')) return []; // No mock data for tasks defined in this file currently
-        return this.fetch<PreparedTask[]>("/api/prepared-tasks");
+        return this.fetchAllPages<PreparedTask>("/api/prepared-tasks");
     }
 
     async startTask(taskId: number): Promise<void> {
@@ -131,6 +214,28 @@ class VisionAPIClient {
         });
     }
 
+    // Full-text search; highlights are HTML-escaped with matches in <mark>
+    async searchTasks(q: string, limit: number = 20): Promise<TaskSearchResult[]> {
+        const params = new URLSearchParams({ q, limit: String(limit) });
+        return this.fetch<TaskSearchResult[]>(`/api/tasks/search?${params}`);
+    }
+
+    // Several start/complete/archive/update operations in one request and transaction
+    async batchTasks(operations: TaskBatchOperation[]): Promise<{ results: TaskBatchResult[] }> {
+        return this.fetch("/api/prepared-tasks/batch", {
+            method: "POST",
+            body: JSON.stringify(operations),
+        });
+    }
+
+    // Move one task between two others (only that task is written)
+    async moveTask(taskId: number, afterId: number | null, beforeId: number | null): Promise<void> {
+        return this.fetch(`/api/prepared-tasks/${taskId}/move`, {
+            method: "POST",
+            body: JSON.stringify({ after_id: afterId, before_id: beforeId }),
+        });
+    }
+
     async reorderTasks(taskIds: number[]): Promise<void> {
         return this.fetch("/api/prepared-tasks/reorder", {
             method: "PUT",
@@ -148,7 +253,7 @@ class VisionAPIClient {
 
     // System / Proposals
     async fetchPendingProposals(): Promise<any[]> {
-        return this.fetch<any[]>("/api/proposals");
+        return this.fetchAllPages<any>("/api/proposals");
     }
 
     async approveProposal(id: number): Promise<any> {
@@ -169,6 +274,32 @@ class VisionAPIClient {
         });
     }
 
+    // Provider Sync Jobs
+    async triggerSync(provider: SyncProvider): Promise<SyncJob> {
+        return this.fetch<SyncJob>(`/api/${provider}/sync`, { method: 'POST' });
+    }
+
+    async getSyncJob(jobId: string): Promise<SyncJob> {
+        return this.fetch<SyncJob>(`/api/sync/jobs/${jobId}`);
+    }
+
+    // Follow a job over SSE; onUpdate fires per progress event. Returns a close() function.
+    watchSyncJob(jobId: string, onUpdate: (job: SyncJob) => void): () => void {
+        const token = typeof window !== 'undefined' ? localStorage.getItem("vision-token") : null;
+        const url = new URL(`${this.baseUrl}/api/sync/jobs/stream`);
+        url.searchParams.set('job_id', jobId);
+        if (token) url.searchParams.set('token', token);
+
+        const source = new EventSource(url.toString());
+        source.addEventListener('job', (e) => {
+            const job = JSON.parse((e as MessageEvent).data) as SyncJob;
+            onUpdate(job);
+            if (job.status === 'done' || job.status === 'failed') source.close();
+        });
+        source.addEventListener('error', () => source.close());
+        return () => source.close();
+    }
+
     async getSystemConfig(): Promise<{ is_cloud_env: boolean }> {
         return this.fetch<{ is_cloud_env: boolean }>("/api/system/config");
     }
@@ -182,7 +313,12 @@ class VisionAPIClient {
     // Context Snapshots (Infinite Resume)
     async getSnapshots(): Promise<ContextSnapshot[]> {
         if (useMock('tasks')) return [];
-        return this.fetch<ContextSnapshot[]>("/api/snapshots");
+        return this.fetchAllPages<ContextSnapshot>("/api/snapshots");
+    }
+
+    // Full snapshot (windows included) for lists fetched with a sparse fieldset
+    async getSnapshot(snapshotId: number): Promise<ContextSnapshot> {
+        return this.fetch<ContextSnapshot>(`/api/snapshots/${snapshotId}`);
     }
 
     async resumeSnapshot(snapshotId: number): Promise<void> {
@@ -201,7 +337,7 @@ class VisionAPIClient {
     // Skills
     async getSkills(): Promise<SkillNode[]> {
         if (useMock('skills')) return [];
-        return this.fetch<SkillNode[]>("/api/skills");
+        return this.fetchAllPages<SkillNode>("/api/skills");
     }
 
     // Stats
@@ -290,7 +426,7 @@ class VisionAPIClient {
     // Loss Aversion
 
     // User Profile
-    async updateProfile(data: { name?: string; bio?: string; avatar_url?: string; email?: string }): Promise<any> {
+    async updateProfile(data: { name?: string; bio?: string; avatar_url?: string; email?: string; timezone?: string }): Promise<any> {
         if (useMock('user')) throw new Error("Mock not implemented for user update");
         return this.fetch("/api/users/me", {
             method: "PATCH",
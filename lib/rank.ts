@@ -0,0 +1,36 @@
+// Lexicographic rank keys for manual task order (mirrors backend/app/services/ranking.py).
+// Keys are base-36 digit strings read as fractions in [0, 1); '' means "never ranked".
+
+const ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz";
+const BASE = ALPHABET.length;
+
+function digit(key: string, i: number): number {
+    const index = ALPHABET.indexOf(key[i]);
+    if (index < 0) throw new Error(`Invalid rank key: ${key}`);
+    return index;
+}
+
+// A key strictly between lo and hi (null/'' lo = from the start, null hi = to the end)
+export function rankBetween(lo: string | null | undefined, hi: string | null | undefined): string {
+    const low = lo || "";
+    let high: string | null = hi ?? null;
+    if (high !== null && low >= high) throw new Error(`Rank keys out of order: ${low} >= ${high}`);
+
+    let key = "";
+    for (let i = 0; ; i++) {
+        const l = i < low.length ? digit(low, i) : 0;
+        const h = high !== null && i < high.length ? digit(high, i) : BASE;
+        if (h - l > 1) return key + ALPHABET[Math.floor((l + h) / 2)];
+        key += ALPHABET[l];
+        // Our prefix is now below high's, so it no longer bounds us
+        if (h - l === 1) high = null;
+    }
+}
+
+// n ascending keys between lo and hi, split evenly so they stay short
+export function rankSequence(n: number, lo: string | null = null, hi: string | null = null): string[] {
+    if (n <= 0) return [];
+    const middle = rankBetween(lo, hi);
+    const left = Math.floor(n / 2);
+    return [...rankSequence(left, lo, middle), middle, ...rankSequence(n - left - 1, middle, hi)];
+}
@@ -2,8 +2,13 @@ import { createRxDatabase, RxDatabase, RxCollection, RxJsonSchema, addRxPlugin }
 import { getRxStorageDexie } from 'rxdb/plugins/storage-dexie';
 import { wrappedValidateAjvStorage } from 'rxdb/plugins/validate-ajv';
 import { replicateRxCollection } from 'rxdb/plugins/replication';
+import { RxDBMigrationSchemaPlugin } from 'rxdb/plugins/migration-schema';
+import type { RxReplicationPullStreamItem } from 'rxdb';
+import { Subject } from 'rxjs';
 import { v4 as uuidv4 } from 'uuid';
 
+addRxPlugin(RxDBMigrationSchemaPlugin);
+
 // Enable dev mode if needed for debugging (check node_env)
 // import { RxDBDevModePlugin } from 'rxdb/plugins/dev-mode';
 // addRxPlugin(RxDBDevModePlugin);
@@ -11,7 +16,7 @@ import { v4 as uuidv4 } from 'uuid';
 // Schema for Tasks
 const taskSchema: RxJsonSchema<any> = {
     title: 'task schema',
-    version: 0,
+    version: 1,
     primaryKey: 'id',
     type: 'object',
     properties: {
@@ -40,6 +45,10 @@ const taskSchema: RxJsonSchema<any> = {
         position: {
             type: 'number'
         },
+        // Lexicographic sort key (lib/rank.ts); '' = never ranked, ordered by position
+        rank_key: {
+            type: 'string'
+        },
         deleted: {
             type: 'boolean'
         },
@@ -59,6 +68,7 @@ export type TaskDocType = {
     estimated_time: string;
     prepared_items: string; // JSON string
     position: number;
+    rank_key: string;
     deleted: boolean;
     updated_at: string;
     created_at: string; // Added created_at
@@ -83,7 +93,11 @@ export const initDB = async (): Promise<RxMyDatabase> => {
 
         await db.addCollections({
             tasks: {
-                schema: taskSchema
+                schema: taskSchema,
+                migrationStrategies: {
+                    // v1: rank_key; existing documents start unranked
+                    1: (oldDoc: any) => ({ ...oldDoc, rank_key: '' })
+                }
             }
         });
 
@@ -98,31 +112,98 @@ export const initDB = async (): Promise<RxMyDatabase> => {
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+// Live server changes (SSE): one open connection per client instead of a poll loop.
+// The server sends "RESYNC" on (re)connect and { documents, checkpoint } on every change.
+function connectTaskStream(): Subject<RxReplicationPullStreamItem<TaskDocType, any>> {
+    const stream$ = new Subject<RxReplicationPullStreamItem<TaskDocType, any>>();
+    const token = localStorage.getItem('vision-token');
+    const url = new URL(`${API_URL}/api/sync/tasks/stream`);
+    if (token) url.searchParams.set('token', token);
+
+    const source = new EventSource(url.toString());
+    source.onmessage = (event) => stream$.next(JSON.parse(event.data));
+    // EventSource reconnects on its own; resync so nothing missed while offline is lost
+    source.onerror = () => stream$.next('RESYNC');
+    return stream$;
+}
+
+// Server timestamps are naive UTC
+const parseServerTime = (value: string) => Date.parse(/Z|[+-]\d\d:\d\d$/.test(value) ? value : `${value}Z`);
+
+// Apply { id, updated_at, _delta: true, ...changedFields } documents onto the local copies.
+// Returns null if a document is missing locally or has local edits newer than the
+// checkpoint (the local copy is then not the master state the delta is based on).
+async function mergeDeltas(
+    collection: RxTaskCollection,
+    documents: any[],
+    checkpointTime?: string
+): Promise<TaskDocType[] | null> {
+    const deltaIds = documents.filter(doc => doc._delta).map(doc => doc.id);
+    if (deltaIds.length === 0) return documents;
+
+    const local = await collection.findByIds(deltaIds).exec();
+    const merged: TaskDocType[] = [];
+    for (const doc of documents) {
+        if (!doc._delta) {
+            merged.push(doc);
+            continue;
+        }
+        const base = local.get(doc.id);
+        if (!base || !checkpointTime || parseServerTime(base.updated_at) > parseServerTime(checkpointTime)) {
+            return null;
+        }
+        const { _delta, ...changes } = doc;
+        merged.push({ ...base.toMutableJSON(), ...changes });
+    }
+    return merged;
+}
+
 function setupReplication(collection: RxTaskCollection) {
+    const pullStream$ = connectTaskStream();
+
     const replicationState = replicateRxCollection({
         collection,
         replicationIdentifier: 'task-sync-v1',
         pull: {
+            // Server allows up to 5000; large pages keep initial replication to few requests
+            batchSize: 1000,
             async handler(lastCheckpoint, batchSize) {
-                const minUpdatedAt = lastCheckpoint ? (lastCheckpoint as any).updated_at : null;
-                const url = new URL(`${API_URL}/api/sync/tasks`);
-                if (minUpdatedAt) url.searchParams.set('min_updated_at', minUpdatedAt);
-                url.searchParams.set('limit', batchSize.toString());
-
-                const token = localStorage.getItem('vision-token');
-                const response = await fetch(url.toString(), {
-                    headers: token ? { 'Authorization': `Bearer ${token}` } : {}
-                });
-                const data = await response.json();
-
-                return {
-                    documents: data.documents,
-                    checkpoint: data.checkpoint
+                // Checkpoint is the (updated_at, id) keyset of the last pulled document
+                const checkpoint = lastCheckpoint as { updated_at: string; id: number } | undefined;
+                const fetchPage = async (delta: boolean) => {
+                    const url = new URL(`${API_URL}/api/sync/tasks`);
+                    if (checkpoint?.updated_at) {
+                        url.searchParams.set('min_updated_at', checkpoint.updated_at);
+                        url.searchParams.set('min_id', String(checkpoint.id ?? 0));
+                        // Documents we already hold come back with only their changed fields
+                        if (delta) url.searchParams.set('delta', '1');
+                    }
+                    url.searchParams.set('limit', batchSize.toString());
+
+                    const token = localStorage.getItem('vision-token');
+                    // gzip/br is negotiated by the browser via Accept-Encoding
+                    const response = await fetch(url.toString(), {
+                        headers: token ? { 'Authorization': `Bearer ${token}` } : {}
+                    });
+                    return response.json();
                 };
-            }
+
+                const data = await fetchPage(true);
+                const documents = await mergeDeltas(collection, data.documents, checkpoint?.updated_at);
+                if (documents) {
+                    return { documents, checkpoint: data.checkpoint };
+                }
+                // A delta we could not apply safely: refetch the page in full, and keep
+                // its own checkpoint (the page may have moved since the delta response)
+                const full = await fetchPage(false);
+                return { documents: full.documents, checkpoint: full.checkpoint };
+            },
+            stream$: pullStream$.asObservable()
         },
         push: {
-            async handler(docs) {
+            // rows: [{ newDocumentState, assumedMasterState }], applied in one bulk write server-side
+            batchSize: 500,
+            async handler(rows) {
                 const token = localStorage.getItem('vision-token');
                 const response = await fetch(`${API_URL}/api/sync/tasks`, {
                     method: 'POST',
@@ -130,10 +211,12 @@ function setupReplication(collection: RxTaskCollection) {
                         'Content-Type': 'application/json',
                         ...(token ? { 'Authorization': `Bearer ${token}` } : {})
                     },
-                    body: JSON.stringify(docs)
+                    body: JSON.stringify(rows)
                 });
-                // Assuming success means no conflicts for POC
-                return [];
+                if (!response.ok) throw new Error(`Push failed: ${response.status}`);
+                // Server returns the current master state of every conflicting document
+                const data = await response.json();
+                return data.conflicts;
             }
         }
     });
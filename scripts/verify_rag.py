@@ -1,3 +1,5 @@
+# Needs a running backend. Start it with EMBEDDING_PROVIDER=hashing to verify
+# the RAG flow offline, without a Gemini API key.
 
 import requests
 import json